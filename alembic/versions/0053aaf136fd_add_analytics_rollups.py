@@ -0,0 +1,57 @@
+"""Add analytics rollup tables
+
+Revision ID: 0053aaf136fd
+Revises: 0de10203ea75
+Create Date: 2026-10-17 16:12:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0053aaf136fd'
+down_revision: Union[str, Sequence[str], None] = '0de10203ea75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('vault_occupancy_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('vault_id', sa.Integer(), nullable=False),
+    sa.Column('size', postgresql.ENUM('SMALL', 'MEDIUM', 'LARGE', name='locker_size', create_type=False), nullable=False),
+    sa.Column('allocated', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['vault_id'], ['vaults.id'], ),
+    sa.PrimaryKeyConstraint('day', 'vault_id', 'size')
+    )
+    op.create_table('vault_revenue_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('vault_id', sa.Integer(), nullable=False),
+    sa.Column('payments', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['vault_id'], ['vaults.id'], ),
+    sa.PrimaryKeyConstraint('day', 'vault_id')
+    )
+    op.create_table('allocation_duration_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('vault_id', sa.Integer(), nullable=False),
+    sa.Column('allocations', sa.Integer(), nullable=False),
+    sa.Column('total_seconds', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['vault_id'], ['vaults.id'], ),
+    sa.PrimaryKeyConstraint('day', 'vault_id')
+    )
+    op.create_index('ix_locker_allocations_ended_expiry_date', 'locker_allocations', ['expiry_date'], unique=False, postgresql_where=sa.text("status <> 'ACTIVE'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_locker_allocations_ended_expiry_date', table_name='locker_allocations', postgresql_where=sa.text("status <> 'ACTIVE'"))
+    op.drop_table('allocation_duration_daily')
+    op.drop_table('vault_revenue_daily')
+    op.drop_table('vault_occupancy_daily')
@@ -0,0 +1,30 @@
+"""Add payment billing period
+
+Revision ID: 0de10203ea75
+Revises: d88abf7fe7ae
+Create Date: 2026-10-17 17:31:52.146027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0de10203ea75'
+down_revision: Union[str, Sequence[str], None] = 'd88abf7fe7ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('payments', sa.Column('billing_period', sa.String(length=7), nullable=True))
+    op.create_unique_constraint('uq_payments_allocation_id_billing_period', 'payments', ['allocation_id', 'billing_period'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_payments_allocation_id_billing_period', 'payments', type_='unique')
+    op.drop_column('payments', 'billing_period')
@@ -0,0 +1,48 @@
+"""Add hot path indexes
+
+Revision ID: 42a593d4898d
+Revises: 87e8aeef592b
+Create Date: 2026-10-17 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42a593d4898d'
+down_revision: Union[str, Sequence[str], None] = '87e8aeef592b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_lockers_vault_id'), 'lockers', ['vault_id'], unique=False)
+    op.create_index('ix_lockers_available_vault_id_size', 'lockers', ['vault_id', 'size', 'id'], unique=False, postgresql_where=sa.text("status = 'AVAILABLE'"))
+    op.create_index('ix_lockers_available_size', 'lockers', ['size', 'id'], unique=False, postgresql_where=sa.text("status = 'AVAILABLE'"))
+    op.create_index(op.f('ix_locker_allocations_locker_id'), 'locker_allocations', ['locker_id'], unique=False)
+    op.create_index('ix_locker_allocations_user_id_status', 'locker_allocations', ['user_id', 'status'], unique=False)
+    op.create_index('ix_locker_allocations_active_expiry_date', 'locker_allocations', ['expiry_date'], unique=False, postgresql_where=sa.text("status = 'ACTIVE'"))
+    op.create_index(op.f('ix_assets_allocation_id'), 'assets', ['allocation_id'], unique=False)
+    op.create_index(op.f('ix_payments_allocation_id'), 'payments', ['allocation_id'], unique=False)
+    op.create_index(op.f('ix_vault_transactions_allocation_id'), 'vault_transactions', ['allocation_id'], unique=False)
+    op.create_index(op.f('ix_access_logs_locker_id'), 'access_logs', ['locker_id'], unique=False)
+    op.create_index(op.f('ix_access_logs_user_id'), 'access_logs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_access_logs_user_id'), table_name='access_logs')
+    op.drop_index(op.f('ix_access_logs_locker_id'), table_name='access_logs')
+    op.drop_index(op.f('ix_vault_transactions_allocation_id'), table_name='vault_transactions')
+    op.drop_index(op.f('ix_payments_allocation_id'), table_name='payments')
+    op.drop_index(op.f('ix_assets_allocation_id'), table_name='assets')
+    op.drop_index('ix_locker_allocations_active_expiry_date', table_name='locker_allocations', postgresql_where=sa.text("status = 'ACTIVE'"))
+    op.drop_index('ix_locker_allocations_user_id_status', table_name='locker_allocations')
+    op.drop_index(op.f('ix_locker_allocations_locker_id'), table_name='locker_allocations')
+    op.drop_index('ix_lockers_available_size', table_name='lockers', postgresql_where=sa.text("status = 'AVAILABLE'"))
+    op.drop_index('ix_lockers_available_vault_id_size', table_name='lockers', postgresql_where=sa.text("status = 'AVAILABLE'"))
+    op.drop_index(op.f('ix_lockers_vault_id'), table_name='lockers')
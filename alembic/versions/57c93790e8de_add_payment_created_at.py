@@ -0,0 +1,34 @@
+"""Add payment created_at
+
+Revision ID: 57c93790e8de
+Revises: a43267f9cf11
+Create Date: 2026-10-17 15:02:41.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57c93790e8de'
+down_revision: Union[str, Sequence[str], None] = 'a43267f9cf11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('payments', sa.Column('created_at', sa.DateTime(), nullable=True))
+    # Existing payments get the migration time; their real time is unknown.
+    op.execute("UPDATE payments SET created_at = timezone('utc', now())")
+    op.create_index(op.f('ix_payments_created_at'), 'payments', ['created_at'], unique=False)
+    op.create_index(op.f('ix_vault_transactions_timestamp'), 'vault_transactions', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_vault_transactions_timestamp'), table_name='vault_transactions')
+    op.drop_index(op.f('ix_payments_created_at'), table_name='payments')
+    op.drop_column('payments', 'created_at')
@@ -0,0 +1,44 @@
+"""Add billing runs
+
+Revision ID: 7af535de6262
+Revises: 0053aaf136fd
+Create Date: 2026-10-17 18:20:47.246208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7af535de6262'
+down_revision: Union[str, Sequence[str], None] = '0053aaf136fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('billing_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('status', sa.Enum('RUNNING', 'COMPLETED', 'FAILED', name='billing_run_status'), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('vaults', sa.Integer(), nullable=True),
+    sa.Column('allocations', sa.Integer(), nullable=True),
+    sa.Column('created', sa.Integer(), nullable=True),
+    sa.Column('seconds', sa.Float(), nullable=True),
+    sa.Column('rows_per_second', sa.Float(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_billing_runs_id'), 'billing_runs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_billing_runs_id'), table_name='billing_runs')
+    op.drop_table('billing_runs')
+    op.execute("DROP TYPE billing_run_status")
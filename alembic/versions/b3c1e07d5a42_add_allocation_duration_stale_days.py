@@ -0,0 +1,31 @@
+"""Add allocation duration stale days
+
+Revision ID: b3c1e07d5a42
+Revises: 7af535de6262
+Create Date: 2026-10-17 21:05:12.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c1e07d5a42'
+down_revision: Union[str, Sequence[str], None] = '7af535de6262'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('allocation_duration_stale_days',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('allocation_duration_stale_days')
@@ -0,0 +1,40 @@
+"""Add vault availability summary
+
+Revision ID: cf47ef7ae91c
+Revises: 42a593d4898d
+Create Date: 2026-10-17 11:03:18.227409
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cf47ef7ae91c'
+down_revision: Union[str, Sequence[str], None] = '42a593d4898d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('vault_availability',
+    sa.Column('vault_id', sa.Integer(), nullable=False),
+    sa.Column('size', postgresql.ENUM('SMALL', 'MEDIUM', 'LARGE', name='locker_size', create_type=False), nullable=False),
+    sa.Column('status', postgresql.ENUM('AVAILABLE', 'ALLOCATED', 'MAINTENANCE', name='locker_status', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['vault_id'], ['vaults.id'], ),
+    sa.PrimaryKeyConstraint('vault_id', 'size', 'status')
+    )
+    op.execute(
+        "INSERT INTO vault_availability (vault_id, size, status, count) "
+        "SELECT vault_id, size, status, count(*) FROM lockers GROUP BY vault_id, size, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('vault_availability')
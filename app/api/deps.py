@@ -1,11 +1,30 @@
-from typing import Generator, Annotated
+from typing import Generator, Annotated, Optional
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, open_read_session
 
-async def get_db() -> Generator[AsyncSession, None, None]:
+def writer_key(request: Request) -> Optional[str]:
+    """
+    Identifies the caller for read-your-writes routing: the bearer token
+    when present, otherwise the client address.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    return request.client.host if request.client else None
+
+async def get_db(request: Request) -> Generator[AsyncSession, None, None]:
     async with SessionLocal() as session:
+        session.info["writer_key"] = writer_key(request)
+        yield session
+
+async def get_read_db(request: Request) -> Generator[AsyncSession, None, None]:
+    session = await open_read_session(writer_key(request))
+    try:
         yield session
+    finally:
+        await session.close()
 
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_db)]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
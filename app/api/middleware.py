@@ -0,0 +1,167 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import (
+    RequestStats,
+    current_request_stats,
+    http_request_db_queries,
+    http_request_db_seconds,
+    http_request_duration_seconds,
+    http_requests_rate_limited_total,
+    http_requests_total,
+)
+from app.core.rate_limit import rate_limiter
+from app.core.tokens import TokenError, token_service
+from app.db.session import ReadYourWrites, current_read_your_writes, primary_until, sign_primary_until
+
+PRIMARY_UNTIL_COOKIE = "primary_until"
+PRIMARY_UNTIL_HEADER = "x-primary-until"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts, latency and the
+    database work done while serving each request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            # Label by route template, not raw path, to keep cardinality bounded.
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, route_path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, method, route_path)
+            http_request_db_queries.observe(stats.queries, route_path)
+            http_request_db_seconds.observe(stats.db_seconds, route_path)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying token-bucket limits before any routing or
+    database work. POSTs under /auth are limited per client IP; everything
+    else per authenticated user, or per IP for anonymous callers, with
+    separate read (GET/HEAD) and write budgets.
+    """
+
+    def __init__(self, app, prefix: str = "/api/v1"):
+        self.app = app
+        self.prefix = prefix
+        self.auth_prefix = prefix + "/auth/"
+
+    def _client(self, scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        payload = token_service.verify(token)
+                    except TokenError:
+                        break
+                    if payload.get("sub"):
+                        return "user:" + payload["sub"]
+                break
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method == "POST" and scope["path"].startswith(self.auth_prefix):
+            client = scope.get("client")
+            group, per_minute, key = "auth", settings.RATE_LIMIT_AUTH_PER_MINUTE, "ip:" + (client[0] if client else "unknown")
+        elif method in ("GET", "HEAD"):
+            group, per_minute, key = "read", settings.RATE_LIMIT_READ_PER_MINUTE, self._client(scope)
+        else:
+            group, per_minute, key = "write", settings.RATE_LIMIT_WRITE_PER_MINUTE, self._client(scope)
+
+        retry_after = await rate_limiter.check(group, key, per_minute)
+        if retry_after:
+            http_requests_rate_limited_total.inc(group)
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware carrying the read-your-writes window with the client,
+    so it holds on every worker and pod rather than only the one that took
+    the write. A response to a request that committed a write sets a signed
+    primary_until cookie and X-Primary-Until header; clients that send
+    either back have their reads routed to the primary until it expires.
+    Only active when read replicas are configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _marker(self, scope) -> float:
+        for name, value in scope["headers"]:
+            if name == PRIMARY_UNTIL_HEADER.encode():
+                return primary_until(value.decode("latin-1"))
+            if name == b"cookie":
+                until = primary_until(cookie_parser(value.decode("latin-1")).get(PRIMARY_UNTIL_COOKIE))
+                if until:
+                    return until
+        return 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.DATABASE_REPLICA_URLS:
+            await self.app(scope, receive, send)
+            return
+
+        state = ReadYourWrites(self._marker(scope))
+        token = current_read_your_writes.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                window = settings.DB_READ_YOUR_WRITES_SECONDS
+                marker = sign_primary_until(time.time() + window)
+                headers = MutableHeaders(scope=message)
+                headers.append(PRIMARY_UNTIL_HEADER, marker)
+                headers.append(
+                    "set-cookie",
+                    f"{PRIMARY_UNTIL_COOKIE}={marker}; Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_read_your_writes.reset(token)
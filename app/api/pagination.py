@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.repository import row_dicts
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return int(json.loads(raw)["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    id_column,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    """
+    Run a list query ordered by id. With a cursor, seek past the last seen
+    id instead of using OFFSET so every page costs the same. When more rows
+    follow, the cursor for the next page is returned in X-Next-Cursor.
+    Entity queries return instances; column queries return plain dicts.
+    """
+    if limit <= 0:
+        # Nothing to return and no position to advance a cursor to.
+        return []
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.where(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit + 1))
+    first = query.column_descriptions[0]
+    if len(query.column_descriptions) == 1 and first["expr"] is first["entity"]:
+        rows = result.scalars().all()
+    else:
+        rows = row_dicts(result)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            last[id_column.key] if isinstance(last, dict) else last.id
+        )
+    return rows
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, vaults, lockers, transactions
+from app.api.v1.endpoints import auth, vaults, lockers, transactions, billing, analytics
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(vaults.router, prefix="/vaults", tags=["vaults"])
 api_router.include_router(lockers.router, prefix="/lockers", tags=["lockers"])
 api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
+api_router.include_router(billing.router, prefix="/billing", tags=["billing"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
@@ -0,0 +1,98 @@
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app.api.deps import AsyncReadSessionDep
+from app.api.responses import FastJSONResponse
+from app.db.repository import row_dicts
+from app.models.allocation_duration_daily import AllocationDurationDaily
+from app.models.user import User
+from app.models.vault_occupancy_daily import VaultOccupancyDaily
+from app.models.vault_revenue_daily import VaultRevenueDaily
+from app.schemas.analytics import AllocationDuration, MonthlyRevenue, OccupancyPoint
+from app.api.v1.endpoints.auth import get_current_staff_user
+
+router = APIRouter()
+
+def _in_range(query, day, vault_column, vault_id: Optional[int], since: Optional[date], until: Optional[date]):
+    if vault_id is not None:
+        query = query.where(vault_column == vault_id)
+    if since is not None:
+        query = query.where(day >= since)
+    if until is not None:
+        query = query.where(day <= until)
+    return query
+
+@router.get("/occupancy", response_model=List[OccupancyPoint])
+async def occupancy(
+    db: AsyncReadSessionDep,
+    vault_id: Optional[int] = None,
+    size: Optional[Literal["SMALL", "MEDIUM", "LARGE"]] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    current_user: User = Depends(get_current_staff_user)
+):
+    """
+    Daily allocated and total locker counts per vault and size (Staff and Admin only).
+    """
+    query = select(
+        VaultOccupancyDaily.day,
+        VaultOccupancyDaily.vault_id,
+        VaultOccupancyDaily.size,
+        VaultOccupancyDaily.allocated,
+        VaultOccupancyDaily.total,
+    )
+    query = _in_range(query, VaultOccupancyDaily.day, VaultOccupancyDaily.vault_id, vault_id, since, until)
+    if size is not None:
+        query = query.where(VaultOccupancyDaily.size == size)
+    query = query.order_by(VaultOccupancyDaily.day, VaultOccupancyDaily.vault_id, VaultOccupancyDaily.size)
+    result = await db.execute(query)
+    return FastJSONResponse(row_dicts(result))
+
+@router.get("/revenue", response_model=List[MonthlyRevenue])
+async def revenue(
+    db: AsyncReadSessionDep,
+    vault_id: Optional[int] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    current_user: User = Depends(get_current_staff_user)
+):
+    """
+    Successful payments per vault and month (YYYY-MM) (Staff and Admin only).
+    """
+    month = func.to_char(VaultRevenueDaily.day, "YYYY-MM")
+    query = select(
+        month.label("month"),
+        VaultRevenueDaily.vault_id,
+        func.sum(VaultRevenueDaily.payments).label("payments"),
+        func.sum(VaultRevenueDaily.revenue).label("revenue"),
+    )
+    query = _in_range(query, VaultRevenueDaily.day, VaultRevenueDaily.vault_id, vault_id, since, until)
+    query = query.group_by(month, VaultRevenueDaily.vault_id).order_by(month, VaultRevenueDaily.vault_id)
+    result = await db.execute(query)
+    return FastJSONResponse(row_dicts(result))
+
+@router.get("/allocation-duration", response_model=List[AllocationDuration])
+async def allocation_duration(
+    db: AsyncReadSessionDep,
+    vault_id: Optional[int] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    current_user: User = Depends(get_current_staff_user)
+):
+    """
+    Average duration in days of allocations that ended in the range, per vault (Staff and Admin only).
+    """
+    allocations = func.sum(AllocationDurationDaily.allocations)
+    query = select(
+        AllocationDurationDaily.vault_id,
+        allocations.label("allocations"),
+        (func.sum(AllocationDurationDaily.total_seconds) / allocations / 86400).label("average_days"),
+    )
+    query = _in_range(query, AllocationDurationDaily.day, AllocationDurationDaily.vault_id, vault_id, since, until)
+    query = query.group_by(AllocationDurationDaily.vault_id).order_by(AllocationDurationDaily.vault_id)
+    result = await db.execute(query)
+    return FastJSONResponse(row_dicts(result))
@@ -3,43 +3,68 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
-from jose import jwt, JWTError
 
 from app.api.deps import AsyncSessionDep
 from app.core.config import settings
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.principal_cache import principal_cache
+from app.core.tokens import TokenError, token_service
+from app.core.security import (
+    HashingPoolSaturated,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.models.user import User
-from app.schemas.token import Token, TokenData
+from app.schemas.token import RefreshRequest, SessionsRevoked, Token, TokenData
+from app.services import sessions
 from app.schemas.user import UserCreate, User as UserSchema
 
 router = APIRouter()
 
+hashing_unavailable = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Authentication service is busy, please retry shortly.",
+    headers={"Retry-After": "1"},
+)
+
 @router.post("/register", response_model=UserSchema)
 async def register_user(user_in: UserCreate, db: AsyncSessionDep):
     """
     Register a new user.
     """
-    result = await db.execute(select(User).where(User.email == user_in.email))
-    user = result.scalars().first()
-    if user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists."
+    email_taken = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="User with this email already exists."
+    )
+    # Reject known emails before spending a bcrypt hash on them; the
+    # ON CONFLICT below only covers concurrent registrations.
+    if await db.scalar(select(User.id).where(User.email == user_in.email)) is not None:
+        raise email_taken
+
+    try:
+        hashed_password = await get_password_hash_async(user_in.password)
+    except HashingPoolSaturated:
+        raise hashing_unavailable
+
+    result = await db.execute(
+        insert(User)
+        .values(
+            email=user_in.email,
+            name=user_in.name,
+            phone=user_in.phone,
+            hashed_password=hashed_password,
+            role=user_in.role,
+            status=user_in.status
         )
-    
-    hashed_password = get_password_hash(user_in.password)
-    db_user = User(
-        email=user_in.email,
-        name=user_in.name,
-        phone=user_in.phone,
-        hashed_password=hashed_password,
-        role=user_in.role,
-        status=user_in.status
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
-    db.add(db_user)
+    db_user = result.scalars().first()
+    if db_user is None:
+        raise email_taken
     await db.commit()
-    await db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=Token)
@@ -48,11 +73,17 @@ async def login_for_access_token(
     db: AsyncSessionDep
 ):
     """
-    Login and get an access token.
+    Login and get an access token, plus a refresh token for POST /auth/refresh.
     """
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalars().first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        password_ok = user is not None and await verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except HashingPoolSaturated:
+        raise hashing_unavailable
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -62,7 +93,28 @@ async def login_for_access_token(
     access_token = create_access_token(
         subject=user.email, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await sessions.issue(db, user.id)
+    await db.commit()
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(refresh_in: RefreshRequest, db: AsyncSessionDep):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    Each refresh token can be used once.
+    """
+    rotated = await sessions.rotate(db, refresh_in.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    owner, refresh_token = rotated
+    access_token = create_access_token(
+        subject=owner.email, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 # Dependency to get the current user
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -76,18 +128,23 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = token_service.verify(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
-    except JWTError:
+    except TokenError:
         raise credentials_exception
-    
+
+    user = principal_cache.get(token_data.email)
+    if user is not None:
+        return user
+
     result = await db.execute(select(User).where(User.email == token_data.email))
     user = result.scalars().first()
     if user is None:
         raise credentials_exception
+    principal_cache.set(token_data.email, user, payload.get("exp"))
     return user
 
 async def get_current_active_user(
@@ -110,3 +167,28 @@ async def get_current_staff_user(
     if current_user.role not in ["ADMIN", "STAFF"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
+
+@router.post("/sessions/revoke", response_model=SessionsRevoked)
+async def revoke_my_sessions(
+    db: AsyncSessionDep,
+    current_user: Annotated[User, Depends(get_current_user)]
+):
+    """
+    Sign out everywhere: revoke all of the current user's refresh tokens.
+    """
+    revoked = await sessions.revoke_all(db, current_user.id)
+    await db.commit()
+    return {"revoked": revoked}
+
+@router.post("/users/{user_id}/sessions/revoke", response_model=SessionsRevoked)
+async def revoke_user_sessions(
+    user_id: int,
+    db: AsyncSessionDep,
+    current_admin: Annotated[User, Depends(get_current_admin_user)]
+):
+    """
+    Revoke all refresh tokens of a user (Admin only).
+    """
+    revoked = await sessions.revoke_all(db, user_id)
+    await db.commit()
+    return {"revoked": revoked}
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+
+from app.api.deps import AsyncSessionDep
+from app.db.repository import insert_returning
+from app.models.billing_run import BillingRun
+from app.models.user import User
+from app.schemas.billing import BillingRun as BillingRunSchema
+from app.api.v1.endpoints.auth import get_current_admin_user
+from app.services import billing
+
+router = APIRouter()
+
+@router.post("/runs", response_model=BillingRunSchema, status_code=status.HTTP_202_ACCEPTED)
+async def run_billing(
+    background_tasks: BackgroundTasks,
+    db: AsyncSessionDep,
+    period: Optional[str] = None,
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Start creating PENDING rent payments for every active allocation (Admin only).
+    Defaults to the current month (YYYY-MM); re-running a period only fills in what is missing.
+    The run continues in the background; poll GET /billing/runs/{run_id} for its report.
+    """
+    period = period or billing.current_period()
+    billing.period_end(period)
+    db_run = await insert_returning(db, BillingRun, dict(period=period, status="RUNNING", started_at=datetime.utcnow()))
+    await db.commit()
+    background_tasks.add_task(billing.execute, db_run.id, period)
+    return db_run
+
+@router.get("/runs/{run_id}", response_model=BillingRunSchema)
+async def get_billing_run(
+    run_id: int,
+    db: AsyncSessionDep,
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Status and report of a billing run (Admin only).
+    """
+    db_run = await db.get(BillingRun, run_id)
+    if db_run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Billing run not found")
+    return db_run
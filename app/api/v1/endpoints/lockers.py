@@ -1,31 +1,25 @@
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
 from sqlalchemy.future import select
-from sqlalchemy import func
 
-from app.api.deps import AsyncSessionDep
+from app.api.deps import AsyncSessionDep, writer_key
+from app.api.pagination import paginate
+from app.core.response_cache import response_cache
+from app.db.repository import insert_returning, schema_columns, update_returning
+from app.db.session import open_read_session
 from app.models.vault import Vault
 from app.models.locker import Locker
-from app.models.locker_allocation import LockerAllocation
 from app.models.user import User
-from app.schemas.locker import LockerCreate, Locker as LockerSchema
-from app.schemas.locker_allocation import LockerAllocationCreate, LockerAllocation as LockerAllocationSchema
+from app.schemas.locker import LockerBulkItem, LockerBulkResult, LockerCreate, Locker as LockerSchema
+from app.schemas.locker_allocation import LockerAllocation as LockerAllocationSchema
 from app.api.v1.endpoints.auth import get_current_active_user, get_current_staff_user
+from app.services import availability, idempotency, locker_allocation, locker_provisioning
 
 router = APIRouter()
 
-async def _get_locker_and_vault_status(db: AsyncSessionDep, locker_id: int):
-    """
-    Helper function to fetch the locker and vault status
-    """
-    locker_result = db.execute(select(Locker).where(Locker.id == locker_id))
-    locker = locker_result.scalars().first()
-
-    vault_result = db.execute(select(Vault).where(Vault.id == locker.vault_id))
-    vault = vault_result.scalars().first()
-    return locker, vault
+LOCKER_SIZES = ("SMALL", "MEDIUM", "LARGE")
 
 @router.post("/vaults/{vault_id}/", response_model=LockerSchema, status_code=status.HTTP_201_CREATED)
 async def create_locker(
@@ -37,95 +31,128 @@ async def create_locker(
     """
     Create a new locker within a vault (Staff and Admin only).
     """
-    result = await db.execute(select(Vault).where(Vault.id == vault_id))
-    vault = result.scalars().first()
+    vault = await update_returning(db, Vault, [Vault.id == vault_id], dict(
+        total_lockers=Vault.total_lockers + 1,
+        available_lockers=Vault.available_lockers + 1
+    ))
     if not vault:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vault not found"
         )
-    
-    db_locker = Locker(
+
+    db_locker = await insert_returning(db, Locker, dict(
         vault_id=vault_id,
         locker_number=locker_in.locker_number,
         size=locker_in.size,
         status="AVAILABLE",
         monthly_rent=locker_in.monthly_rent
-    )
-    db.add(db_locker)
-    vault.total_lockers += 1 
-    vault.available_lockers += 1 
+    ))
+    await availability.record_transition(db, vault_id, locker_in.size, to_status="AVAILABLE")
+    response_cache.invalidate_on_commit(db, "vaults", "lockers")
     await db.commit()
-    await db.refresh(db_locker)
-    await db.refresh(vault)
     return db_locker
 
+_bulk_item_schema = LockerBulkItem.model_json_schema()
+
+@router.post(
+    "/vaults/{vault_id}/bulk",
+    response_model=LockerBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": _bulk_item_schema}},
+                "application/x-ndjson": {"schema": _bulk_item_schema},
+                "text/csv": {"schema": {"type": "string", "example": "locker_number,size,monthly_rent"}},
+            },
+        }
+    },
+)
+async def create_lockers_bulk(
+    vault_id: int,
+    request: Request,
+    db: AsyncSessionDep,
+    current_staff: User = Depends(get_current_staff_user)
+):
+    """
+    Create many lockers in a vault from a JSON array, NDJSON or CSV body (Staff and Admin only).
+    The request is all-or-nothing: any invalid record rejects the whole batch.
+    """
+    records = locker_provisioning.iter_records(request)
+    return await locker_provisioning.provision_lockers(db, vault_id, records)
+
 @router.post("/{locker_id}/allocate", response_model=LockerAllocationSchema, status_code=status.HTTP_201_CREATED)
 async def allocate_locker(
     locker_id: int,
+    request: Request,
     db: AsyncSessionDep,
     expiry_date: Optional[datetime] = None,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Allocate a locker to a user (Active users).
     If no expiry_date is provided, defaults to 30 days from now.
+    Retries carrying the same Idempotency-Key header replay the first response.
+    """
+    return await idempotency.run(
+        db, request, current_user.id, idempotency_key,
+        lambda: locker_allocation.allocate_locker(db, locker_id, current_user.id, expiry_date),
+        LockerAllocationSchema, status.HTTP_201_CREATED,
+    )
+
+@router.post("/vaults/{vault_id}/allocate", response_model=LockerAllocationSchema, status_code=status.HTTP_201_CREATED)
+async def allocate_any_locker(
+    vault_id: int,
+    size: str,
+    request: Request,
+    db: AsyncSessionDep,
+    expiry_date: Optional[datetime] = None,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Allocate any available locker of the given size in a vault (Active users).
+    If no expiry_date is provided, defaults to 30 days from now.
+    Retries carrying the same Idempotency-Key header replay the first response.
     """
-    locker, vault = await _get_locker_and_vault_status(db, locker_id)
-    
-    if vault and vault.status != "OPERATIONAL":
+    size = size.upper()
+    if size not in LOCKER_SIZES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot allocate locker: vault is not operational"
+            detail=f"Invalid locker size, expected one of {', '.join(LOCKER_SIZES)}"
         )
-    
-    if not locker:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Locker not found")
-
-    if locker.status != "AVAILABLE":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Locker is not available for allocation")
-
-    if not vault or vault.available_lockers <= 0:
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No available lockers in the vault")
-
-    if expiry_date is None:
-        expiry_date = datetime.utcnow() + timedelta(days=30)
-
-    new_allocation = LockerAllocation(
-        locker_id=locker_id,
-        user_id=current_user.id,
-        allocated_at=datetime.utcnow(),
-        expiry_date=expiry_date,
-        status="ACTIVE"
+    return await idempotency.run(
+        db, request, current_user.id, idempotency_key,
+        lambda: locker_allocation.allocate_any_locker(db, vault_id, size, current_user.id, expiry_date),
+        LockerAllocationSchema, status.HTTP_201_CREATED,
     )
-    db.add(new_allocation)
-    locker.status = "ALLOCATED"
-    vault.available_lockers -= 1 
-
-    await db.commit()
-    await db.refresh(new_allocation)
-    await db.refresh(locker)
-    await db.refresh(vault)
-    return new_allocation
 
 @router.get("/available", response_model=List[LockerSchema])
 async def check_available_lockers(
-    db: AsyncSessionDep,
+    request: Request,
     size: str = None,
     vault_id: int = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Check for available lockers (Active users).
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 when unchanged.
     """
-    query = select(Locker).where(Locker.status == "AVAILABLE")
+    query = select(*schema_columns(Locker, LockerSchema)).where(Locker.status == "AVAILABLE")
     if size:
         query = query.where(Locker.size == size.upper())
     if vault_id:
         query = query.where(Locker.vault_id == vault_id)
-    
-    result = await db.execute(query.offset(skip).limit(limit))
-    available_lockers = result.scalars().all()
-    return available_lockers
+
+    async def load(response: Response):
+        async with await open_read_session(writer_key(request)) as db:
+            return await paginate(db, query, Locker.id, response, skip, limit, cursor)
+
+    return await response_cache.serve(request, "lockers", current_user.role, load)
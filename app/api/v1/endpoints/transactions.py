@@ -1,19 +1,26 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, insert, update
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
-from app.api.deps import AsyncSessionDep
+from app.api.deps import AsyncReadSessionDep, AsyncSessionDep, writer_key
+from app.api.responses import FastJSONResponse
+from app.db.repository import insert_returning, row_dicts, schema_columns
 from app.models.asset import Asset
 from app.models.locker_allocation import LockerAllocation
 from app.models.vault_transaction import VaultTransaction
 from app.models.payment import Payment
 from app.models.user import User
-from app.schemas.asset import AssetCreate, Asset as AssetSchema
+from app.schemas.asset import AssetCreate, AssetBatchCreate, AssetBatchWithdraw, Asset as AssetSchema
 from app.schemas.transaction import VaultTransaction as VaultTransactionSchema
 from app.schemas.payment import PaymentCreate, Payment as PaymentSchema
-from app.api.v1.endpoints.auth import get_current_active_user
+from app.api.v1.endpoints.auth import get_current_active_user, get_current_staff_user
+from app.services import analytics, authorization, export, idempotency, locker_allocation
+from app.services.access_log import access_log_writer
 
 router = APIRouter()
 
@@ -27,36 +34,46 @@ async def add_asset_to_locker(
     """
     Add an asset to an allocated locker (Active users).
     """
-    result = await db.execute(
-        select(LockerAllocation)
-        .options(selectinload(LockerAllocation.user))
-        .where(LockerAllocation.id == allocation_id)
-    )
-    allocation = result.scalars().first()
-
-    if not allocation or allocation.user.id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Locker allocation not found for current user")
+    allocation = await authorization.require_allocation(db, allocation_id, current_user.id)
     
     if allocation.status == "EXPIRED":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot add asset to an expired allocation")
 
-    db_asset = Asset(
+    db_asset = await insert_returning(db, Asset, dict(
         allocation_id=allocation_id,
         asset_name=asset_in.asset_name,
         estimated_value=asset_in.estimated_value,
         type=asset_in.type
-    )
-    db.add(db_asset)
+    ))
     db_transaction = VaultTransaction(
         allocation_id=allocation_id,
         type="DEPOSIT"
     )
     db.add(db_transaction)
     await db.commit()
-    await db.refresh(db_asset)
-    await db.refresh(db_transaction)
+    access_log_writer.record(allocation.locker_id, current_user.id, "DEPOSIT")
     return db_asset
 
+@router.get("/allocations/{allocation_id}/assets", response_model=List[AssetSchema])
+async def list_locker_assets(
+    allocation_id: int,
+    db: AsyncReadSessionDep,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Inspect the assets held in an allocated locker (Active users).
+    """
+    allocation = await authorization.require_allocation(db, allocation_id, current_user.id)
+
+    result = await db.execute(
+        select(*schema_columns(Asset, AssetSchema))
+        .where(Asset.allocation_id == allocation_id)
+        .order_by(Asset.id)
+    )
+    assets = row_dicts(result)
+    access_log_writer.record(allocation.locker_id, current_user.id, "INSPECTION")
+    return FastJSONResponse(assets)
+
 @router.delete("/assets/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_asset_from_locker(
     asset_id: int,
@@ -66,45 +83,109 @@ async def remove_asset_from_locker(
     """
     Remove an asset from an allocated locker (Active users).
     """
-    result = await db.execute(
-        select(Asset)
-        .options(selectinload(Asset.allocation).selectinload(LockerAllocation.user))
-        .where(Asset.id == asset_id)
-    )
-    db_asset = result.scalars().first()
-
-    if not db_asset or db_asset.allocation.user.id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found for current user")
+    asset = await authorization.require_asset(db, asset_id, current_user.id)
 
+    await db.execute(
+        delete(Asset)
+        .where(Asset.id == asset.id)
+        .execution_options(synchronize_session=False)
+    )
     db_transaction = VaultTransaction(
-        allocation_id=db_asset.allocation_id,
+        allocation_id=asset.allocation_id,
         type="WITHDRAW"
     )
     db.add(db_transaction)
-    await db.delete(db_asset)
     await db.commit()
+    access_log_writer.record(asset.locker_id, current_user.id, "WITHDRAW")
     return
 
+@router.post("/allocations/{allocation_id}/assets/batch", response_model=List[AssetSchema], status_code=status.HTTP_201_CREATED)
+async def add_assets_to_locker(
+    allocation_id: int,
+    batch_in: AssetBatchCreate,
+    db: AsyncSessionDep,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Add several assets to an allocated locker in one transaction (Active users).
+    """
+    allocation = await authorization.require_allocation(db, allocation_id, current_user.id)
+
+    if allocation.status == "EXPIRED":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot add asset to an expired allocation")
+
+    result = await db.execute(
+        insert(Asset).returning(Asset, sort_by_parameter_order=True),
+        [dict(allocation_id=allocation_id, **item.model_dump()) for item in batch_in.assets],
+    )
+    db_assets = result.scalars().all()
+    await db.execute(
+        insert(VaultTransaction),
+        [dict(allocation_id=allocation_id, type="DEPOSIT") for _ in db_assets],
+    )
+    await db.commit()
+    access_log_writer.record(allocation.locker_id, current_user.id, "DEPOSIT", len(db_assets))
+    return db_assets
+
+@router.post("/allocations/{allocation_id}/assets/withdraw", response_model=List[VaultTransactionSchema])
+async def remove_assets_from_locker(
+    allocation_id: int,
+    batch_in: AssetBatchWithdraw,
+    db: AsyncSessionDep,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Remove several assets from an allocated locker in one transaction (Active users).
+    Nothing is removed unless every asset belongs to the allocation.
+    """
+    allocation = await authorization.require_allocation(db, allocation_id, current_user.id)
+
+    asset_ids = set(batch_in.asset_ids)
+    result = await db.execute(
+        delete(Asset)
+        .where(Asset.allocation_id == allocation_id, Asset.id.in_(asset_ids))
+        .returning(Asset.id)
+        .execution_options(synchronize_session=False)
+    )
+    missing = asset_ids - set(result.scalars().all())
+    if missing:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Assets not found in this allocation: {sorted(missing)}"
+        )
+
+    result = await db.execute(
+        insert(VaultTransaction).returning(VaultTransaction, sort_by_parameter_order=True),
+        [dict(allocation_id=allocation_id, type="WITHDRAW") for _ in asset_ids],
+    )
+    db_transactions = result.scalars().all()
+    await db.commit()
+    access_log_writer.record(allocation.locker_id, current_user.id, "WITHDRAW", len(db_transactions))
+    return db_transactions
+
 @router.post("/allocations/{allocation_id}/pay_rent", response_model=PaymentSchema, status_code=status.HTTP_201_CREATED)
 async def pay_rent_for_locker(
     allocation_id: int,
     payment_in: PaymentCreate,
+    request: Request,
     db: AsyncSessionDep,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Process rent payment for a locker allocation (Active users).
     Extends expiry date by one month upon successful payment.
+    Retries carrying the same Idempotency-Key header replay the first response.
     """
-    result = await db.execute(
-        select(LockerAllocation)
-        .options(selectinload(LockerAllocation.user))
-        .where(LockerAllocation.id == allocation_id)
+    return await idempotency.run(
+        db, request, current_user.id, idempotency_key,
+        lambda: _pay_rent(db, allocation_id, payment_in, current_user),
+        PaymentSchema, status.HTTP_201_CREATED,
     )
-    allocation = result.scalars().first()
 
-    if not allocation or allocation.user.id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Locker allocation not found for current user")
+async def _pay_rent(db: AsyncSessionDep, allocation_id: int, payment_in: PaymentCreate, current_user: User):
+    allocation = await authorization.require_allocation(db, allocation_id, current_user.id)
     
     db_payment = Payment(
     allocation_id=allocation_id,
@@ -113,10 +194,89 @@ async def pay_rent_for_locker(
     )
     db.add(db_payment)
 
-    allocation.expiry_date += timedelta(days=30)
-    allocation.status = "ACTIVE"
+    if allocation.status == "EXPIRED":
+        # The expiry sweeper has released the locker; take it back first.
+        if not await locker_allocation.reclaim_locker(db, allocation.locker_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Allocation has expired and its locker is no longer available"
+            )
+        # It no longer counts as ended on its old expiry day.
+        await analytics.mark_durations_stale(db, [allocation.expiry_date.date()])
+        extended_from = func.greatest(LockerAllocation.expiry_date, datetime.utcnow())
+    else:
+        extended_from = LockerAllocation.expiry_date
+    # Extend in SQL so concurrent payments each add their month. The status
+    # guard makes this a no-op if the sweeper expired the allocation (and
+    # released its locker) after it was read above.
+    result = await db.execute(
+        update(LockerAllocation)
+        .where(LockerAllocation.id == allocation.id, LockerAllocation.status == allocation.status)
+        .values(expiry_date=extended_from + timedelta(days=30), status="ACTIVE")
+        .returning(LockerAllocation.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Allocation changed while the payment was processed; please retry"
+        )
 
-    await db.commit()
-    await db.refresh(db_payment)
-    await db.refresh(allocation)
+    await db.flush()
     return db_payment
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def export_filters(
+    allocation_id: Optional[int] = None,
+    vault_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: Optional[int] = Query(default=None, ge=0),
+) -> dict:
+    return dict(
+        allocation_id=allocation_id,
+        vault_id=vault_id,
+        user_id=user_id,
+        since=_naive_utc(since),
+        until=_naive_utc(until),
+        after_id=after_id,
+    )
+
+def _export_response(request: Request, query, fmt: str, kind: str) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{kind}.{fmt}"'} if fmt == "csv" else None
+    return StreamingResponse(
+        export.stream_rows(query, fmt, kind, writer_key(request)),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers=headers,
+    )
+
+@router.get("/export/transactions", response_class=StreamingResponse)
+async def export_transactions(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    filters: dict = Depends(export_filters),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """
+    Stream vault transactions ordered by id as NDJSON or CSV (Staff and Admin only).
+    Pass the last id received as after_id to resume an interrupted export.
+    """
+    return _export_response(request, export.transactions_query(**filters), fmt, "transactions")
+
+@router.get("/export/payments", response_class=StreamingResponse)
+async def export_payments(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    filters: dict = Depends(export_filters),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """
+    Stream payments ordered by id as NDJSON or CSV (Staff and Admin only).
+    Pass the last id received as after_id to resume an interrupted export.
+    """
+    return _export_response(request, export.payments_query(**filters), fmt, "payments")
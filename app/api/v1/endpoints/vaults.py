@@ -1,11 +1,23 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.future import select
 
-from app.api.deps import AsyncSessionDep
+from app.api.deps import AsyncReadSessionDep, AsyncSessionDep, writer_key
+from app.api.pagination import paginate
+from app.api.responses import FastJSONResponse
+from app.core.response_cache import response_cache
+from app.db.repository import insert_returning, row_dicts, schema_columns
+from app.db.session import open_read_session
 from app.models.vault import Vault
-from app.schemas.vault import VaultCreate, Vault as VaultSchema
+from app.models.vault_availability import VaultAvailability
+from app.schemas.vault import (
+    AvailabilityDrift,
+    VaultAvailability as VaultAvailabilitySchema,
+    VaultCreate,
+    Vault as VaultSchema,
+)
+from app.services import availability
 from app.api.v1.endpoints.auth import get_current_admin_user, get_current_staff_user
 
 router = APIRouter()
@@ -19,27 +31,60 @@ async def create_vault(
     """
     Create a new vault (Admin only).
     """
-    db_vault = Vault(
+    db_vault = await insert_returning(db, Vault, dict(
         location=vault_in.location,
         total_lockers=vault_in.total_lockers,
         available_lockers=vault_in.total_lockers,
         status=vault_in.status
-    )
-    db.add(db_vault)
+    ))
+    response_cache.invalidate_on_commit(db, "vaults")
     await db.commit()
-    await db.refresh(db_vault)
     return db_vault
 
 @router.get("/list", response_model=List[VaultSchema])
 async def list_vaults(
-    db: AsyncSessionDep,
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: VaultSchema = Depends(get_current_staff_user)
 ):
     """
     Retrieve a list of vaults (Staff and Admin only).
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 when unchanged.
+    """
+    async def load(response: Response):
+        async with await open_read_session(writer_key(request)) as db:
+            query = select(*schema_columns(Vault, VaultSchema))
+            return await paginate(db, query, Vault.id, response, skip, limit, cursor)
+
+    return await response_cache.serve(request, "vaults", current_user.role, load)
+
+
+@router.get("/availability", response_model=List[VaultAvailabilitySchema])
+async def vault_availability(
+    db: AsyncReadSessionDep,
+    vault_id: Optional[int] = None,
+    current_user: VaultSchema = Depends(get_current_staff_user)
+):
+    """
+    Locker counts per vault, size and status (Staff and Admin only).
+    """
+    query = select(*schema_columns(VaultAvailability, VaultAvailabilitySchema)).order_by(
+        VaultAvailability.vault_id, VaultAvailability.size, VaultAvailability.status
+    )
+    if vault_id:
+        query = query.where(VaultAvailability.vault_id == vault_id)
+    result = await db.execute(query)
+    return FastJSONResponse(row_dicts(result))
+
+@router.post("/availability/reconcile", response_model=List[AvailabilityDrift])
+async def reconcile_vault_availability(
+    db: AsyncSessionDep,
+    current_admin: VaultSchema = Depends(get_current_admin_user)
+):
+    """
+    Rebuild the availability summary from the lockers table and report any drift (Admin only).
     """
-    result = await db.execute(select(Vault).offset(skip).limit(limit))
-    vaults = result.scalars().all()
-    return vaults
+    return await availability.reconcile(db)
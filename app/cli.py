@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import json
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+load_dotenv()
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services import billing
+
+
+async def _bill(args) -> None:
+    try:
+        report = await billing.run(args.period, args.concurrency, args.chunk_size)
+    finally:
+        await engine.dispose()
+    print(json.dumps(report))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Vault Management System commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bill = commands.add_parser("bill", help="Create PENDING rent payments for a billing period")
+    bill.add_argument("--period", default=billing.current_period(), help="YYYY-MM, defaults to the current month")
+    bill.add_argument("--concurrency", type=int, default=settings.BILLING_CONCURRENCY, help="capped below DB_POOL_SIZE")
+    bill.add_argument("--chunk-size", type=int, default=settings.BILLING_CHUNK_SIZE)
+    bill.set_defaults(handler=_bill)
+
+    args = parser.parse_args()
+    if args.command == "bill":
+        try:
+            billing.period_end(args.period)
+        except HTTPException as exc:
+            parser.error(exc.detail)
+        if args.concurrency < 1 or args.chunk_size < 1:
+            parser.error("--concurrency and --chunk-size must be at least 1")
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +8,89 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # PEM keys for RS*/ES* algorithms; verify-only nodes set just the public key
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_PUBLIC_KEY: Optional[str] = None
+    # Recently verified tokens kept until they expire
+    TOKEN_CACHE_SIZE: int = 10000
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
+    # Connection pool and driver tuning
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Planner cost of a random page read; 1.1 suits SSDs, unset keeps the server's value
+    DB_RANDOM_PAGE_COST: Optional[float] = None
+    DB_CONNECT_TIMEOUT: float = 10
+    # Set when connecting through PgBouncer in transaction mode
+    DB_EXTERNAL_POOLER: bool = False
+
+    # Read replicas (JSON list of URLs), "round_robin" or "least_loaded"
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_STRATEGY: str = "round_robin"
+    DB_REPLICA_RETRY_SECONDS: float = 30
+    # Reads from a client that just wrote go to the primary for this long;
+    # carried to other workers by a signed cookie/X-Primary-Until header
+    DB_READ_YOUR_WRITES_SECONDS: float = 5
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Password hashing pool ("thread" or "process")
+    HASHING_POOL_KIND: str = "thread"
+    HASHING_POOL_WORKERS: int = 4
+    HASHING_POOL_MAX_QUEUE: int = 64
+
+    # Rows per batched (executemany) INSERT on bulk write paths
+    BULK_INSERT_BATCH_SIZE: int = 1000
+
+    # Background expiry sweeper
+    EXPIRY_SWEEPER_ENABLED: bool = True
+    EXPIRY_SWEEP_INTERVAL_SECONDS: int = 60
+    EXPIRY_SWEEP_BATCH_SIZE: int = 500
+
+    # How long Idempotency-Key responses are kept for replay
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    # An unfinished request older than this is assumed to have died
+    IDEMPOTENCY_KEY_LOCK_TIMEOUT_SECONDS: int = 60
+
+    # Token-bucket rate limits in requests per minute, per user (or per
+    # client IP when anonymous). Auth endpoints are always limited per IP.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_AUTH_PER_MINUTE: int = 20
+    RATE_LIMIT_READ_PER_MINUTE: int = 600
+    RATE_LIMIT_WRITE_PER_MINUTE: int = 120
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # Cached GET listings; a worker sees writes made by other workers
+    # once the entry's TTL has passed. A TTL of 0 disables the cache.
+    RESPONSE_CACHE_SIZE: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: float = 5
+
+    # Asynchronous access log writer; events beyond the queue size are dropped
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+    ACCESS_LOG_BATCH_SIZE: int = 500
+    ACCESS_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Month-end billing runs: vaults billed in parallel (capped below
+    # DB_POOL_SIZE, which also serves API traffic and the background jobs)
+    # and allocations invoiced per INSERT ... SELECT
+    BILLING_CONCURRENCY: int = 2
+    BILLING_CHUNK_SIZE: int = 5000
+
+    # Rows fetched per round trip by the streaming exports
+    EXPORT_BATCH_SIZE: int = 2000
+
+    # Daily rollups behind the analytics endpoints; figures lag by up to one interval
+    ANALYTICS_ROLLUP_ENABLED: bool = True
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 300
+
     class Config:
         env_file = ".env"
         extra = "ignore"
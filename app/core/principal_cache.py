@@ -0,0 +1,76 @@
+import time
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from app.core.cache import CacheBackend, LRUCache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.user import User
+
+# Columns copied into the cache; the password hash is deliberately left out.
+_PRINCIPAL_FIELDS = ("id", "email", "name", "phone", "role", "status")
+
+
+class PrincipalCache:
+    """
+    Caches authenticated users by token subject so get_current_user can
+    skip the users table. Entries never outlive the token they came from.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        values = self.backend.get(subject)
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Hand out a fresh transient instance so requests never share state.
+        return User(**values)
+
+    def set(self, subject: str, user: User, token_exp: Optional[float] = None) -> None:
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        values = {field: getattr(user, field) for field in _PRINCIPAL_FIELDS}
+        self.backend.set(subject, values, ttl)
+
+    def invalidate(self, subject: str) -> None:
+        self.backend.delete(subject)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def use_backend(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(
+    LRUCache(maxsize=settings.PRINCIPAL_CACHE_SIZE),
+    ttl=min(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60),
+)
+
+registry.gauge("auth_principal_cache_hits", "Principal cache hits since start.").set_function(
+    lambda: principal_cache.hits
+)
+registry.gauge("auth_principal_cache_misses", "Principal cache misses since start.").set_function(
+    lambda: principal_cache.misses
+)
+
+
+@event.listens_for(User.role, "set")
+@event.listens_for(User.status, "set")
+def _invalidate_on_change(target, value, oldvalue, initiator):
+    """
+    Drop the cached principal whenever a user's role or status is changed.
+    """
+    if inspect(target).persistent and value != oldvalue:
+        principal_cache.invalidate(target.email)
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List
+
+from app.core.config import settings
+
+
+class RateLimitBackend:
+    """
+    Interface for token-bucket stores. Implement this to share buckets
+    between workers (e.g. a Redis script doing the same arithmetic).
+    """
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        Take one token from `key`'s bucket. Returns 0 when the request is
+        allowed, otherwise the seconds until a token becomes available.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, updated_at]
+        self.buckets: "OrderedDict[str, list]" = OrderedDict()
+
+
+class ShardedMemoryBackend(RateLimitBackend):
+    """
+    In-process buckets split over lock-striped shards. Each shard keeps
+    at most `max_keys // shards` buckets and drops the least recently
+    used one; a dropped bucket simply starts full again.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100000):
+        self._shards: List[_Shard] = [_Shard() for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = shard.buckets[key] = [capacity, now]
+                if len(shard.buckets) > self._max_per_shard:
+                    shard.buckets.popitem(last=False)
+            else:
+                shard.buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / refill_per_second
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+class RateLimiter:
+    """
+    Token buckets per (group, client). A group allows `per_minute`
+    requests per minute with bursts of the same size.
+    """
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+
+    async def check(self, group: str, client: str, per_minute: int) -> float:
+        return await self.backend.take(f"{group}:{client}", per_minute, per_minute / 60)
+
+    def use_backend(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+
+
+rate_limiter = RateLimiter(
+    ShardedMemoryBackend(shards=settings.RATE_LIMIT_SHARDS, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+)
@@ -0,0 +1,130 @@
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.deps import writer_key
+from app.api.responses import dumps
+from app.core.cache import CacheBackend, LRUCache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import reads_from_primary
+
+# Headers set by a loader that are part of the cached response.
+_CACHED_HEADERS = ("x-next-cursor",)
+
+response_cache_requests_total = registry.counter(
+    "response_cache_requests_total",
+    "Cached GET responses by namespace and outcome (hit, miss, bypass, not_modified).",
+    ("namespace", "outcome"),
+)
+
+
+class ResponseCache:
+    """
+    Caches serialized GET responses per namespace. Every key embeds the
+    namespace's version counter, so bumping the version after a commit
+    makes all earlier entries unreachable. Writes on other workers are
+    only seen once the entry's TTL has passed.
+
+    Callers inside their read-your-writes window bypass the cache so their
+    reads reach the primary. With read replicas, nothing is stored for a
+    namespace until the replica-lag window after its last bump has passed,
+    so a lagging replica cannot refill the new version with old rows.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.versions: Dict[str, int] = {}
+        self.bumped_at: Dict[str, float] = {}
+
+    def bump(self, *namespaces: str) -> None:
+        now = time.monotonic()
+        for namespace in namespaces:
+            self.versions[namespace] = self.versions.get(namespace, 0) + 1
+            self.bumped_at[namespace] = now
+
+    def _storable(self, namespace: str) -> bool:
+        if not settings.DATABASE_REPLICA_URLS:
+            return True
+        bumped_at = self.bumped_at.get(namespace)
+        return bumped_at is None or time.monotonic() - bumped_at >= settings.DB_READ_YOUR_WRITES_SECONDS
+
+    def invalidate_on_commit(self, db, *namespaces: str) -> None:
+        """
+        Bump `namespaces` once the session's transaction commits; nothing
+        happens if it rolls back.
+        """
+        db.info.setdefault("response_cache", set()).update(namespaces)
+
+    def _key(self, request: Request, namespace: str, role: str) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{namespace}:{self.versions.get(namespace, 0)}:{role}:{request.url.path}?{query}"
+
+    async def serve(
+        self,
+        request: Request,
+        namespace: str,
+        role: str,
+        load: Callable[[Response], Awaitable[Any]],
+    ) -> Response:
+        """
+        Return the cached response for this route, query and role, calling
+        `load` on a miss. `load` returns plain data already shaped like the
+        route's response_model (e.g. column-only rows), which is encoded as is.
+        A matching If-None-Match is answered with 304 and no body.
+        """
+        bypass = reads_from_primary(writer_key(request))
+        key = self._key(request, namespace, role)
+        entry = None if bypass else self.backend.get(key)
+        outcome = "hit"
+        if entry is None:
+            outcome = "bypass" if bypass else "miss"
+            loader_response = Response()
+            body = dumps(await load(loader_response))
+            headers = {
+                name: loader_response.headers[name] for name in _CACHED_HEADERS if name in loader_response.headers
+            }
+            headers["ETag"] = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            headers["Cache-Control"] = "private, no-cache"
+            entry = (body, headers)
+            if not bypass and self._storable(namespace):
+                self.backend.set(key, entry, self.ttl)
+        body, headers = entry
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if headers["ETag"] in tags or "*" in tags:
+                response_cache_requests_total.inc(namespace, "not_modified")
+                return Response(status_code=304, headers=headers)
+        response_cache_requests_total.inc(namespace, outcome)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def use_backend(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+response_cache = ResponseCache(
+    LRUCache(maxsize=settings.RESPONSE_CACHE_SIZE),
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    namespaces = session.info.pop("response_cache", None)
+    if namespaces:
+        response_cache.bump(*namespaces)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("response_cache", None)
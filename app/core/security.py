@@ -1,25 +1,20 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
 from typing import Any, Union
 
-from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.tokens import token_service
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return token_service.create(subject, expires_delta)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -27,3 +22,68 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+class HashingPoolSaturated(Exception):
+    """
+    Raised when the hashing pool already has its maximum number of jobs queued.
+    """
+
+
+class HashingExecutor:
+    """
+    Runs bcrypt off the event loop on a bounded thread or process pool.
+    Jobs beyond workers + max_queue are rejected instead of queued.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HashingPoolSaturated()
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_executor = HashingExecutor(
+    kind=settings.HASHING_POOL_KIND,
+    workers=settings.HASHING_POOL_WORKERS,
+    max_queue=settings.HASHING_POOL_MAX_QUEUE,
+)
+registry.gauge("hashing_pool_in_flight", "Password hashing jobs running or queued.").set_function(
+    lambda: hashing_executor.in_flight
+)
+registry.gauge("hashing_pool_rejected", "Password hashing jobs rejected since start.").set_function(
+    lambda: hashing_executor.rejected
+)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_executor.run(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_executor.run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from jose import JWTError, jwk, jwt
+
+from app.core.cache import CacheBackend, LRUCache
+from app.core.config import settings
+from app.core.metrics import registry
+
+token_verifications_total = registry.counter(
+    "token_verifications_total",
+    "Access token verifications by outcome (cached, verified, rejected).",
+    ("outcome",),
+)
+
+
+class TokenError(Exception):
+    """
+    Raised when a token cannot be issued or fails verification.
+    """
+
+
+class TokenService:
+    """
+    Issues and verifies JWT access tokens with keys parsed once up front.
+
+    HS* algorithms sign and verify with the shared secret. RS*/ES*/PS*
+    algorithms sign with the private key and verify with the public key,
+    so a node configured with only the public key can verify tokens but
+    not issue them. Verified claims are cached by token until the token
+    expires; callers must treat the returned claims as read-only.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        cache: CacheBackend,
+        secret_key: Optional[str] = None,
+        private_key: Optional[str] = None,
+        public_key: Optional[str] = None,
+        expire_minutes: int = 30,
+    ):
+        self.algorithm = algorithm
+        self.cache = cache
+        self.expire_minutes = expire_minutes
+        self._algorithms = [algorithm]
+        if algorithm.startswith("HS"):
+            self._signing_key = self._verification_key = jwk.construct(secret_key, algorithm)
+        else:
+            self._signing_key = jwk.construct(private_key, algorithm) if private_key else None
+            if public_key:
+                self._verification_key = jwk.construct(public_key, algorithm)
+            elif self._signing_key is not None:
+                self._verification_key = self._signing_key.public_key()
+            else:
+                raise TokenError(f"{algorithm} needs JWT_PUBLIC_KEY or JWT_PRIVATE_KEY")
+
+    def create(self, subject: Any, expires_delta: Optional[timedelta] = None, **claims) -> str:
+        if self._signing_key is None:
+            raise TokenError("No signing key configured on this node")
+        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=self.expire_minutes))
+        claims.update(exp=expire, sub=str(subject))
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+    def verify(self, token: str) -> dict:
+        claims = self.cache.get(token)
+        if claims is not None:
+            token_verifications_total.inc("cached")
+            return claims
+        try:
+            claims = jwt.decode(token, self._verification_key, algorithms=self._algorithms)
+        except JWTError as exc:
+            token_verifications_total.inc("rejected")
+            raise TokenError(str(exc)) from exc
+        token_verifications_total.inc("verified")
+        exp = claims.get("exp")
+        if exp is not None:
+            self.cache.set(token, claims, exp - time.time())
+        return claims
+
+
+token_service = TokenService(
+    settings.ALGORITHM,
+    LRUCache(maxsize=settings.TOKEN_CACHE_SIZE),
+    secret_key=settings.SECRET_KEY,
+    private_key=settings.JWT_PRIVATE_KEY,
+    public_key=settings.JWT_PUBLIC_KEY,
+    expire_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import engine, replica_engines, replica_router
+from app.models.user import User
+from app.services import authorization
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = Path(__file__).resolve().parents[2] / "alembic"
+
+
+def migration_head() -> Optional[str]:
+    """
+    Head revision of the migrations shipped with this build, read from the
+    alembic directory without touching the database.
+    """
+    return ScriptDirectory(str(MIGRATIONS_PATH)).get_current_head()
+
+
+async def schema_revision(conn) -> Optional[str]:
+    try:
+        return await conn.scalar(text("SELECT version_num FROM alembic_version"))
+    except DBAPIError:
+        # No alembic_version table: the database was never migrated.
+        return None
+
+
+async def _warm_connection(db_engine: AsyncEngine) -> None:
+    """
+    Run the statements every authenticated request issues, so asyncpg has
+    them prepared on this connection before traffic arrives.
+    """
+    async with AsyncSession(db_engine) as db:
+        await db.execute(select(User).where(User.email == ""))
+        await authorization.owned_allocation(db, 0, 0)
+        await authorization.owned_asset(db, 0, 0)
+
+
+async def warm_pool(db_engine: AsyncEngine, connections: int) -> None:
+    """
+    Open `connections` pooled connections at once and warm each of them.
+    They all go back to the pool when done.
+    """
+    if not hasattr(db_engine.pool, "checkedout"):
+        # External pooler: nothing is kept between requests.
+        connections = 1
+    await asyncio.gather(*(_warm_connection(db_engine) for _ in range(connections)))
+
+
+class Boot:
+    """
+    Startup readiness: the schema must be at the migration head and the
+    primary pool warm. Workers are live as soon as they serve requests;
+    `/readyz` retries a failed boot, so a worker started before migrations
+    ran becomes ready once they have, without a restart.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.expected_revision: Optional[str] = None
+        self.schema_revision: Optional[str] = None
+        self.pool_warm = False
+        self.time_to_ready_seconds = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.pool_warm and self.schema_revision == self.expected_revision
+
+    async def run(self) -> bool:
+        async with self._lock:
+            if self.ready:
+                return True
+            if self.expected_revision is None:
+                self.expected_revision = migration_head()
+            try:
+                async with engine.connect() as conn:
+                    self.schema_revision = await schema_revision(conn)
+                if self.schema_revision != self.expected_revision:
+                    logger.error(
+                        "Database schema is at %s, expected %s; run `alembic upgrade head`",
+                        self.schema_revision, self.expected_revision,
+                    )
+                    return False
+                if not self.pool_warm:
+                    await warm_pool(engine, settings.DB_POOL_SIZE)
+                    for replica in replica_engines:
+                        try:
+                            await warm_pool(replica, settings.DB_POOL_SIZE)
+                        except (OSError, DBAPIError):
+                            logger.warning("Replica %s unavailable during warm-up", replica.url.host)
+                            replica_router.mark_down(replica)
+                    self.pool_warm = True
+            except (OSError, DBAPIError):
+                logger.exception("Database unavailable during boot")
+                return False
+            self.time_to_ready_seconds = time.perf_counter() - self.started
+            logger.info("Ready in %.3fs at schema %s", self.time_to_ready_seconds, self.schema_revision)
+            return True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "schema_revision": self.schema_revision,
+            "expected_revision": self.expected_revision,
+            "pool_warm": self.pool_warm,
+            "time_to_ready_seconds": self.time_to_ready_seconds,
+        }
+
+
+boot = Boot()
+
+registry.gauge("boot_ready", "1 once the schema is at head and the pool is warm.").set_function(
+    lambda: 1 if boot.ready else 0
+)
+registry.gauge("boot_time_to_ready_seconds", "Seconds from process start to ready.").set_function(
+    lambda: boot.time_to_ready_seconds
+)
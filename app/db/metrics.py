@@ -0,0 +1,69 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import current_request_stats, db_query_duration_seconds, registry
+
+pool_checkouts_total = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",)
+)
+pool_connections_created_total = registry.counter(
+    "db_pool_connections_created_total", "New database connections opened by the pool.", ("engine",)
+)
+pool_saturated_checkouts_total = registry.counter(
+    "db_pool_saturated_checkouts_total",
+    "Checkouts that left the pool fully used, so the next checkout has to wait.",
+    ("engine",),
+)
+pool_size = registry.gauge("db_pool_size", "Configured pool size.", ("engine",))
+pool_checked_out = registry.gauge("db_pool_checked_out", "Connections currently checked out.", ("engine",))
+pool_checked_in = registry.gauge("db_pool_checked_in", "Idle connections in the pool.", ("engine",))
+pool_overflow = registry.gauge("db_pool_overflow", "Connections open beyond the pool size.", ("engine",))
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Attach query timing and pool metrics to an engine.
+    """
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_query_duration_seconds.observe(elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        pool_connections_created_total.inc(name)
+
+    # Pools without a fixed size (e.g. NullPool) only report counters.
+    max_overflow = getattr(pool, "_max_overflow", -1)
+    limit = pool.size() + max_overflow if hasattr(pool, "checkedout") and max_overflow >= 0 else None
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts_total.inc(name)
+        if limit is not None and pool.checkedout() >= limit:
+            pool_saturated_checkouts_total.inc(name)
+
+    if hasattr(pool, "checkedout"):
+        pool_size.set_function(pool.size, name)
+        pool_checked_out.set_function(pool.checkedout, name)
+        pool_checked_in.set_function(pool.checkedin, name)
+        pool_overflow.set_function(lambda: max(pool.overflow(), 0), name)
@@ -0,0 +1,46 @@
+from typing import Any, List, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def schema_columns(model, schema) -> List[Any]:
+    """
+    The model columns named by a response schema's fields, in field order,
+    for selecting rows that serialize straight to that schema.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def row_dicts(result) -> List[dict]:
+    """
+    The rows of a column query as plain dicts. Zipping each row with the
+    result's keys once skips building a RowMapping per row.
+    """
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+async def insert_returning(db: AsyncSession, model, values: dict) -> Any:
+    """
+    INSERT a row and get the persisted instance back from RETURNING,
+    so no follow-up SELECT is needed once the transaction commits.
+    """
+    result = await db.execute(insert(model).values(**values).returning(model))
+    return result.scalar_one()
+
+
+async def update_returning(db: AsyncSession, model, where, values: dict) -> Optional[Any]:
+    """
+    UPDATE the row(s) matched by `where` and return the first updated
+    instance, or None when nothing matched. Values may be SQL expressions,
+    e.g. Vault.total_lockers + 1.
+    """
+    result = await db.execute(
+        update(model)
+        .where(*where)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return result.scalars().first()
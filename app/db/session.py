@@ -1,9 +1,227 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import hashlib
+import hmac
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+from uuid import uuid4
 
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.db.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+def engine_options() -> dict:
+    """
+    Keyword arguments for create_async_engine built from Settings.
+    """
+    if settings.DB_EXTERNAL_POOLER:
+        # PgBouncer in transaction mode: pooling happens outside the process,
+        # and prepared statements cannot be reused across server connections.
+        # Startup parameters such as statement_timeout or random_page_cost
+        # are rejected by the pooler, so set those on the database role instead.
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+                "timeout": settings.DB_CONNECT_TIMEOUT,
+            },
+        }
+
+    connect_args = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "timeout": settings.DB_CONNECT_TIMEOUT,
+    }
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if settings.DB_RANDOM_PAGE_COST is not None:
+        server_settings["random_page_cost"] = str(settings.DB_RANDOM_PAGE_COST)
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
 
-engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options())
+instrument_engine(engine)
+# Instances stay loaded after commit so handlers can return them without a refresh.
 SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for a read-only session: a healthy replica chosen
+    round-robin or by fewest checked-out connections, then the primary.
+    A replica that fails to connect is skipped for DB_REPLICA_RETRY_SECONDS.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], strategy: str, retry_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until = {}
+
+    def _healthy(self) -> List[AsyncEngine]:
+        now = time.monotonic()
+        return [e for e in self.replicas if self._down_until.get(e, 0) <= now]
+
+    def candidates(self) -> List[AsyncEngine]:
+        replicas = self._healthy()
+        if replicas:
+            if self.strategy == "least_loaded":
+                replicas.sort(key=lambda e: getattr(e.pool, "checkedout", lambda: 0)())
+            else:
+                start = next(self._counter) % len(replicas)
+                replicas = replicas[start:] + replicas[:start]
+        return replicas + [self.primary]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        self._down_until[engine] = time.monotonic() + self.retry_seconds
+
+
+replica_engines = [
+    create_async_engine(url, **engine_options()) for url in settings.DATABASE_REPLICA_URLS
+]
+for index, replica in enumerate(replica_engines):
+    instrument_engine(replica, f"replica{index}")
+
+replica_router = ReplicaRouter(
+    engine, replica_engines, settings.DB_REPLICA_STRATEGY, settings.DB_REPLICA_RETRY_SECONDS
 )
+_read_sessions = {
+    e: sessionmaker(autocommit=False, autoflush=False, bind=e, class_=AsyncSession, expire_on_commit=False)
+    for e in replica_engines
+}
+
+# Writer keys (see app.api.deps) that committed recently and must read from
+# the primary. This only covers requests served by the same worker process;
+# the signed marker below carries the window to other workers and pods.
+recent_writers = LRUCache(maxsize=100000)
+
+
+class ReadYourWrites:
+    """
+    Per-request read-your-writes state, set up by ReadYourWritesMiddleware:
+    `primary_until` comes from the marker the client sent back, `wrote` is
+    set when one of the request's sessions commits a write.
+    """
+
+    __slots__ = ("primary_until", "wrote")
+
+    def __init__(self, primary_until: float = 0.0):
+        self.primary_until = primary_until
+        self.wrote = False
+
+
+current_read_your_writes: ContextVar[Optional[ReadYourWrites]] = ContextVar(
+    "current_read_your_writes", default=None
+)
+
+
+def _marker_signature(until: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), until.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def sign_primary_until(until: float) -> str:
+    """
+    Marker handed to a client after a write: the wall-clock time until
+    which its reads go to the primary, signed so it cannot be extended.
+    """
+    value = str(int(until * 1000))
+    return f"{value}.{_marker_signature(value)}"
+
+
+def primary_until(marker: Optional[str]) -> float:
+    """
+    Expiry of a marker from sign_primary_until, or 0 if it is missing or forged.
+    """
+    if not marker:
+        return 0.0
+    value, _, signature = marker.partition(".")
+    if not value.isdigit() or not hmac.compare_digest(signature, _marker_signature(value)):
+        return 0.0
+    return int(value) / 1000
+
+
+def reads_from_primary(writer_key: Optional[str] = None) -> bool:
+    """
+    True while the caller is inside its read-your-writes window, either
+    recorded by this worker or carried by the client's marker.
+    """
+    state = current_read_your_writes.get()
+    if state is not None and (state.wrote or state.primary_until > time.time()):
+        return True
+    return writer_key is not None and recent_writers.get(writer_key) is not None
+
+
+async def open_read_session(writer_key: Optional[str] = None) -> AsyncSession:
+    """
+    Open a session for read-only work. Callers that wrote within the
+    read-your-writes window get the primary; otherwise the first replica
+    that accepts a connection is used, falling back to the primary.
+    """
+    if not reads_from_primary(writer_key):
+        for candidate in replica_router.candidates():
+            if candidate is engine:
+                break
+            session = _read_sessions[candidate]()
+            try:
+                await session.connection()
+                return session
+            except (OSError, DBAPIError):
+                logger.warning("Replica %s unavailable, trying next", candidate.url.host)
+                await session.close()
+                replica_router.mark_down(candidate)
+    return SessionLocal()
+
+
+@event.listens_for(Session, "after_flush")
+def _flagged_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flagged_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_writer(session):
+    if not session.info.pop("wrote", False):
+        return
+    writer_key = session.info.get("writer_key")
+    if writer_key:
+        recent_writers.set(writer_key, True, settings.DB_READ_YOUR_WRITES_SECONDS)
+    state = current_read_your_writes.get()
+    if state is not None:
+        state.wrote = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("wrote", None)
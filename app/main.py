@@ -1,7 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, status
+from app.api.middleware import MetricsMiddleware, RateLimitMiddleware, ReadYourWritesMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.v1.api import api_router
-from app.db.base import Base
-from app.db.session import engine
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.security import hashing_executor
+from app.db.boot import boot
+from app.services.access_log import access_log_writer
+from app.services.analytics import analytics_rollup
+from app.services.expiry_sweeper import expiry_sweeper
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -9,18 +16,55 @@ load_dotenv()
 
 app = FastAPI(
     title="Vault Management System API",
-    openapi_url="/api/v1/openapi.json"
+    openapi_url="/api/v1/openapi.json",
+    default_response_class=FastJSONResponse
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(api_router, prefix="/api/v1")
 
 @app.on_event("startup")
 async def startup_event():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await boot.run()
+    access_log_writer.start()
+    if settings.EXPIRY_SWEEPER_ENABLED:
+        expiry_sweeper.start()
+    if settings.ANALYTICS_ROLLUP_ENABLED:
+        analytics_rollup.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await expiry_sweeper.stop()
+    await analytics_rollup.stop()
+    await access_log_writer.stop()
+    hashing_executor.shutdown()
 
 @app.get("/")
 async def root():
     return {"message": "Vault Management System API"}
 
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """
+    Liveness: the process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """
+    Readiness: the schema is at the migration head and the pool is warm.
+    """
+    ready = boot.ready or await boot.run()
+    return FastJSONResponse(
+        boot.status(),
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -6,3 +6,11 @@ from .asset import Asset
 from .vault_transaction import VaultTransaction
 from .payment import Payment
 from .access_log import AccessLog
+from .vault_availability import VaultAvailability
+from .idempotency_key import IdempotencyKey
+from .user_session import UserSession
+from .vault_occupancy_daily import VaultOccupancyDaily
+from .vault_revenue_daily import VaultRevenueDaily
+from .allocation_duration_daily import AllocationDurationDaily
+from .allocation_duration_stale_day import AllocationDurationStaleDay
+from .billing_run import BillingRun
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Date, Float, ForeignKey
+
+from app.db.base import Base
+
+class AllocationDurationDaily(Base):
+    """
+    Allocations that ended per vault and day (by expiry date) and their
+    summed duration, maintained by the analytics rollup job.
+    """
+    __tablename__ = "allocation_duration_daily"
+
+    day = Column(Date, primary_key=True)
+    vault_id = Column(Integer, ForeignKey("vaults.id"), primary_key=True)
+    allocations = Column(Integer, nullable=False)
+    total_seconds = Column(Float, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Date
+
+from app.db.base import Base
+
+class AllocationDurationStaleDay(Base):
+    """
+    Expiry days whose allocation_duration_daily rows are out of date because
+    an allocation ending on that day was expired or revived after the day was
+    rolled up. Consumed by the next analytics rollup.
+    """
+    __tablename__ = "allocation_duration_stale_days"
+
+    day = Column(Date, primary_key=True)
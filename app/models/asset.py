@@ -7,7 +7,7 @@ class Asset(Base):
     __tablename__ = "assets"
 
     id = Column(Integer, primary_key=True, index=True)
-    allocation_id = Column(Integer, ForeignKey("locker_allocations.id"), nullable=False)
+    allocation_id = Column(Integer, ForeignKey("locker_allocations.id"), nullable=False, index=True)
     asset_name = Column(String, nullable=False)
     estimated_value = Column(Float, nullable=False)
     type = Column(Enum("JEWELRY", "DOCUMENT", "OTHER", name="asset_type"), nullable=False)
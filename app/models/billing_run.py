@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Enum, Float, DateTime
+import datetime
+
+from app.db.base import Base
+
+class BillingRun(Base):
+    """
+    One billing run started from the API; it runs in the background and
+    records its report here when it finishes.
+    """
+    __tablename__ = "billing_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False)
+    status = Column(Enum("RUNNING", "COMPLETED", "FAILED", name="billing_run_status"), nullable=False)
+    started_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    vaults = Column(Integer, nullable=True)
+    allocations = Column(Integer, nullable=True)
+    created = Column(Integer, nullable=True)
+    seconds = Column(Float, nullable=True)
+    rows_per_second = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
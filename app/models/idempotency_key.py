@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+import datetime
+
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied Idempotency-Key and the response it produced.
+    status_code is NULL while the original request is still running.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
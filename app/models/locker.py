@@ -1,13 +1,25 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Float, Index, text
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
 class Locker(Base):
     __tablename__ = "lockers"
+    __table_args__ = (
+        Index(
+            "ix_lockers_available_vault_id_size",
+            "vault_id", "size", "id",
+            postgresql_where=text("status = 'AVAILABLE'"),
+        ),
+        Index(
+            "ix_lockers_available_size",
+            "size", "id",
+            postgresql_where=text("status = 'AVAILABLE'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    vault_id = Column(Integer, ForeignKey("vaults.id"), nullable=False)
+    vault_id = Column(Integer, ForeignKey("vaults.id"), nullable=False, index=True)
     locker_number = Column(String, nullable=False)
     size = Column(Enum("SMALL", "MEDIUM", "LARGE", name="locker_size"), nullable=False)
     status = Column(Enum("AVAILABLE", "ALLOCATED", "MAINTENANCE", name="locker_status"), nullable=False)
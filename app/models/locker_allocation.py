@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Enum, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 import datetime
 
@@ -6,9 +6,22 @@ from app.db.base import Base
 
 class LockerAllocation(Base):
     __tablename__ = "locker_allocations"
+    __table_args__ = (
+        Index("ix_locker_allocations_user_id_status", "user_id", "status"),
+        Index(
+            "ix_locker_allocations_active_expiry_date",
+            "expiry_date",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        Index(
+            "ix_locker_allocations_ended_expiry_date",
+            "expiry_date",
+            postgresql_where=text("status <> 'ACTIVE'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    locker_id = Column(Integer, ForeignKey("lockers.id"), nullable=False)
+    locker_id = Column(Integer, ForeignKey("lockers.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     allocated_at = Column(DateTime, default=datetime.datetime.utcnow)
     expiry_date = Column(DateTime, nullable=False)
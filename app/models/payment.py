@@ -1,14 +1,21 @@
-from sqlalchemy import Column, Integer, Enum, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Float, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
+import datetime
 
 from app.db.base import Base
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # At most one invoice per allocation and period; NULL for ad-hoc payments.
+        UniqueConstraint("allocation_id", "billing_period", name="uq_payments_allocation_id_billing_period"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    allocation_id = Column(Integer, ForeignKey("locker_allocations.id"), nullable=False)
+    allocation_id = Column(Integer, ForeignKey("locker_allocations.id"), nullable=False, index=True)
     amount = Column(Float, nullable=False)
     status = Column(Enum("SUCCESSFUL", "FAILED", "PENDING", name="payment_status"), nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    billing_period = Column(String(7), nullable=True)
 
     allocation = relationship("LockerAllocation", back_populates="payments")
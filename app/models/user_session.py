@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+import datetime
+
+from app.db.base import Base
+
+class UserSession(Base):
+    """
+    A refresh token issued at login. Only the SHA-256 of the token is
+    stored; each refresh revokes the row and issues a new one.
+    """
+    __tablename__ = "user_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked = Column(Boolean, default=False, nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Enum, ForeignKey
+
+from app.db.base import Base
+
+class VaultAvailability(Base):
+    """
+    Locker counts per vault, size and status, kept in step with the lockers
+    table by the write paths and rebuilt by the reconciliation job.
+    """
+    __tablename__ = "vault_availability"
+
+    vault_id = Column(Integer, ForeignKey("vaults.id"), primary_key=True)
+    size = Column(Enum("SMALL", "MEDIUM", "LARGE", name="locker_size"), primary_key=True)
+    status = Column(Enum("AVAILABLE", "ALLOCATED", "MAINTENANCE", name="locker_status"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
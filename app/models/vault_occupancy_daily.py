@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Date, Enum, ForeignKey
+
+from app.db.base import Base
+
+class VaultOccupancyDaily(Base):
+    """
+    Daily snapshot of locker counts per vault and size, taken from
+    vault_availability by the analytics rollup job.
+    """
+    __tablename__ = "vault_occupancy_daily"
+
+    day = Column(Date, primary_key=True)
+    vault_id = Column(Integer, ForeignKey("vaults.id"), primary_key=True)
+    size = Column(Enum("SMALL", "MEDIUM", "LARGE", name="locker_size"), primary_key=True)
+    allocated = Column(Integer, nullable=False)
+    total = Column(Integer, nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Date, Float, ForeignKey
+
+from app.db.base import Base
+
+class VaultRevenueDaily(Base):
+    """
+    Successful payments per vault and day, maintained by the analytics rollup job.
+    """
+    __tablename__ = "vault_revenue_daily"
+
+    day = Column(Date, primary_key=True)
+    vault_id = Column(Integer, ForeignKey("vaults.id"), primary_key=True)
+    payments = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
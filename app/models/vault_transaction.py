@@ -8,8 +8,8 @@ class VaultTransaction(Base):
     __tablename__ = "vault_transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    allocation_id = Column(Integer, ForeignKey("locker_allocations.id"), nullable=False)
+    allocation_id = Column(Integer, ForeignKey("locker_allocations.id"), nullable=False, index=True)
     type = Column(Enum("DEPOSIT", "WITHDRAW", name="transaction_type"), nullable=False)
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow, index=True)
 
     allocation = relationship("LockerAllocation", back_populates="transactions")
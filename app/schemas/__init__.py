@@ -1,8 +1,10 @@
 from .user import User, UserCreate
-from .vault import Vault, VaultCreate
-from .locker import Locker, LockerCreate
-from .token import Token, TokenData
+from .vault import Vault, VaultCreate, VaultAvailability, AvailabilityDrift
+from .locker import Locker, LockerCreate, LockerBulkItem, LockerBulkResult
+from .token import Token, TokenData, RefreshRequest, SessionsRevoked
 from .locker_allocation import LockerAllocation, LockerAllocationCreate
-from .asset import Asset, AssetCreate
+from .asset import Asset, AssetCreate, AssetBatchItem, AssetBatchCreate, AssetBatchWithdraw
 from .transaction import VaultTransaction, VaultTransactionCreate
 from .payment import Payment, PaymentCreate
+from .billing import BillingRun
+from .analytics import OccupancyPoint, MonthlyRevenue, AllocationDuration
@@ -0,0 +1,21 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+class OccupancyPoint(BaseModel):
+    day: date
+    vault_id: int
+    size: str
+    allocated: int
+    total: int
+
+class MonthlyRevenue(BaseModel):
+    month: str
+    vault_id: int
+    payments: int
+    revenue: float
+
+class AllocationDuration(BaseModel):
+    vault_id: int
+    allocations: int
+    average_days: float
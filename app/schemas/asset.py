@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 
 class AssetBase(BaseModel):
     allocation_id: int
@@ -23,3 +23,22 @@ class AssetInDBBase(AssetBase):
 
 class Asset(AssetInDBBase):
     pass
+
+class AssetBatchItem(BaseModel):
+    asset_name: str
+    estimated_value: float
+    type: str
+
+    @field_validator("type")
+    @classmethod
+    def normalize_type(cls, value: str) -> str:
+        value = value.upper()
+        if value not in ("JEWELRY", "DOCUMENT", "OTHER"):
+            raise ValueError("type must be one of JEWELRY, DOCUMENT, OTHER")
+        return value
+
+class AssetBatchCreate(BaseModel):
+    assets: List[AssetBatchItem] = Field(..., min_length=1)
+
+class AssetBatchWithdraw(BaseModel):
+    asset_ids: List[int] = Field(..., min_length=1)
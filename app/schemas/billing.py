@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+class BillingRun(BaseModel):
+    id: int
+    period: str
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    vaults: Optional[int] = None
+    allocations: Optional[int] = None
+    created: Optional[int] = None
+    seconds: Optional[float] = None
+    rows_per_second: Optional[float] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
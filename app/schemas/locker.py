@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 
 class LockerBase(BaseModel):
@@ -26,3 +26,22 @@ class LockerInDBBase(LockerBase):
 
 class Locker(LockerInDBBase):
     pass
+
+class LockerBulkItem(BaseModel):
+    locker_number: str
+    size: str
+    monthly_rent: float
+
+    @field_validator("size")
+    @classmethod
+    def normalize_size(cls, value: str) -> str:
+        value = value.upper()
+        if value not in ("SMALL", "MEDIUM", "LARGE"):
+            raise ValueError("size must be one of SMALL, MEDIUM, LARGE")
+        return value
+
+class LockerBulkResult(BaseModel):
+    vault_id: int
+    created: int
+    total_lockers: int
+    available_lockers: int
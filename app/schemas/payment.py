@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import datetime
 
 class PaymentBase(BaseModel):
     allocation_id: int
@@ -18,6 +19,7 @@ class PaymentUpdate(BaseModel):
 
 class PaymentInDBBase(PaymentBase):
     id: int
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
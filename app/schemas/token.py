@@ -1,8 +1,16 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class SessionsRevoked(BaseModel):
+    revoked: int
 
 class TokenData(BaseModel):
     email: str | None = None
@@ -24,3 +24,19 @@ class VaultInDBBase(VaultBase):
 
 class Vault(VaultInDBBase):
     pass
+
+class VaultAvailability(BaseModel):
+    vault_id: int
+    size: str
+    status: str
+    count: int
+
+    class Config:
+        from_attributes = True
+
+class AvailabilityDrift(BaseModel):
+    vault_id: int
+    size: str
+    status: str
+    expected: int
+    recorded: int
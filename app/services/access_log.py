@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.access_log import AccessLog
+
+logger = logging.getLogger(__name__)
+
+access_log_events_total = registry.counter(
+    "access_log_events_total",
+    "Access log events by outcome (enqueued, dropped, written, failed).",
+    ("outcome",),
+)
+
+_STOP = object()
+_COLUMNS = ("locker_id", "user_id", "access_type", "timestamp")
+
+
+class AccessLogWriter:
+    """
+    Records locker accesses off the request path. Handlers call `record`,
+    which only appends to a bounded in-process queue; a background task
+    writes the queue out with COPY whenever `batch_size` events are waiting
+    or `flush_interval` seconds have passed since the first.
+    When the queue is full new events are dropped and counted rather than
+    slowing the request down.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, locker_id: int, user_id: int, access_type: str, count: int = 1) -> bool:
+        """
+        Queue `count` identical events, one per asset handled. Returns False
+        if any had to be dropped.
+        """
+        event = (locker_id, user_id, access_type, datetime.utcnow())
+        for enqueued in range(count):
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                access_log_events_total.inc("enqueued", amount=enqueued)
+                access_log_events_total.inc("dropped", amount=count - enqueued)
+                return False
+        access_log_events_total.inc("enqueued", amount=count)
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="access-log-writer")
+
+    async def stop(self) -> None:
+        """
+        Write out everything already queued, then stop the writer.
+        """
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _write(self, batch: List[tuple]) -> None:
+        try:
+            async with SessionLocal() as db:
+                # COPY through the asyncpg connection costs about a third of
+                # the client CPU per row that an executemany INSERT does.
+                conn = await db.connection()
+                driver = (await conn.get_raw_connection()).driver_connection
+                await driver.copy_records_to_table(AccessLog.__tablename__, records=batch, columns=_COLUMNS)
+                await db.commit()
+        except Exception:
+            access_log_events_total.inc("failed", amount=len(batch))
+            logger.exception("Failed to write %d access log events", len(batch))
+        else:
+            access_log_events_total.inc("written", amount=len(batch))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+        # Drain anything queued after the stop marker.
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not _STOP:
+                    batch.append(item)
+            if batch:
+                await self._write(batch)
+
+
+access_log_writer = AccessLogWriter(
+    max_queue=settings.ACCESS_LOG_QUEUE_SIZE,
+    batch_size=settings.ACCESS_LOG_BATCH_SIZE,
+    flush_interval=settings.ACCESS_LOG_FLUSH_INTERVAL_SECONDS,
+)
+
+registry.gauge("access_log_queue_depth", "Access log events waiting to be written.").set_function(
+    access_log_writer.queue_depth
+)
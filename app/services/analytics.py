@@ -0,0 +1,169 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, case, cast, delete, extract, func, insert, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.allocation_duration_daily import AllocationDurationDaily
+from app.models.allocation_duration_stale_day import AllocationDurationStaleDay
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.models.payment import Payment
+from app.models.vault_availability import VaultAvailability
+from app.models.vault_occupancy_daily import VaultOccupancyDaily
+from app.models.vault_revenue_daily import VaultRevenueDaily
+from app.services.jobs import LeaderElectedJob
+
+logger = logging.getLogger(__name__)
+
+# Days before the newest rolled-up day that are recomputed on every run, since
+# the newest day was rolled up while it was still in progress. Allocations that
+# end or are revived on older days are caught by mark_durations_stale instead.
+RECOMPUTE_DAYS = 1
+
+analytics_rollup_rows_total = registry.counter(
+    "analytics_rollup_rows_total", "Rollup rows written by table.", ("table",)
+)
+
+
+async def _window_start(db: AsyncSession, rollup_day, source_first, *criteria) -> Optional[date]:
+    """
+    First day to recompute: shortly before the newest rolled-up day, or the
+    first day with source data when the rollup is still empty.
+    """
+    last = await db.scalar(select(func.max(rollup_day)))
+    if last is not None:
+        return last - timedelta(days=RECOMPUTE_DAYS)
+    first = await db.scalar(select(func.min(source_first)).where(*criteria))
+    return first.date() if first is not None else None
+
+
+async def mark_durations_stale(db: AsyncSession, days) -> None:
+    """
+    Have the next rollup recompute allocation durations for these expiry
+    days. Call it in the transaction that changes the allocations.
+    """
+    rows = [{"day": day} for day in sorted(set(days))]
+    if rows:
+        await db.execute(pg_insert(AllocationDurationStaleDay).values(rows).on_conflict_do_nothing())
+
+
+async def _replace(db: AsyncSession, model, start: date, source) -> int:
+    await db.execute(
+        delete(model).where(model.day >= start).execution_options(synchronize_session=False)
+    )
+    result = await db.execute(
+        insert(model).from_select([c.name for c in source.selected_columns], source)
+    )
+    await db.commit()
+    analytics_rollup_rows_total.inc(model.__tablename__, amount=max(result.rowcount, 0))
+    return result.rowcount
+
+
+async def rollup_occupancy(db: AsyncSession, today: date) -> int:
+    """
+    Snapshot today's locker counts from the vault_availability summary.
+    """
+    source = (
+        select(
+            literal(today, Date).label("day"),
+            VaultAvailability.vault_id.label("vault_id"),
+            VaultAvailability.size.label("size"),
+            func.sum(case((VaultAvailability.status == "ALLOCATED", VaultAvailability.count), else_=0)).label("allocated"),
+            func.sum(VaultAvailability.count).label("total"),
+        )
+        .group_by(VaultAvailability.vault_id, VaultAvailability.size)
+    )
+    return await _replace(db, VaultOccupancyDaily, today, source)
+
+
+async def rollup_revenue(db: AsyncSession) -> int:
+    """
+    Recompute successful payment totals per vault for the recent days.
+    """
+    start = await _window_start(
+        db, VaultRevenueDaily.day, Payment.created_at, Payment.status == "SUCCESSFUL"
+    )
+    if start is None:
+        return 0
+    day = cast(Payment.created_at, Date)
+    source = (
+        select(
+            day.label("day"),
+            Locker.vault_id.label("vault_id"),
+            func.count().label("payments"),
+            func.sum(Payment.amount).label("revenue"),
+        )
+        .join(LockerAllocation, LockerAllocation.id == Payment.allocation_id)
+        .join(Locker, Locker.id == LockerAllocation.locker_id)
+        .where(Payment.status == "SUCCESSFUL", Payment.created_at >= datetime.combine(start, time.min))
+        .group_by(day, Locker.vault_id)
+    )
+    return await _replace(db, VaultRevenueDaily, start, source)
+
+
+async def rollup_allocation_durations(db: AsyncSession) -> int:
+    """
+    Recompute ended allocations and their summed duration per vault, bucketed
+    by expiry date, from the earlier of the recent days and the earliest day
+    marked stale since the last run.
+    """
+    ended = LockerAllocation.status != "ACTIVE"
+    # Taken in the same transaction as the rebuild; marks committed after
+    # this point are left for the next run.
+    result = await db.execute(delete(AllocationDurationStaleDay).returning(AllocationDurationStaleDay.day))
+    stale = result.scalars().all()
+    start = await _window_start(db, AllocationDurationDaily.day, LockerAllocation.expiry_date, ended)
+    start = min([day for day in (start, *stale) if day is not None], default=None)
+    if start is None:
+        return 0
+    day = cast(LockerAllocation.expiry_date, Date)
+    source = (
+        select(
+            day.label("day"),
+            Locker.vault_id.label("vault_id"),
+            func.count().label("allocations"),
+            func.sum(extract("epoch", LockerAllocation.expiry_date - LockerAllocation.allocated_at)).label("total_seconds"),
+        )
+        .join(Locker, Locker.id == LockerAllocation.locker_id)
+        .where(ended, LockerAllocation.expiry_date >= datetime.combine(start, time.min))
+        .group_by(day, Locker.vault_id)
+    )
+    return await _replace(db, AllocationDurationDaily, start, source)
+
+
+class AnalyticsRollup(LeaderElectedJob):
+    """
+    Periodically refreshes the daily rollup tables behind the analytics endpoints.
+    """
+
+    name = "analytics-rollup"
+    lock_key = 0x5641554C0002
+
+    def __init__(self, interval: float):
+        super().__init__(interval)
+        self.last_run_rows = 0
+
+    async def run_once(self) -> None:
+        async with SessionLocal() as db:
+            rows = await rollup_occupancy(db, datetime.utcnow().date())
+            rows += await rollup_revenue(db)
+            rows += await rollup_allocation_durations(db)
+        self.last_run_rows = rows
+        logger.debug("Analytics rollup wrote %d rows", rows)
+
+
+analytics_rollup = AnalyticsRollup(interval=settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS)
+
+registry.gauge("analytics_rollup_last_run_rows", "Rows written by the last analytics rollup.").set_function(
+    lambda: analytics_rollup.last_run_rows
+)
+registry.gauge("analytics_rollup_last_run_seconds", "Duration of the last analytics rollup.").set_function(
+    lambda: analytics_rollup.last_run_seconds
+)
@@ -0,0 +1,60 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.asset import Asset
+from app.models.locker_allocation import LockerAllocation
+
+# Ownership checks resolve with one primary-key lookup filtered on the
+# owner and return only the columns callers act on, instead of loading
+# the allocation and its User.
+
+
+async def owned_allocation(db: AsyncSession, allocation_id: int, user_id: int) -> Optional[Row]:
+    """
+    (id, locker_id, status, expiry_date) of the allocation if it belongs to user_id.
+    """
+    result = await db.execute(
+        select(
+            LockerAllocation.id,
+            LockerAllocation.locker_id,
+            LockerAllocation.status,
+            LockerAllocation.expiry_date,
+        ).where(LockerAllocation.id == allocation_id, LockerAllocation.user_id == user_id)
+    )
+    return result.first()
+
+
+async def owned_asset(db: AsyncSession, asset_id: int, user_id: int) -> Optional[Row]:
+    """
+    (id, allocation_id, locker_id, status) of the asset and its allocation
+    if the allocation belongs to user_id.
+    """
+    result = await db.execute(
+        select(
+            Asset.id,
+            Asset.allocation_id,
+            LockerAllocation.locker_id,
+            LockerAllocation.status,
+        )
+        .join(LockerAllocation, LockerAllocation.id == Asset.allocation_id)
+        .where(Asset.id == asset_id, LockerAllocation.user_id == user_id)
+    )
+    return result.first()
+
+
+async def require_allocation(db: AsyncSession, allocation_id: int, user_id: int) -> Row:
+    allocation = await owned_allocation(db, allocation_id, user_id)
+    if allocation is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Locker allocation not found for current user")
+    return allocation
+
+
+async def require_asset(db: AsyncSession, asset_id: int, user_id: int) -> Row:
+    asset = await owned_asset(db, asset_id, user_id)
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found for current user")
+    return asset
@@ -0,0 +1,94 @@
+from collections import Counter
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.locker import Locker
+from app.models.vault_availability import VaultAvailability
+
+
+async def apply_changes(db: AsyncSession, changes: Counter) -> None:
+    """
+    Add (vault_id, size, status) -> count deltas to the summary in one multi-row upsert. Rows are
+    written in key order so concurrent writers lock them consistently.
+    """
+    rows = [
+        {"vault_id": vault_id, "size": size, "status": locker_status, "count": delta}
+        for (vault_id, size, locker_status), delta in sorted(changes.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = insert(VaultAvailability).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[VaultAvailability.vault_id, VaultAvailability.size, VaultAvailability.status],
+            set_={"count": VaultAvailability.count + stmt.excluded.count},
+        )
+    )
+
+
+async def record_transition(
+    db: AsyncSession, vault_id: int, size: str, from_status: str = None, to_status: str = None, n: int = 1
+) -> None:
+    """
+    Record n lockers of one vault and size moving between statuses.
+    Use from_status=None for new lockers.
+    """
+    changes = Counter()
+    if from_status:
+        changes[(vault_id, size, from_status)] -= n
+    if to_status:
+        changes[(vault_id, size, to_status)] += n
+    await apply_changes(db, changes)
+
+
+async def _actual_counts(db: AsyncSession) -> Counter:
+    result = await db.execute(
+        select(Locker.vault_id, Locker.size, Locker.status, func.count())
+        .group_by(Locker.vault_id, Locker.size, Locker.status)
+    )
+    return Counter({(vault_id, size, locker_status): count for vault_id, size, locker_status, count in result.all()})
+
+
+async def _stored_counts(db: AsyncSession) -> Counter:
+    result = await db.execute(
+        select(VaultAvailability.vault_id, VaultAvailability.size, VaultAvailability.status, VaultAvailability.count)
+    )
+    return Counter({(vault_id, size, locker_status): count for vault_id, size, locker_status, count in result.all()})
+
+
+async def reconcile(db: AsyncSession) -> list:
+    """
+    Recompute the summary from the lockers table, correct any rows that
+    drifted and return the drift that was found.
+    """
+    # Both counts come from one snapshot, so a write committing between the
+    # two reads cannot show up as drift. The corrections are deltas: writes
+    # committed after the snapshot changed lockers and the summary together
+    # and are left intact when they are applied in the next transaction.
+    await db.commit()
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    actual = await _actual_counts(db)
+    stored = await _stored_counts(db)
+    await db.commit()
+
+    drift = []
+    corrections = Counter()
+    for key in sorted(set(actual) | set(stored)):
+        if actual[key] != stored[key]:
+            vault_id, size, locker_status = key
+            drift.append({
+                "vault_id": vault_id,
+                "size": size,
+                "status": locker_status,
+                "expected": actual[key],
+                "recorded": stored[key],
+            })
+            corrections[key] = actual[key] - stored[key]
+
+    await apply_changes(db, corrections)
+    await db.commit()
+    return drift
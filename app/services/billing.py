@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import SessionLocal
+from app.models.locker import Locker
+from app.models.billing_run import BillingRun
+from app.models.locker_allocation import LockerAllocation
+from app.models.payment import Payment
+from app.models.vault import Vault
+
+logger = logging.getLogger(__name__)
+
+_PERIOD = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+billing_payments_created_total = registry.counter(
+    "billing_payments_created_total", "PENDING payments created by billing runs."
+)
+
+
+def current_period() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def period_end(period: str) -> datetime:
+    """
+    First instant after the billing period, e.g. 2026-11-01 for "2026-10".
+    """
+    if not _PERIOD.match(period):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Billing period must look like YYYY-MM"
+        )
+    year, month = map(int, period.split("-"))
+    return datetime(year + month // 12, month % 12 + 1, 1)
+
+
+async def bill_vault(db: AsyncSession, vault_id: int, period: str, chunk_size: int) -> tuple[int, int]:
+    """
+    Invoice every active allocation in a vault for `period`, chunk_size
+    allocations per INSERT ... SELECT, committing after each chunk.
+    Allocations already invoiced for the period are skipped by the unique
+    constraint, so an interrupted run can simply be started again.
+    Returns (allocations considered, payments created).
+    """
+    end = period_end(period)
+    now = datetime.utcnow()
+    due = (
+        LockerAllocation.status == "ACTIVE",
+        LockerAllocation.allocated_at < end,
+        Locker.vault_id == vault_id,
+    )
+    considered = created = 0
+    after = 0
+    while True:
+        chunk = (
+            select(LockerAllocation.id)
+            .join(Locker, Locker.id == LockerAllocation.locker_id)
+            .where(*due, LockerAllocation.id > after)
+            .order_by(LockerAllocation.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        upper, n = (await db.execute(select(func.max(chunk.c.id), func.count()).select_from(chunk))).one()
+        if not n:
+            break
+
+        source = (
+            select(
+                LockerAllocation.id,
+                Locker.monthly_rent,
+                literal("PENDING", Payment.status.type),
+                literal(period, Payment.billing_period.type),
+                literal(now, Payment.created_at.type),
+            )
+            .join(Locker, Locker.id == LockerAllocation.locker_id)
+            .where(*due, LockerAllocation.id > after, LockerAllocation.id <= upper)
+        )
+        result = await db.execute(
+            insert(Payment)
+            .from_select(["allocation_id", "amount", "status", "billing_period", "created_at"], source)
+            .on_conflict_do_nothing(index_elements=["allocation_id", "billing_period"])
+            .returning(Payment.id)
+            .execution_options(synchronize_session=False)
+        )
+        inserted = len(result.all())
+        await db.commit()
+
+        considered += n
+        created += inserted
+        billing_payments_created_total.inc(amount=inserted)
+        after = upper
+    return considered, created
+
+
+def _concurrency(requested: int) -> int:
+    """
+    Vaults billed at once. Without an external pooler each one holds a
+    pooled connection, so leave at least one for API traffic and the
+    background jobs.
+    """
+    if settings.DB_EXTERNAL_POOLER or requested < settings.DB_POOL_SIZE:
+        return max(1, requested)
+    capped = max(1, settings.DB_POOL_SIZE - 1)
+    logger.warning("Billing concurrency %d capped to %d by DB_POOL_SIZE=%d", requested, capped, settings.DB_POOL_SIZE)
+    return capped
+
+
+async def run(
+    period: str,
+    concurrency: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> dict:
+    """
+    Bill all vaults for `period`, at most `concurrency` vaults at a time,
+    each on its own session. Returns totals and throughput.
+    """
+    period_end(period)
+    concurrency = _concurrency(concurrency or settings.BILLING_CONCURRENCY)
+    chunk_size = chunk_size or settings.BILLING_CHUNK_SIZE
+    async with SessionLocal() as db:
+        vault_ids = (await db.execute(select(Vault.id).order_by(Vault.id))).scalars().all()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bill(vault_id: int) -> tuple[int, int]:
+        async with semaphore:
+            async with SessionLocal() as db:
+                return await bill_vault(db, vault_id, period, chunk_size)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(bill(vault_id) for vault_id in vault_ids))
+    seconds = time.perf_counter() - started
+
+    considered = sum(n for n, _ in results)
+    created = sum(n for _, n in results)
+    logger.info("Billing run %s: %d payments created for %d allocations in %.1fs", period, created, considered, seconds)
+    return {
+        "period": period,
+        "vaults": len(vault_ids),
+        "allocations": considered,
+        "created": created,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(considered / seconds, 1) if seconds else 0.0,
+    }
+
+
+async def execute(run_id: int, period: str) -> None:
+    """
+    Run the billing for a BillingRun started from the API and record its
+    report, or the error it failed with, on the row.
+    """
+    try:
+        report = await run(period)
+        values = dict(
+            status="COMPLETED",
+            vaults=report["vaults"],
+            allocations=report["allocations"],
+            created=report["created"],
+            seconds=report["seconds"],
+            rows_per_second=report["rows_per_second"],
+        )
+    except Exception as exc:
+        logger.exception("Billing run %d for %s failed", run_id, period)
+        values = dict(status="FAILED", error=str(exc)[:1000])
+    async with SessionLocal() as db:
+        await db.execute(
+            update(BillingRun)
+            .where(BillingRun.id == run_id)
+            .values(finished_at=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
@@ -0,0 +1,140 @@
+import logging
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import Date, any_, bindparam, cast, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.response_cache import response_cache
+from app.db.session import SessionLocal
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.models.vault import Vault
+from app.services import analytics, availability, idempotency, sessions
+from app.services.jobs import LeaderElectedJob
+
+logger = logging.getLogger(__name__)
+
+_vaults = Vault.__table__
+_release_vault_slots = (
+    update(_vaults)
+    .where(_vaults.c.id == bindparam("b_vault_id"))
+    .values(available_lockers=_vaults.c.available_lockers + bindparam("b_freed"))
+)
+
+
+async def expire_batch(db: AsyncSession, batch_size: int, now: datetime) -> int:
+    """
+    Expire up to batch_size overdue allocations, free their lockers and
+    return the slots to the vault counters, all in one transaction.
+    Rows locked by other transactions are skipped until the next batch.
+    """
+    due = (
+        select(LockerAllocation.id)
+        .where(LockerAllocation.status == "ACTIVE", LockerAllocation.expiry_date < now)
+        .order_by(LockerAllocation.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    # `= ANY(ARRAY(...))` rather than IN: the batch is matched through the
+    # primary key instead of a hash semi join over the whole table.
+    result = await db.execute(
+        update(LockerAllocation)
+        .where(LockerAllocation.id == any_(func.array(due.scalar_subquery())))
+        .values(status="EXPIRED")
+        .returning(LockerAllocation.locker_id, cast(LockerAllocation.expiry_date, Date))
+        .execution_options(synchronize_session=False)
+    )
+    expired = result.all()
+    if not expired:
+        await db.commit()
+        return 0
+    locker_ids = [locker_id for locker_id, _ in expired]
+    # A lagging sweep ends allocations on days the rollup has already passed.
+    await analytics.mark_durations_stale(db, (day for _, day in expired))
+
+    result = await db.execute(
+        update(Locker)
+        .where(Locker.id.in_(locker_ids), Locker.status == "ALLOCATED")
+        .values(status="AVAILABLE")
+        .returning(Locker.vault_id, Locker.size)
+        .execution_options(synchronize_session=False)
+    )
+    freed = result.all()
+
+    per_vault = Counter(row.vault_id for row in freed)
+    if per_vault:
+        await db.execute(
+            _release_vault_slots,
+            [{"b_vault_id": vault_id, "b_freed": n} for vault_id, n in sorted(per_vault.items())],
+        )
+
+    changes = Counter()
+    for row in freed:
+        changes[(row.vault_id, row.size, "ALLOCATED")] -= 1
+        changes[(row.vault_id, row.size, "AVAILABLE")] += 1
+    await availability.apply_changes(db, changes)
+
+    response_cache.invalidate_on_commit(db, "vaults", "lockers")
+    await db.commit()
+    return len(locker_ids)
+
+
+class ExpirySweeper(LeaderElectedJob):
+    """
+    Periodically expires allocations whose expiry_date has passed.
+    """
+
+    name = "expiry-sweeper"
+    lock_key = 0x5641554C0001
+
+    def __init__(self, interval: float, batch_size: int):
+        super().__init__(interval)
+        self.batch_size = batch_size
+        self.last_run_rows = 0
+        self.total_rows = 0
+
+    async def run_once(self) -> None:
+        now = datetime.utcnow()
+        expired = 0
+        async with SessionLocal() as db:
+            while True:
+                n = await expire_batch(db, self.batch_size, now)
+                expired += n
+                if n < self.batch_size:
+                    break
+            await idempotency.purge_expired(db, now)
+            await sessions.purge_expired(db, now)
+        self.last_run_rows = expired
+        self.total_rows += expired
+        if expired:
+            logger.info("Expired %d allocations", expired)
+
+    def stats(self) -> dict:
+        return {
+            "is_leader": self.is_leader,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_rows": self.last_run_rows,
+            "last_run_seconds": self.last_run_seconds,
+            "total_rows": self.total_rows,
+        }
+
+
+expiry_sweeper = ExpirySweeper(
+    interval=settings.EXPIRY_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.EXPIRY_SWEEP_BATCH_SIZE,
+)
+
+registry.gauge("expiry_sweeper_last_run_rows", "Allocations expired by the last sweep.").set_function(
+    lambda: expiry_sweeper.last_run_rows
+)
+registry.gauge("expiry_sweeper_rows", "Allocations expired since start.").set_function(
+    lambda: expiry_sweeper.total_rows
+)
+registry.gauge("expiry_sweeper_last_run_seconds", "Duration of the last sweep.").set_function(
+    lambda: expiry_sweeper.last_run_seconds
+)
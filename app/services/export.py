@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Select, any_, func
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import open_read_session
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.models.payment import Payment
+from app.models.vault_transaction import VaultTransaction
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+export_rows_total = registry.counter("export_rows_total", "Rows written by the streaming exports.", ("kind",))
+
+
+def _vault_allocation_ids(vault_id: int):
+    """
+    The vault's allocation ids as `ARRAY(subquery)`, resolved through
+    ix_lockers_vault_id and ix_locker_allocations_locker_id before the
+    export table is read. Written as a join, the planner hashes a
+    sequential scan of locker_allocations at the default random_page_cost.
+    """
+    locker_ids = select(Locker.id).where(Locker.vault_id == vault_id).scalar_subquery()
+    return (
+        select(LockerAllocation.id)
+        .where(LockerAllocation.locker_id == any_(func.array(locker_ids)))
+        .scalar_subquery()
+    )
+
+
+def _build_query(
+    model,
+    columns: Sequence,
+    time_column,
+    allocation_id: Optional[int],
+    vault_id: Optional[int],
+    user_id: Optional[int],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    after_id: Optional[int],
+) -> Select:
+    query = select(*columns).order_by(model.id)
+    if user_id is not None:
+        query = query.join(LockerAllocation, LockerAllocation.id == model.allocation_id)
+        query = query.where(LockerAllocation.user_id == user_id)
+    if vault_id is not None:
+        query = query.where(model.allocation_id == any_(func.array(_vault_allocation_ids(vault_id))))
+    if allocation_id is not None:
+        query = query.where(model.allocation_id == allocation_id)
+    if since is not None:
+        query = query.where(time_column >= since)
+    if until is not None:
+        query = query.where(time_column < until)
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    return query
+
+
+def transactions_query(**filters) -> Select:
+    return _build_query(
+        VaultTransaction,
+        (VaultTransaction.id, VaultTransaction.allocation_id, VaultTransaction.type, VaultTransaction.timestamp),
+        VaultTransaction.timestamp,
+        **filters,
+    )
+
+
+def payments_query(**filters) -> Select:
+    return _build_query(
+        Payment,
+        (Payment.id, Payment.allocation_id, Payment.amount, Payment.status, Payment.created_at),
+        Payment.created_at,
+        **filters,
+    )
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson(keys, rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(keys, map(_plain, row))), separators=(",", ":")) + "\n" for row in rows
+    ).encode()
+
+
+def _csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_rows(query: Select, fmt: str, kind: str, writer_key: Optional[str] = None) -> AsyncIterator[bytes]:
+    """
+    Encode the rows of `query` as NDJSON or CSV, one chunk per fetched batch.
+
+    Rows come from a server-side cursor on a session owned by the generator,
+    so memory stays bounded by EXPORT_BATCH_SIZE whatever the result size.
+    Rows are ordered by id; a client that is cut off resumes with the last
+    id it received as `after_id`.
+    """
+    db = await open_read_session(writer_key)
+    try:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        keys = list(result.keys())
+        if fmt == "csv":
+            yield _csv([keys])
+        async for rows in result.partitions():
+            yield _ndjson(keys, rows) if fmt == "ndjson" else _csv(rows)
+            export_rows_total.inc(kind, amount=len(rows))
+    finally:
+        await db.close()
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.idempotency_key import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# (user_id, key) -> (fingerprint, future resolving to (status_code, body))
+_inflight: Dict[Tuple[int, str], Tuple[str, asyncio.Future]] = {}
+
+idempotency_requests_total = registry.counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key by outcome.",
+    ("outcome",),
+)
+
+
+async def fingerprint(request: Request) -> str:
+    """
+    Hash of everything that identifies the request, so a key reused for a
+    different request can be rejected.
+    """
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.url.path.encode())
+    digest.update(request.url.query.encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+def _response(status_code: int, body: str, replayed: bool) -> Response:
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def _mismatch() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        detail="Idempotency-Key was already used for a different request"
+    )
+
+
+async def run(
+    db: AsyncSession,
+    request: Request,
+    user_id: int,
+    key: Optional[str],
+    handler: Callable[[], Awaitable[object]],
+    response_model: type[BaseModel],
+    status_code: int,
+) -> Response:
+    """
+    Execute `handler` at most once per (user, Idempotency-Key).
+
+    The handler performs its writes without committing; its result is
+    serialized with `response_model` and committed together with the
+    stored response. Replays are answered from a single primary-key lookup.
+    Concurrent duplicates in this process wait for the first request and
+    share its outcome; duplicates racing from other workers get 409.
+    """
+    if key is None:
+        result = await handler()
+        await db.commit()
+        return _response(status_code, response_model.model_validate(result).model_dump_json(), False)
+
+    request_fingerprint = await fingerprint(request)
+    slot = (user_id, key)
+
+    pending = _inflight.get(slot)
+    if pending is not None:
+        pending_fingerprint, future = pending
+        if pending_fingerprint != request_fingerprint:
+            raise _mismatch()
+        idempotency_requests_total.inc("coalesced")
+        # Hand the connection back while waiting: the first request needs
+        # one again after claiming the key, and a storm of duplicates
+        # holding theirs would starve it.
+        await db.commit()
+        stored_status, body = await asyncio.shield(future)
+        return _response(stored_status, body, True)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[slot] = (request_fingerprint, future)
+    try:
+        now = datetime.utcnow()
+        existing = await db.get(IdempotencyKey, slot)
+        abandoned_before = now - timedelta(seconds=settings.IDEMPOTENCY_KEY_LOCK_TIMEOUT_SECONDS)
+        if existing is not None and (
+            existing.expires_at <= now
+            or (existing.status_code is None and existing.created_at < abandoned_before)
+        ):
+            await db.delete(existing)
+            await db.flush()
+            existing = None
+
+        if existing is not None:
+            if existing.fingerprint != request_fingerprint:
+                raise _mismatch()
+            if existing.status_code is None:
+                idempotency_requests_total.inc("in_progress")
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed"
+                )
+            idempotency_requests_total.inc("replayed")
+            future.set_result((existing.status_code, existing.response_body))
+            return _response(existing.status_code, existing.response_body, True)
+
+        claimed = await db.execute(
+            insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                fingerprint=request_fingerprint,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+            )
+            .on_conflict_do_nothing()
+            .returning(IdempotencyKey.key)
+        )
+        if claimed.scalar_one_or_none() is None:
+            await db.rollback()
+            idempotency_requests_total.inc("in_progress")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        await db.commit()
+
+        try:
+            result = await handler()
+            body = response_model.model_validate(result).model_dump_json()
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                .values(status_code=status_code, response_body=body)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except BaseException:
+            # Release the key so the client can retry after a failure.
+            await db.rollback()
+            await db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            raise
+
+        idempotency_requests_total.inc("executed")
+        future.set_result((status_code, body))
+        return _response(status_code, body, False)
+    except BaseException as exc:
+        if not future.done():
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                # Mark retrieved; waiters, if any, re-raise it themselves.
+                future.exception()
+        raise
+    finally:
+        _inflight.pop(slot, None)
+
+
+async def purge_expired(db: AsyncSession, now: datetime) -> int:
+    result = await db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.expires_at < now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElectedJob:
+    """
+    Runs `run_once` every `interval` seconds on whichever worker holds the
+    PostgreSQL advisory lock `lock_key`. The lock lives on a dedicated
+    autocommit connection, so it is released as soon as that worker dies
+    and another worker takes over on its next attempt.
+
+    Behind a transaction-mode pooler (DB_EXTERNAL_POOLER) a session lock
+    would stay on whichever server connection ran it, where other workers'
+    statements can land and re-enter it. There each run instead holds a
+    transaction-scoped lock, which stays on one server connection and is
+    released when the transaction ends.
+    """
+
+    name = "job"
+    lock_key = 0
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.is_leader = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run_seconds = 0.0
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_timed(self) -> None:
+        started = time.perf_counter()
+        try:
+            await self.run_once()
+            self.runs += 1
+        except Exception:
+            self.failures += 1
+            logger.exception("%s run failed", self.name)
+        self.last_run_seconds = time.perf_counter() - started
+
+    async def _run_as_leader(self, conn) -> None:
+        while not self._stopping.is_set():
+            # Fails fast if the lock connection was lost.
+            await conn.execute(text("SELECT 1"))
+            await self._run_timed()
+            await self._sleep(self.interval)
+
+    async def _run_under_transaction_lock(self) -> None:
+        async with engine.begin() as conn:
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": self.lock_key}
+            )
+            self.is_leader = bool(acquired)
+            if acquired:
+                try:
+                    await self._run_timed()
+                finally:
+                    self.is_leader = False
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            if settings.DB_EXTERNAL_POOLER:
+                try:
+                    await self._run_under_transaction_lock()
+                except Exception:
+                    self.is_leader = False
+                    logger.exception("%s could not take its lock", self.name)
+                await self._sleep(self.interval)
+                continue
+            try:
+                async with engine.connect() as conn:
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    acquired = await conn.scalar(
+                        text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+                    )
+                    if acquired:
+                        self.is_leader = True
+                        logger.info("%s acquired leadership", self.name)
+                        try:
+                            await self._run_as_leader(conn)
+                        finally:
+                            self.is_leader = False
+                            await conn.execute(
+                                text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}
+                            )
+            except Exception:
+                self.is_leader = False
+                logger.exception("%s lost its lock connection", self.name)
+            await self._sleep(self.interval)
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.response_cache import response_cache
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.db.repository import insert_returning
+from app.models.vault import Vault
+from app.services import availability
+
+# Vaults a locker may be claimed from; evaluated inside the claiming UPDATE.
+_operational_vaults = select(Vault.id).where(
+    Vault.status == "OPERATIONAL", Vault.available_lockers > 0
+)
+
+
+async def _get_locker_and_vault_status(db: AsyncSession, locker_id: int):
+    """
+    Helper function to fetch the locker and vault status
+    """
+    locker_result = await db.execute(select(Locker).where(Locker.id == locker_id))
+    locker = locker_result.scalars().first()
+    if locker is None:
+        return None, None
+
+    vault_result = await db.execute(select(Vault).where(Vault.id == locker.vault_id))
+    vault = vault_result.scalars().first()
+    return locker, vault
+
+
+async def _claim_failure(db: AsyncSession, locker_id: int) -> HTTPException:
+    """
+    Work out why a claim matched no rows so the caller gets a useful error.
+    """
+    locker, vault = await _get_locker_and_vault_status(db, locker_id)
+    if not locker:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Locker not found")
+    if vault and vault.status != "OPERATIONAL":
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot allocate locker: vault is not operational"
+        )
+    if locker.status != "AVAILABLE":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Locker is not available for allocation")
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No available lockers in the vault")
+
+
+async def _take_vault_slot(db: AsyncSession, vault_id: int) -> None:
+    """
+    Decrement the vault's available counter in SQL, never below zero.
+    """
+    result = await db.execute(
+        update(Vault)
+        .where(Vault.id == vault_id, Vault.available_lockers > 0)
+        .values(available_lockers=Vault.available_lockers - 1)
+        .returning(Vault.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No available lockers in the vault")
+    response_cache.invalidate_on_commit(db, "vaults", "lockers")
+
+
+async def _create_allocation(
+    db: AsyncSession, locker_id: int, user_id: int, expiry_date: Optional[datetime]
+) -> LockerAllocation:
+    if expiry_date is None:
+        expiry_date = datetime.utcnow() + timedelta(days=30)
+
+    allocation = await insert_returning(db, LockerAllocation, dict(
+        locker_id=locker_id,
+        user_id=user_id,
+        allocated_at=datetime.utcnow(),
+        expiry_date=expiry_date,
+        status="ACTIVE"
+    ))
+    return allocation
+
+
+async def allocate_locker(
+    db: AsyncSession, locker_id: int, user_id: int, expiry_date: Optional[datetime] = None
+) -> LockerAllocation:
+    """
+    Claim a specific locker with a single conditional UPDATE. Concurrent
+    claims on the same row serialize on its row lock and all but one match
+    zero rows, so a locker can never be allocated twice. The caller commits.
+    """
+    result = await db.execute(
+        update(Locker)
+        .where(
+            Locker.id == locker_id,
+            Locker.status == "AVAILABLE",
+            Locker.vault_id.in_(_operational_vaults),
+        )
+        .values(status="ALLOCATED")
+        .returning(Locker.id, Locker.vault_id, Locker.size)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.first()
+    if claimed is None:
+        await db.rollback()
+        raise await _claim_failure(db, locker_id)
+
+    await _take_vault_slot(db, claimed.vault_id)
+    await availability.record_transition(db, claimed.vault_id, claimed.size, "AVAILABLE", "ALLOCATED")
+    return await _create_allocation(db, claimed.id, user_id, expiry_date)
+
+
+async def reclaim_locker(db: AsyncSession, locker_id: int) -> bool:
+    """
+    Re-claim the locker of a lapsed allocation, e.g. when rent is paid after
+    the expiry sweeper released it. Returns False if someone else has it now.
+    The caller commits.
+    """
+    result = await db.execute(
+        update(Locker)
+        .where(
+            Locker.id == locker_id,
+            Locker.status == "AVAILABLE",
+            Locker.vault_id.in_(_operational_vaults),
+        )
+        .values(status="ALLOCATED")
+        .returning(Locker.id, Locker.vault_id, Locker.size)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.first()
+    if claimed is None:
+        return False
+
+    await _take_vault_slot(db, claimed.vault_id)
+    await availability.record_transition(db, claimed.vault_id, claimed.size, "AVAILABLE", "ALLOCATED")
+    return True
+
+
+async def allocate_any_locker(
+    db: AsyncSession,
+    vault_id: int,
+    size: str,
+    user_id: int,
+    expiry_date: Optional[datetime] = None,
+) -> LockerAllocation:
+    """
+    Claim the first free locker of the given size in a vault. Rows locked
+    by concurrent claimers are skipped rather than waited on. The caller
+    commits.
+    """
+    candidate = (
+        select(Locker.id)
+        .where(
+            Locker.vault_id == vault_id,
+            Locker.size == size,
+            Locker.status == "AVAILABLE",
+        )
+        .order_by(Locker.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(Locker)
+        .where(Locker.id == candidate, Locker.vault_id.in_(_operational_vaults))
+        .values(status="ALLOCATED")
+        .returning(Locker.id, Locker.vault_id, Locker.size)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.first()
+    if claimed is None:
+        await db.rollback()
+        vault = (await db.execute(select(Vault).where(Vault.id == vault_id))).scalars().first()
+        if not vault:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vault not found")
+        if vault.status != "OPERATIONAL":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot allocate locker: vault is not operational"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No available {size} lockers in the vault"
+        )
+
+    await _take_vault_slot(db, claimed.vault_id)
+    await availability.record_transition(db, claimed.vault_id, claimed.size, "AVAILABLE", "ALLOCATED")
+    return await _create_allocation(db, claimed.id, user_id, expiry_date)
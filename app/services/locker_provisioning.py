@@ -0,0 +1,185 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.models.locker import Locker
+from app.models.vault import Vault
+from app.schemas.locker import LockerBulkItem
+from app.services import availability
+
+JSON_TYPES = ("application/json",)
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson")
+CSV_TYPES = ("text/csv",)
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    line_no = 0
+
+    def decode(chunk: bytes, final: bool = False) -> str:
+        try:
+            return decoder.decode(chunk, final)
+        except UnicodeDecodeError as exc:
+            # The buffer never holds a newline, so only the undecoded bytes
+            # before the error can add lines.
+            bad_line = line_no + exc.object[:exc.start].count(b"\n") + 1
+            raise _bad_request(f"Invalid UTF-8 on line {bad_line}")
+
+    async for chunk in request.stream():
+        buffer += decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line.rstrip("\r")
+    buffer += decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+async def iter_records(request: Request) -> AsyncIterator[dict]:
+    """
+    Yield raw locker records from a JSON array, NDJSON or CSV request body.
+    NDJSON and CSV bodies are read incrementally.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in JSON_TYPES:
+        try:
+            records = json.loads(await request.body())
+        except ValueError:
+            raise _bad_request("Request body is not valid JSON")
+        if not isinstance(records, list):
+            raise _bad_request("Expected a JSON array of lockers")
+        for record in records:
+            yield record
+
+    elif content_type in NDJSON_TYPES:
+        line_no = 0
+        async for line in _iter_lines(request):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise _bad_request(f"Invalid JSON on line {line_no}")
+
+    elif content_type in CSV_TYPES:
+        header = None
+        async for line in _iter_lines(request):
+            if not line.strip():
+                continue
+            row = next(csv.reader([line]))
+            if header is None:
+                header = [column.strip() for column in row]
+                continue
+            yield dict(zip(header, row))
+
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected application/json, application/x-ndjson or text/csv"
+        )
+
+
+def _validate_batch(records: list, offset: int) -> list:
+    rows = []
+    errors = []
+    for index, record in enumerate(records, start=offset):
+        try:
+            item = LockerBulkItem.model_validate(record)
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": exc.errors(include_url=False, include_context=False)})
+            continue
+        rows.append(item)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=errors)
+    return rows
+
+
+async def provision_lockers(db: AsyncSession, vault_id: int, records: AsyncIterator[dict]) -> dict:
+    """
+    Validate and insert lockers in batches of BULK_INSERT_BATCH_SIZE, each
+    sent as one prepared INSERT through asyncpg's pipelined executemany,
+    then update the vault counters and availability summary once. Everything happens in one transaction, so any invalid
+    record rolls back the whole request.
+    """
+    result = await db.execute(select(Vault.id).where(Vault.id == vault_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vault not found")
+
+    created = 0
+    by_size = Counter()
+    batch = []
+
+    async def flush():
+        nonlocal created
+        items = _validate_batch(batch, created)
+        await db.execute(
+            insert(Locker),
+            [
+                {
+                    "vault_id": vault_id,
+                    "locker_number": item.locker_number,
+                    "size": item.size,
+                    "status": "AVAILABLE",
+                    "monthly_rent": item.monthly_rent,
+                }
+                for item in items
+            ],
+        )
+        by_size.update(item.size for item in items)
+        created += len(items)
+        batch.clear()
+
+    try:
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= settings.BULK_INSERT_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+    except HTTPException:
+        await db.rollback()
+        raise
+
+    if not created:
+        raise _bad_request("No lockers supplied")
+
+    result = await db.execute(
+        update(Vault)
+        .where(Vault.id == vault_id)
+        .values(
+            total_lockers=Vault.total_lockers + created,
+            available_lockers=Vault.available_lockers + created,
+        )
+        .returning(Vault.total_lockers, Vault.available_lockers)
+        .execution_options(synchronize_session=False)
+    )
+    counters = result.one()
+    await availability.apply_changes(
+        db, Counter({(vault_id, size, "AVAILABLE"): n for size, n in by_size.items()})
+    )
+    response_cache.invalidate_on_commit(db, "vaults", "lockers")
+    await db.commit()
+    return {
+        "vault_id": vault_id,
+        "created": created,
+        "total_lockers": counters.total_lockers,
+        "available_lockers": counters.available_lockers,
+    }
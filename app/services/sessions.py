@@ -0,0 +1,97 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.user_session import UserSession
+
+
+def _hash(refresh_token: str) -> str:
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+async def issue(db: AsyncSession, user_id: int) -> str:
+    """
+    Create a session for user_id and return its refresh token. The caller commits.
+    """
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(UserSession(
+        user_id=user_id,
+        token_hash=_hash(refresh_token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    await db.flush()
+    return refresh_token
+
+
+async def rotate(db: AsyncSession, refresh_token: str) -> Optional[tuple[Row, str]]:
+    """
+    Redeem a refresh token: revoke its session and issue a replacement in
+    the same transaction. Validation and revocation are one UPDATE on the
+    token_hash index, so a token can be redeemed only once. Returns the
+    owner's (user_id, email, status) and the new refresh token, or None
+    when the token is invalid or the user is inactive.
+    Presenting an already-redeemed token revokes all of the user's
+    sessions, since the token has probably leaked.
+    """
+    token_hash = _hash(refresh_token)
+    result = await db.execute(
+        update(UserSession)
+        .where(
+            UserSession.token_hash == token_hash,
+            UserSession.revoked.is_(False),
+            UserSession.expires_at > datetime.utcnow(),
+            User.id == UserSession.user_id,
+        )
+        .values(revoked=True)
+        .returning(UserSession.user_id, User.email, User.status)
+        .execution_options(synchronize_session=False)
+    )
+    owner = result.first()
+    if owner is None:
+        reused = await db.execute(
+            select(UserSession.user_id).where(UserSession.token_hash == token_hash, UserSession.revoked.is_(True))
+        )
+        user_id = reused.scalar_one_or_none()
+        if user_id is not None:
+            await revoke_all(db, user_id)
+            await db.commit()
+        return None
+
+    if owner.status == "INACTIVE":
+        await db.commit()
+        return None
+
+    new_token = await issue(db, owner.user_id)
+    await db.commit()
+    return owner, new_token
+
+
+async def revoke_all(db: AsyncSession, user_id: int) -> int:
+    """
+    Revoke every live session of user_id. The caller commits.
+    """
+    result = await db.execute(
+        update(UserSession)
+        .where(UserSession.user_id == user_id, UserSession.revoked.is_(False))
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def purge_expired(db: AsyncSession, now: datetime) -> int:
+    result = await db.execute(
+        delete(UserSession)
+        .where(UserSession.expires_at < now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,108 @@
+"""
+Latency of GET /transactions/allocations/{id}/assets, which records an
+INSPECTION event per request, in three configurations:
+
+  no logging       record() replaced by a no-op
+  logging          the access log writer running, fed only by the requests
+  logging + load   as above while a background task records --rate extra
+                   events per second through the same writer
+
+Also reports how many events were written and dropped during each run.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import Timer, client, reset_database
+
+from sqlalchemy import func, select, text
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.access_log import AccessLog
+from app.services.access_log import access_log_events_total, access_log_writer
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'CUSTOMER', 'ACTIVE')",
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', 1, 0, 'OPERATIONAL')",
+    "INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent) VALUES (1, 'L1', 'LARGE', 'ALLOCATED', 50)",
+    """
+    INSERT INTO locker_allocations (locker_id, user_id, allocated_at, expiry_date, status)
+    VALUES (1, 1, now(), now() + interval '30 days', 'ACTIVE')
+    """,
+    """
+    INSERT INTO assets (allocation_id, asset_name, estimated_value, type)
+    SELECT 1, 'Document ' || g, g, 'DOCUMENT' FROM generate_series(1, 10) g
+    """,
+]
+
+
+def _counts() -> dict:
+    return {sample.split('"')[1]: float(sample.rpartition(" ")[2]) for sample in access_log_events_total.samples()}
+
+
+async def _background_load(rate: float, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    sent = 0
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        due = int((loop.time() - start) * rate) - sent
+        if due:
+            access_log_writer.record(1, 1, "INSPECTION", count=due)
+            sent += due
+
+
+async def _logged() -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(AccessLog))
+
+
+async def _run(http, headers, seconds: float, rate: float) -> str:
+    timer = Timer()
+    stop = asyncio.Event()
+    load = asyncio.create_task(_background_load(rate, stop)) if rate else None
+    before, rows_before = _counts(), await _logged()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        with timer:
+            response = await http.get("/api/v1/transactions/allocations/1/assets", headers=headers)
+        assert response.status_code == 200
+    if load:
+        stop.set()
+        await load
+    # Let the writer catch up on what was queued during the run.
+    await asyncio.sleep(access_log_writer.flush_interval * 2)
+    after, rows = _counts(), await _logged() - rows_before
+    dropped = after.get("dropped", 0) - before.get("dropped", 0)
+    return f"{timer.summary()}  written={rows / seconds:,.0f}/s dropped={dropped:,.0f}"
+
+
+async def main(seconds: float, rate: float) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+
+    async with client() as http:
+        for _ in range(50):
+            await http.get("/api/v1/transactions/allocations/1/assets", headers=headers)
+
+        access_log_writer.record = lambda *args, **kwargs: True
+        print(f"{'no logging':16} {await _run(http, headers, seconds, 0)}")
+        del access_log_writer.record
+
+        access_log_writer.start()
+        print(f"{'logging':16} {await _run(http, headers, seconds, 0)}")
+        print(f"{'logging + load':16} {await _run(http, headers, seconds, rate)}  (load {rate:,.0f} events/s)")
+        await access_log_writer.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--rate", type=float, default=10_000, help="background events per second")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.rate))
@@ -0,0 +1,86 @@
+"""
+Hundreds of clients allocating lockers in parallel through
+POST /lockers/vaults/{id}/allocate until the vault is full, then a check
+that no locker was handed out twice and the counters add up.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from benchmarks.common import client, reset_database
+
+from sqlalchemy import func, insert, select
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.models.user import User
+from app.models.vault import Vault
+from app.services import availability
+
+
+async def _seed(lockers: int, vaults: int, clients: int) -> List[int]:
+    per_vault = lockers // vaults
+    vault_ids = []
+    async with SessionLocal() as db:
+        for _ in range(vaults):
+            vault = Vault(location="Bench", total_lockers=per_vault, available_lockers=per_vault, status="OPERATIONAL")
+            db.add(vault)
+            await db.flush()
+            await db.execute(insert(Locker), [
+                dict(vault_id=vault.id, locker_number=f"L{i}", size="SMALL", status="AVAILABLE", monthly_rent=50)
+                for i in range(per_vault)
+            ])
+            await availability.record_transition(db, vault.id, "SMALL", to_status="AVAILABLE", n=per_vault)
+            vault_ids.append(vault.id)
+        await db.execute(insert(User), [
+            dict(email=f"client{i}@example.com", name=f"Client {i}", hashed_password="x", role="CUSTOMER", status="ACTIVE")
+            for i in range(clients)
+        ])
+        await db.commit()
+    return vault_ids
+
+
+async def main(lockers: int, vaults: int, clients: int) -> None:
+    await reset_database()
+    vault_ids = await _seed(lockers, vaults, clients)
+    lockers = lockers // vaults * vaults
+    statuses = {}
+
+    async def allocate_until_full(http, n: int):
+        url = f"/api/v1/lockers/vaults/{vault_ids[n % vaults]}/allocate?size=SMALL"
+        headers = {"Authorization": f"Bearer {create_access_token(subject=f'client{n}@example.com')}"}
+        while True:
+            response = await http.post(url, headers=headers)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code != 201:
+                return
+
+    async with client() as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(allocate_until_full(http, n) for n in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    async with SessionLocal() as db:
+        allocations = await db.scalar(select(func.count()).select_from(LockerAllocation))
+        distinct = await db.scalar(select(func.count(func.distinct(LockerAllocation.locker_id))))
+        available = await db.scalar(select(func.sum(Vault.available_lockers)))
+        left = await db.scalar(select(func.count()).where(Locker.status == "AVAILABLE"))
+    await engine.dispose()
+
+    print(f"clients={clients} vaults={vaults} lockers={lockers} pool={engine.pool.size()}+{engine.pool._max_overflow}")
+    print(f"responses={statuses} elapsed={elapsed:.2f}s throughput={statuses.get(201, 0) / elapsed:.0f} allocations/s")
+    print(f"allocations={allocations} distinct_lockers={distinct} double_allocations={allocations - distinct}")
+    print(f"vaults.available_lockers={available} lockers_still_available={left}")
+    assert allocations == distinct == lockers and available == left == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lockers", type=int, default=5000)
+    parser.add_argument("--vaults", type=int, default=1, help="vaults the lockers and clients are spread over")
+    parser.add_argument("--clients", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.lockers, args.vaults, args.clients))
@@ -0,0 +1,141 @@
+"""
+Analytics reports served from the daily rollup tables against the same
+aggregates computed directly from lockers, locker_allocations and payments,
+on a seeded year of history: 100 vaults of 1000 lockers, --allocations
+allocations with one payment each, and a year of occupancy snapshots.
+Also reported: the first (backfill) rollup run and a later incremental run.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from benchmarks.common import Timer, client, reset_database
+
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.services import analytics
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'STAFF', 'ACTIVE')",
+    """
+    INSERT INTO vaults (location, total_lockers, available_lockers, status)
+    SELECT 'Vault ' || v, 1000, 1000, 'OPERATIONAL' FROM generate_series(1, 100) v
+    """,
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1 + (g - 1) / 1000, 'L' || g, (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + g % 3]::locker_size,
+           CASE WHEN g % 4 = 0 THEN 'AVAILABLE' ELSE 'ALLOCATED' END::locker_status, 50
+    FROM generate_series(1, 100000) g
+    """,
+    """
+    INSERT INTO vault_availability (vault_id, size, status, count)
+    SELECT vault_id, size, status, count(*) FROM lockers GROUP BY vault_id, size, status
+    """,
+    # Allocations started over the past year and lasting 1-60 days.
+    """
+    INSERT INTO locker_allocations (locker_id, user_id, allocated_at, expiry_date, status)
+    SELECT 1 + g % 100000, 1, started, started + (1 + g % 60) * interval '1 day',
+           CASE WHEN started + (1 + g % 60) * interval '1 day' < now() THEN 'EXPIRED' ELSE 'ACTIVE' END::allocation_status
+    FROM (
+        SELECT g, now()::timestamp - (g % 365) * interval '1 day' - (g % 86400) * interval '1 second' AS started
+        FROM generate_series(1, :allocations) g
+    ) s
+    """,
+    """
+    INSERT INTO payments (allocation_id, amount, status, created_at)
+    SELECT id, 50, (ARRAY['SUCCESSFUL', 'SUCCESSFUL', 'SUCCESSFUL', 'FAILED'])[1 + id % 4]::payment_status, allocated_at
+    FROM locker_allocations
+    """,
+    # Snapshots the occupancy rollup would have taken on each past day.
+    """
+    INSERT INTO vault_occupancy_daily (day, vault_id, size, allocated, total)
+    SELECT current_date - d, vault_id, size,
+           sum(count) FILTER (WHERE status = 'ALLOCATED') - d % 7, sum(count)
+    FROM vault_availability, generate_series(1, 364) d
+    GROUP BY d, vault_id, size
+    """,
+]
+
+# The same reports computed from the source tables. Occupancy history only
+# exists in the rollup, so both sides report today's counts.
+DIRECT = {
+    "occupancy": """
+        SELECT vault_id, size, count(*) FILTER (WHERE status = 'ALLOCATED'), count(*)
+        FROM lockers GROUP BY vault_id, size
+    """,
+    "revenue": """
+        SELECT to_char(p.created_at, 'YYYY-MM'), l.vault_id, count(*), sum(p.amount)
+        FROM payments p
+        JOIN locker_allocations a ON a.id = p.allocation_id
+        JOIN lockers l ON l.id = a.locker_id
+        WHERE p.status = 'SUCCESSFUL'
+        GROUP BY 1, 2
+    """,
+    "allocation-duration": """
+        SELECT l.vault_id, count(*), sum(extract(epoch FROM a.expiry_date - a.allocated_at)) / count(*) / 86400
+        FROM locker_allocations a
+        JOIN lockers l ON l.id = a.locker_id
+        WHERE a.status <> 'ACTIVE'
+        GROUP BY 1
+    """,
+}
+
+
+async def _timed(timer: Timer, run, repeat: int):
+    for _ in range(repeat):
+        with timer:
+            await run()
+
+
+async def _rollup() -> int:
+    job = analytics.AnalyticsRollup(interval=60)
+    await job.run_once()
+    return job.last_run_rows
+
+
+async def main(allocations: int, repeat: int) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"allocations": allocations} if ":allocations" in statement else {})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+
+    for label in ("backfill", "incremental"):
+        start = time.perf_counter()
+        rows = await _rollup()
+        print(f"rollup {label:12} {rows:>9,} rows in {time.perf_counter() - start:7.2f}s")
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+    params = {"occupancy": {"since": datetime.utcnow().date().isoformat()}}
+    print(f"{'report':22} {'direct SQL p50':>15} {'rollup endpoint p50':>20} {'rollup rows':>12}")
+    async with client() as http:
+        for report, sql in DIRECT.items():
+            direct, served = Timer(), Timer()
+            async with SessionLocal() as db:
+                await _timed(direct, lambda: db.execute(text(sql)), repeat)
+
+            async def get():
+                response = await http.get(f"/api/v1/analytics/{report}", headers=headers, params=params.get(report))
+                response.raise_for_status()
+                get.rows = len(response.json())
+
+            await _timed(served, get, repeat)
+            p50 = [sorted(t.samples)[len(t.samples) // 2] * 1000 for t in (direct, served)]
+            print(f"{report:22} {p50[0]:>13.1f}ms {p50[1]:>18.1f}ms {get.rows:>12,}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--allocations", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.allocations, args.repeat))
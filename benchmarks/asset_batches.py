@@ -0,0 +1,81 @@
+"""
+Depositing and withdrawing 1000-asset batches through the batch endpoints
+versus one request per asset through the single-asset endpoints.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import client, reset_database
+
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.db.session import engine
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'CUSTOMER', 'ACTIVE')",
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', 2, 0, 'OPERATIONAL')",
+    "INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent) VALUES (1, 'L1', 'LARGE', 'ALLOCATED', 50), (1, 'L2', 'LARGE', 'ALLOCATED', 50)",
+    """
+    INSERT INTO locker_allocations (locker_id, user_id, allocated_at, expiry_date, status)
+    VALUES (1, 1, now(), now() + interval '30 days', 'ACTIVE'), (2, 1, now(), now() + interval '30 days', 'ACTIVE')
+    """,
+]
+
+
+def _asset(i: int) -> dict:
+    return {"asset_name": f"Document {i}", "estimated_value": i, "type": "DOCUMENT"}
+
+
+async def main(assets: int, batches: int) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+    batch_url = "/api/v1/transactions/allocations/1/assets"
+    single_url = "/api/v1/transactions/allocations/2/assets"
+    total = assets * batches
+
+    async with client() as http:
+        start = time.perf_counter()
+        ids = []
+        for _ in range(batches):
+            response = await http.post(f"{batch_url}/batch", headers=headers, json={"assets": [_asset(i) for i in range(assets)]})
+            response.raise_for_status()
+            ids.append([asset["id"] for asset in response.json()])
+        deposit = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for batch in ids:
+            response = await http.post(f"{batch_url}/withdraw", headers=headers, json={"asset_ids": batch})
+            response.raise_for_status()
+        withdraw = time.perf_counter() - start
+        print(f"batch endpoints   deposit {total} in {deposit:6.2f}s ({total / deposit:7,.0f}/s)  "
+              f"withdraw {total} in {withdraw:6.2f}s ({total / withdraw:7,.0f}/s)")
+
+        start = time.perf_counter()
+        ids = []
+        for i in range(total):
+            response = await http.post(single_url, headers=headers, json=_asset(i) | {"allocation_id": 2})
+            response.raise_for_status()
+            ids.append(response.json()["id"])
+        deposit = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for asset_id in ids:
+            response = await http.delete(f"/api/v1/transactions/assets/{asset_id}", headers=headers)
+            response.raise_for_status()
+        withdraw = time.perf_counter() - start
+        print(f"per-item requests deposit {total} in {deposit:6.2f}s ({total / deposit:7,.0f}/s)  "
+              f"withdraw {total} in {withdraw:6.2f}s ({total / withdraw:7,.0f}/s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=1000, help="assets per batch")
+    parser.add_argument("--batches", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.assets, args.batches))
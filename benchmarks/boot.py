@@ -0,0 +1,101 @@
+"""
+Time to ready for a freshly started worker: the previous startup, which ran
+Base.metadata.create_all against the migrated schema, against boot.run(),
+which checks alembic_version once and warms DB_POOL_SIZE connections. Each
+round starts from an empty pool and empty caches; after startup a wave of
+DB_POOL_SIZE concurrent authenticated requests (distinct users, response
+cache off) shows who pays for opening and preparing the connections.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import Timer, client, reset_database
+
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import response_cache
+from app.core.security import create_access_token
+from app.core.tokens import token_service
+from app.db.base import Base
+from app.db.boot import Boot
+from app.db.session import engine
+
+SEED = [
+    """
+    INSERT INTO users (email, name, hashed_password, role, status)
+    SELECT 'bench' || u || '@example.com', 'Bench', 'x', 'CUSTOMER', 'ACTIVE' FROM generate_series(1, 64) u
+    """,
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Vault 1', 100, 100, 'OPERATIONAL')",
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1, 'L' || g, 'SMALL', 'AVAILABLE', 50 FROM generate_series(1, 100) g
+    """,
+]
+
+
+async def _create_all() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _boot() -> None:
+    assert await Boot().run()
+
+
+async def _round(http, startup, headers) -> tuple[float, int, float]:
+    await engine.dispose()
+    for cache in (principal_cache, response_cache, token_service.cache):
+        cache.clear()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    try:
+        await startup()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    ready = time.perf_counter() - start
+
+    async def request(h):
+        response = await http.get("/api/v1/lockers/available", params={"limit": 10}, headers=h)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(h) for h in headers))
+    return ready, len(statements), time.perf_counter() - start
+
+
+async def main(rounds: int) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    headers = [
+        {"Authorization": f"Bearer {create_access_token(subject=f'bench{u}@example.com')}"}
+        for u in range(1, settings.DB_POOL_SIZE + 1)
+    ]
+    response_cache.ttl = 0
+
+    print(f"{'startup':12} {'statements':>10} {'time to ready':>34} {'first wave':>34}")
+    async with client() as http:
+        for label, startup in (("create_all", _create_all), ("boot.run()", _boot)):
+            ready, wave = Timer(), Timer()
+            for _ in range(rounds):
+                seconds, statements, first = await _round(http, startup, headers)
+                ready.samples.append(seconds)
+                wave.samples.append(first)
+            print(f"{label:12} {statements:>10} {ready.summary():>34} {wave.summary():>34}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
@@ -0,0 +1,81 @@
+"""
+Shared setup for the benchmarks. Each one runs the app in-process against
+the PostgreSQL database named by BENCHMARK_DATABASE_URL, which is migrated
+to head and emptied first, so point it at a scratch database:
+
+    BENCHMARK_DATABASE_URL=postgresql+asyncpg://postgres@localhost/vault_bench \\
+        python -m benchmarks.principal_cache
+
+Import this module before anything from `app`, since Settings are read at
+import time.
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BENCHMARK_DATABASE_URL = os.environ.get("BENCHMARK_DATABASE_URL")
+if not BENCHMARK_DATABASE_URL:
+    sys.exit("Set BENCHMARK_DATABASE_URL to a scratch PostgreSQL database (it is truncated)")
+
+os.environ["DATABASE_URL"] = BENCHMARK_DATABASE_URL
+os.environ.setdefault("DATABASE_REPLICA_URLS", "[]")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("EXPIRY_SWEEPER_ENABLED", "false")
+os.environ.setdefault("ANALYTICS_ROLLUP_ENABLED", "false")
+
+import httpx
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app.db.base import Base
+from app.db.session import engine
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def reset_database() -> None:
+    """
+    Migrate the benchmark database to head and empty every table.
+    """
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "head")
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+def client() -> httpx.AsyncClient:
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+class Timer:
+    """
+    Collects durations in seconds; use `with timer:` around each sample.
+    """
+
+    def __init__(self):
+        self.samples = []
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self._start)
+
+    def summary(self) -> str:
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return (
+            f"n={len(ordered)} mean={statistics.fmean(ordered) * 1000:.3f}ms "
+            f"p50={statistics.median(ordered) * 1000:.3f}ms p99={p99 * 1000:.3f}ms"
+        )
@@ -0,0 +1,101 @@
+"""
+Resident memory while GET /transactions/export/payments streams millions
+of rows. The ASGI app is called directly with a `send` that counts and
+discards the body, since an in-process HTTP client would buffer it all;
+RSS is sampled every so many rows and should stay flat.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import reset_database
+
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.db.session import engine
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'STAFF', 'ACTIVE')",
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', 1, 0, 'OPERATIONAL')",
+    "INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent) VALUES (1, 'L1', 'SMALL', 'ALLOCATED', 50)",
+    """
+    INSERT INTO locker_allocations (locker_id, user_id, allocated_at, expiry_date, status)
+    VALUES (1, 1, now(), now() + interval '30 days', 'ACTIVE')
+    """,
+    """
+    INSERT INTO payments (allocation_id, amount, status, created_at)
+    SELECT 1, 50, 'SUCCESSFUL', timestamp '2020-01-01' + g * interval '1 minute' FROM generate_series(1, :rows) g
+    """,
+]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def main(rows: int, fmt: str, every: int) -> None:
+    from app.main import app
+
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"rows": rows})
+    await engine.dispose()
+    print(f"seeded {rows:,} payments, RSS {rss_mb():.1f} MB before the export")
+
+    token = create_access_token(subject="bench@example.com")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/v1/transactions/export/payments", "raw_path": b"/api/v1/transactions/export/payments",
+        "query_string": f"format={fmt}".encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    received = {"bytes": 0, "lines": 0, "status": None}
+    samples = []
+    next_sample = 0
+
+    async def receive():
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal next_sample
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            received["bytes"] += len(body)
+            received["lines"] += body.count(b"\n")
+            if received["lines"] >= next_sample:
+                samples.append((received["lines"], rss_mb()))
+                next_sample += every
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if samples[-1][0] != received["lines"]:
+        samples.append((received["lines"], rss_mb()))
+
+    assert received["status"] == 200, received
+    print(f"{'lines sent':>12} {'RSS MB':>8}")
+    for lines, rss in samples:
+        print(f"{lines:>12,} {rss:>8.1f}")
+    peak = max(rss for _, rss in samples)
+    print(
+        f"exported {received['lines']:,} lines ({received['bytes'] / 2**20:,.0f} MB of {fmt}) in {elapsed:.1f}s, "
+        f"{received['lines'] / elapsed:,.0f} rows/s; RSS {samples[0][1]:.1f} MB after the first batch, peak {peak:.1f} MB"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--every", type=int, default=500_000, help="rows between RSS samples")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.format, args.every))
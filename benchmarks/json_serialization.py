@@ -0,0 +1,118 @@
+"""
+CPU cost of producing a 1000-locker JSON page three ways:
+
+  orm + jsonable_encoder   select(Locker), validate through the response
+                           model, jsonable_encoder + JSONResponse (FastAPI's
+                           default response_model path)
+  orm + pydantic json      select(Locker), validate, TypeAdapter.dump_json
+  columns + dumps          select(*schema_columns(...)) rows as dicts,
+                           encoded with app.api.responses.dumps
+
+Fetch and encode are timed separately. With --profile, the top functions
+of each path are printed from cProfile.
+"""
+import argparse
+import asyncio
+import cProfile
+import json
+import pstats
+import time
+from typing import List
+
+from benchmarks.common import Timer, reset_database
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from app.api.responses import dumps, orjson
+from app.db.repository import row_dicts, schema_columns
+from app.db.session import SessionLocal, engine
+from app.models.locker import Locker
+from app.schemas.locker import Locker as LockerSchema
+
+SEED = [
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', {n}, {n}, 'OPERATIONAL')",
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1, 'L' || g, (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + g % 3]::locker_size, 'AVAILABLE', 50 + g % 7
+    FROM generate_series(1, {n}) g
+    """,
+]
+
+adapter = TypeAdapter(List[LockerSchema])
+
+
+async def _orm_rows(db, n):
+    return (await db.execute(select(Locker).order_by(Locker.id).limit(n))).scalars().all()
+
+
+async def _column_rows(db, n):
+    query = select(*schema_columns(Locker, LockerSchema)).order_by(Locker.id).limit(n)
+    return row_dicts(await db.execute(query))
+
+
+def _jsonable(rows) -> bytes:
+    return JSONResponse(jsonable_encoder(adapter.validate_python(rows, from_attributes=True))).body
+
+
+def _pydantic(rows) -> bytes:
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+PATHS = [
+    ("orm + jsonable_encoder", _orm_rows, _jsonable),
+    ("orm + pydantic json", _orm_rows, _pydantic),
+    ("columns + dumps", _column_rows, dumps),
+]
+
+
+async def main(n: int, rounds: int, profile: bool) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement.format(n=n)))
+
+    bodies = {}
+    print(f"{n} lockers per page, {rounds} rounds, encoder={'orjson' if orjson else 'json'}")
+    async with SessionLocal() as db:
+        for label, fetch, encode in PATHS:
+            fetch_timer, encode_timer = Timer(), Timer()
+            profiler = cProfile.Profile() if profile else None
+            for i in range(rounds + 5):
+                # Start each round from an empty identity map, as a request would.
+                db.expunge_all()
+                warm = i < 5
+                if profiler and not warm:
+                    profiler.enable()
+                start = time.perf_counter()
+                rows = await fetch(db, n)
+                fetched = time.perf_counter()
+                body = encode(rows)
+                done = time.perf_counter()
+                if profiler and not warm:
+                    profiler.disable()
+                if not warm:
+                    fetch_timer.samples.append(fetched - start)
+                    encode_timer.samples.append(done - fetched)
+            bodies[label] = body
+            print(f"{label:24} fetch {fetch_timer.summary()}")
+            print(f"{'':24} encode {encode_timer.summary()}")
+            if profiler:
+                pstats.Stats(profiler).sort_stats("tottime").print_stats(12)
+    await engine.dispose()
+
+    # Every path must produce the same document; pydantic and orjson both
+    # write compact JSON, so only the stdlib JSONResponse differs in bytes.
+    assert len({json.dumps(json.loads(body)) for body in bodies.values()}) == 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1000, help="lockers per page")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.rounds, args.profile))
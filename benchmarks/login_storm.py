@@ -0,0 +1,74 @@
+"""
+Latency of ordinary authenticated requests while a storm of logins is
+running, with bcrypt on the hashing pool and with bcrypt inline on the
+event loop (the old behaviour).
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, client, reset_database
+
+from app.core.security import create_access_token, get_password_hash, hashing_executor
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+
+PASSWORD = "benchmark-password"
+
+
+async def _inline(fn, *args):
+    return fn(*args)
+
+
+async def _probe(http, headers, seconds: float) -> Timer:
+    timer = Timer()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    while loop.time() < deadline:
+        with timer:
+            response = await http.get("/api/v1/vaults/availability", headers=headers)
+        response.raise_for_status()
+        await asyncio.sleep(0.01)
+    return timer
+
+
+async def _storm(http, logins: int, stop: asyncio.Event) -> None:
+    async def login():
+        while not stop.is_set():
+            await http.post("/api/v1/auth/login", data={"username": "bench@example.com", "password": PASSWORD})
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def main(logins: int, seconds: float) -> None:
+    await reset_database()
+    async with SessionLocal() as db:
+        db.add(User(
+            email="bench@example.com", name="Bench", hashed_password=get_password_hash(PASSWORD),
+            role="STAFF", status="ACTIVE",
+        ))
+        await db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+
+    pooled = hashing_executor.run
+    async with client() as http:
+        print(f"{'no logins':22} {(await _probe(http, headers, seconds)).summary()}")
+        for label, run in (("logins, hashing pool", pooled), ("logins, inline bcrypt", _inline)):
+            hashing_executor.run = run
+            stop = asyncio.Event()
+            storm = asyncio.create_task(_storm(http, logins, stop))
+            await asyncio.sleep(0.5)
+            timer = await _probe(http, headers, seconds)
+            stop.set()
+            await storm
+            print(f"{label:22} {timer.summary()}")
+    hashing_executor.run = pooled
+    hashing_executor.shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.seconds))
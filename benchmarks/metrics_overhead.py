@@ -0,0 +1,125 @@
+"""
+Cost of the instrumentation: MetricsMiddleware around a no-op ASGI app,
+the engine hooks around `SELECT 1`, and GET /lockers/available with and
+without MetricsMiddleware in the app's middleware stack.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import BENCHMARK_DATABASE_URL, Timer, client, reset_database
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.middleware import MetricsMiddleware
+from app.core.response_cache import response_cache
+from app.core.security import create_access_token
+from app.db.metrics import instrument_engine
+from app.db.session import engine
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'CUSTOMER', 'ACTIVE')",
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', 1000, 1000, 'OPERATIONAL')",
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1, 'L' || g, 'SMALL', 'AVAILABLE', 50 FROM generate_series(1, 1000) g
+    """,
+]
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _middleware_cost(n: int) -> tuple:
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    costs = []
+    for asgi in (_noop_app, MetricsMiddleware(_noop_app)):
+        start = time.perf_counter()
+        for _ in range(n):
+            await asgi(scope, receive, send)
+        costs.append((time.perf_counter() - start) / n * 1e6)
+    return tuple(costs)
+
+
+async def _hook_cost(n: int, rounds: int) -> tuple:
+    engines = [create_async_engine(BENCHMARK_DATABASE_URL, pool_size=1) for _ in range(2)]
+    instrument_engine(engines[1], "bench")
+    costs = ([], [])
+    # Alternate between the engines so drift on the server hits both alike.
+    for _ in range(rounds):
+        for bench_engine, samples in zip(engines, costs):
+            async with bench_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                start = time.perf_counter()
+                for _ in range(n):
+                    await conn.execute(text("SELECT 1"))
+                samples.append((time.perf_counter() - start) / n * 1e6)
+    for bench_engine in engines:
+        await bench_engine.dispose()
+    return tuple(statistics.median(samples) for samples in costs)
+
+
+async def _request_latency(requests: int) -> dict:
+    from app.main import app
+
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    # Every request must reach the database.
+    response_cache.ttl = 0
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+
+    with_metrics = list(app.user_middleware)
+    without_metrics = [m for m in with_metrics if m.cls is not MetricsMiddleware]
+    stacks = {}
+    for label, middleware in (("with", with_metrics), ("without", without_metrics)):
+        app.user_middleware = middleware
+        stacks[label] = app.build_middleware_stack()
+    results = {label: Timer() for label in stacks}
+    async with client() as http:
+        # Alternate stacks in short blocks so drift hits both alike.
+        for block in range(requests // 50 * 2 + 2):
+            label = ("with", "without")[block % 2]
+            app.middleware_stack = stacks[label]
+            for _ in range(50):
+                start = time.perf_counter()
+                response = await http.get("/api/v1/lockers/available", params={"limit": 50}, headers=headers)
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                # The first block of each is warm-up.
+                if block >= 2:
+                    results[label].samples.append(elapsed)
+    app.user_middleware = with_metrics
+    app.middleware_stack = app.build_middleware_stack()
+    return results
+
+
+async def main(n: int, requests: int) -> None:
+    bare, wrapped = await _middleware_cost(n)
+    print(f"middleware     no-op app {bare:7.2f}us  with MetricsMiddleware {wrapped:7.2f}us  (+{wrapped - bare:.2f}us/request)")
+    bare, hooked = await _hook_cost(n // 100, rounds=10)
+    print(f"engine hooks   SELECT 1  {bare:7.2f}us  instrumented           {hooked:7.2f}us  (+{hooked - bare:.2f}us/query)")
+    results = await _request_latency(requests)
+    for label, timer in results.items():
+        print(f"GET /lockers/available {label:7} MetricsMiddleware: {timer.summary()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000, help="middleware calls; each engine round runs n/100 queries")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.requests))
@@ -0,0 +1,66 @@
+"""
+Per-page latency of GET /lockers/available at increasing depth, paging
+with skip/limit (OFFSET) versus the keyset cursor.
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, client, reset_database
+
+from sqlalchemy import text
+
+from app.api.pagination import encode_cursor
+from app.core.response_cache import response_cache
+from app.core.security import create_access_token
+from app.db.session import engine
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'CUSTOMER', 'ACTIVE')",
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', :lockers, :lockers, 'OPERATIONAL')",
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1, 'L' || g, 'SMALL', 'AVAILABLE', 50 FROM generate_series(1, :lockers) g
+    """,
+]
+
+
+async def main(lockers: int, limit: int, repeat: int) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"lockers": lockers})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE lockers"))
+    # Every request must reach the database.
+    response_cache.ttl = 0
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+
+    depths = [0, lockers // 10, lockers // 4, lockers // 2, lockers - limit]
+    async with client() as http:
+        print(f"{'depth':>8} {'offset p50':>11} {'cursor p50':>11}")
+        for depth in depths:
+            modes = {
+                "offset": {"skip": depth, "limit": limit},
+                # Locker ids run 1..N, so the cursor for row `depth` is its id.
+                "cursor": {"cursor": encode_cursor(depth), "limit": limit} if depth else {"limit": limit},
+            }
+            medians = {}
+            for mode, params in modes.items():
+                timer = Timer()
+                for _ in range(repeat):
+                    with timer:
+                        response = await http.get("/api/v1/lockers/available", params=params, headers=headers)
+                    response.raise_for_status()
+                medians[mode] = sorted(timer.samples)[len(timer.samples) // 2] * 1000
+            print(f"{depth:>8} {medians['offset']:>9.2f}ms {medians['cursor']:>9.2f}ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lockers", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.lockers, args.limit, args.repeat))
@@ -0,0 +1,117 @@
+"""
+Throughput of a request-shaped transaction (a locker lookup and the
+availability summary in one session) under concurrent load, for a matrix
+of pool settings. Each configuration gets its own engine built by
+engine_options(), so the numbers follow what the app would run with.
+
+DB_EXTERNAL_POOLER connects straight to PostgreSQL here; behind PgBouncer
+a new client connection is much cheaper than the server connection this
+measures.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import BENCHMARK_DATABASE_URL, reset_database
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.db.session import engine, engine_options
+
+SEED = [
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', 10000, 10000, 'OPERATIONAL')",
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1, 'L' || g, (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + g % 3]::locker_size, 'AVAILABLE', 50
+    FROM generate_series(1, 10000) g
+    """,
+    """
+    INSERT INTO vault_availability (vault_id, size, status, count)
+    SELECT vault_id, size, status, count(*) FROM lockers GROUP BY vault_id, size, status
+    """,
+]
+
+LOOKUP = text("SELECT id, locker_number, monthly_rent FROM lockers WHERE vault_id = :vault_id AND size = :size LIMIT 20")
+SUMMARY = text("SELECT size, status, count FROM vault_availability WHERE vault_id = :vault_id")
+
+MATRIX = [
+    # label, overrides
+    ("defaults (5+10, pre-ping)", {}),
+    ("5+10, no pre-ping", {"DB_POOL_PRE_PING": False}),
+    ("5+10, no statement cache", {"DB_STATEMENT_CACHE_SIZE": 0}),
+    ("20+10, pre-ping", {"DB_POOL_SIZE": 20}),
+    ("20+10, no pre-ping", {"DB_POOL_SIZE": 20, "DB_POOL_PRE_PING": False}),
+    ("50+0, no pre-ping", {"DB_POOL_SIZE": 50, "DB_MAX_OVERFLOW": 0, "DB_POOL_PRE_PING": False}),
+    ("external pooler (NullPool)", {"DB_EXTERNAL_POOLER": True}),
+]
+
+
+async def _run(overrides: dict, clients: int, seconds: float) -> tuple:
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        bench_engine = create_async_engine(BENCHMARK_DATABASE_URL, **engine_options())
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+    done = 0
+    timeouts = 0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+
+    async def worker(n: int):
+        nonlocal done, timeouts
+        sizes = ("SMALL", "MEDIUM", "LARGE")
+        while loop.time() < deadline:
+            try:
+                async with AsyncSession(bench_engine) as db:
+                    await db.execute(LOOKUP, {"vault_id": 1, "size": sizes[n % 3]})
+                    await db.execute(SUMMARY, {"vault_id": 1})
+                    await db.commit()
+                done += 1
+            except exc.TimeoutError:
+                timeouts += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    await bench_engine.dispose()
+    return done / elapsed, timeouts
+
+
+async def main(clients: int, seconds: float, rounds: int) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    await engine.dispose()
+
+    # Run the whole matrix several times over, so drift affects every
+    # configuration alike, and report the median round.
+    throughputs = {label: [] for label, _ in MATRIX}
+    timeouts = {label: 0 for label, _ in MATRIX}
+    for _ in range(rounds):
+        for label, overrides in MATRIX:
+            throughput, timed_out = await _run(overrides, clients, seconds)
+            throughputs[label].append(throughput)
+            timeouts[label] += timed_out
+
+    print(f"{clients} concurrent clients, {rounds} rounds of {seconds:.0f}s per configuration")
+    print(f"{'configuration':30} {'median tx/s':>12} {'range':>13} {'pool timeouts':>14}")
+    for label, samples in throughputs.items():
+        spread = f"{min(samples):,.0f}-{max(samples):,.0f}"
+        print(f"{label:30} {statistics.median(samples):>12,.0f} {spread:>13} {timeouts[label]:>14}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.seconds, args.rounds))
@@ -0,0 +1,58 @@
+"""
+Per-request latency of an authenticated endpoint with and without the
+principal cache in get_current_user.
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, client, reset_database
+
+from app.core.cache import CacheBackend
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+
+
+class NoCache(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+async def main(requests: int) -> None:
+    await reset_database()
+    async with SessionLocal() as db:
+        db.add(User(email="bench@example.com", name="Bench", hashed_password="x", role="STAFF", status="ACTIVE"))
+        await db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+    # Staff-only and uncached, so each request is auth plus one small query.
+    url = "/api/v1/vaults/availability"
+
+    cached = principal_cache.backend
+    async with client() as http:
+        for label, backend in (("without cache", NoCache()), ("with cache", cached)):
+            principal_cache.use_backend(backend)
+            timer = Timer()
+            for _ in range(requests // 10):
+                await http.get(url, headers=headers)
+            for _ in range(requests):
+                with timer:
+                    response = await http.get(url, headers=headers)
+                response.raise_for_status()
+            print(f"{label:14} {timer.summary()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,72 @@
+"""
+Provisioning a vault's lockers through the bulk endpoint (JSON array and
+streamed NDJSON) versus one POST /lockers/vaults/{id}/ per locker.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import client, reset_database
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.models.vault import Vault
+
+
+def _locker(i: int) -> dict:
+    return {"locker_number": f"L{i}", "size": ("SMALL", "MEDIUM", "LARGE")[i % 3], "monthly_rent": 50}
+
+
+async def main(lockers: int, per_item: int) -> None:
+    await reset_database()
+    async with SessionLocal() as db:
+        db.add(User(email="bench@example.com", name="Bench", hashed_password="x", role="STAFF", status="ACTIVE"))
+        vaults = [Vault(location=f"Bench {i}", total_lockers=0, available_lockers=0, status="OPERATIONAL") for i in range(3)]
+        db.add_all(vaults)
+        await db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+
+    async with client() as http:
+        body = json.dumps([_locker(i) for i in range(lockers)]).encode()
+        start = time.perf_counter()
+        response = await http.post(f"/api/v1/lockers/vaults/{vaults[0].id}/bulk", content=body, headers=headers | {
+            "Content-Type": "application/json",
+        })
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"bulk JSON     {lockers} lockers in {elapsed:.2f}s ({lockers / elapsed:,.0f}/s)")
+
+        async def ndjson():
+            for start_at in range(0, lockers, 1000):
+                yield b"".join(
+                    json.dumps(_locker(i)).encode() + b"\n" for i in range(start_at, min(start_at + 1000, lockers))
+                )
+
+        start = time.perf_counter()
+        response = await http.post(f"/api/v1/lockers/vaults/{vaults[1].id}/bulk", content=ndjson(), headers=headers | {
+            "Content-Type": "application/x-ndjson",
+        })
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"bulk NDJSON   {lockers} lockers in {elapsed:.2f}s ({lockers / elapsed:,.0f}/s)")
+
+        start = time.perf_counter()
+        for i in range(per_item):
+            response = await http.post(
+                f"/api/v1/lockers/vaults/{vaults[2].id}/", json=_locker(i) | {"vault_id": vaults[2].id, "status": "AVAILABLE"},
+                headers=headers,
+            )
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"per-item POST {per_item} lockers in {elapsed:.2f}s ({per_item / elapsed:,.0f}/s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lockers", type=int, default=50_000)
+    parser.add_argument("--per-item", type=int, default=5000, help="lockers created one request at a time")
+    args = parser.parse_args()
+    asyncio.run(main(args.lockers, args.per_item))
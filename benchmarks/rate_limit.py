@@ -0,0 +1,72 @@
+"""
+Per-request cost of RateLimitMiddleware around a no-op ASGI app: disabled,
+anonymous callers keyed by IP, and bearer-token callers keyed by the JWT
+subject, with one client and with many spread over the shards. No
+database is needed.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/unused")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from app.api.middleware import RateLimitMiddleware
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _scope(ip: str, token: str = None) -> dict:
+    headers = [(b"host", b"bench")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {"type": "http", "method": "GET", "path": "/api/v1/lockers/available", "headers": headers, "client": (ip, 50000)}
+
+
+async def _cost(app, scopes, n: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(n):
+        await app(scopes[i % len(scopes)], receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main(n: int, clients: int) -> None:
+    # Budgets large enough that no request is rejected; a 429 is cheaper still.
+    settings.RATE_LIMIT_READ_PER_MINUTE = 10**9
+    middleware = RateLimitMiddleware(_noop_app)
+    tokens = [create_access_token(subject=f"client{i}@example.com") for i in range(clients)]
+    cases = [
+        # label, app, RATE_LIMIT_ENABLED, scopes
+        ("no-op app, no middleware", _noop_app, True, [_scope("10.0.0.1")]),
+        ("rate limiting disabled", middleware, False, [_scope("10.0.0.1")]),
+        ("anonymous, 1 IP", middleware, True, [_scope("10.0.0.1")]),
+        (f"anonymous, {clients} IPs", middleware, True, [_scope(f"10.0.{i // 256}.{i % 256}") for i in range(clients)]),
+        ("bearer token, 1 user", middleware, True, [_scope("10.0.0.1", tokens[0])]),
+        (f"bearer token, {clients} users", middleware, True, [_scope("10.0.0.1", token) for token in tokens]),
+    ]
+    for label, app, enabled, scopes in cases:
+        settings.RATE_LIMIT_ENABLED = enabled
+        await _cost(app, scopes, len(scopes))
+        print(f"{label:30} {await _cost(app, scopes, n):7.2f}us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.clients))
@@ -0,0 +1,78 @@
+"""
+Cost of renewing access tokens by logging in again (bcrypt on every
+request) versus redeeming refresh tokens (one indexed UPDATE and an
+INSERT). Each client loops for --seconds; reported are requests/s,
+latency and the app process CPU time per request, which includes the
+hashing pool threads.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import Timer, client, reset_database
+
+from app.core.security import get_password_hash, hashing_executor
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+
+PASSWORD = "benchmark-password"
+
+
+async def _login(http, email: str) -> dict:
+    response = await http.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()
+
+
+async def _run(http, users, seconds: float, renew) -> str:
+    timer = Timer()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+
+    async def worker(email: str):
+        state = await _login(http, email)
+        while loop.time() < deadline:
+            with timer:
+                state = await renew(http, email, state)
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(worker(email) for email in users))
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    n = len(timer.samples)
+    return f"{n / wall:8,.0f} req/s  cpu {cpu / n * 1000:6.2f}ms/request  {timer.summary()}"
+
+
+async def _by_login(http, email: str, state: dict) -> dict:
+    return await _login(http, email)
+
+
+async def _by_refresh(http, email: str, state: dict) -> dict:
+    response = await http.post("/api/v1/auth/refresh", json={"refresh_token": state["refresh_token"]})
+    response.raise_for_status()
+    return response.json()
+
+
+async def main(clients: int, seconds: float) -> None:
+    await reset_database()
+    hashed = get_password_hash(PASSWORD)
+    users = [f"bench{n}@example.com" for n in range(clients)]
+    async with SessionLocal() as db:
+        db.add_all(
+            User(email=email, name="Bench", hashed_password=hashed, role="CUSTOMER", status="ACTIVE")
+            for email in users
+        )
+        await db.commit()
+
+    async with client() as http:
+        for label, renew in (("login", _by_login), ("refresh", _by_refresh)):
+            print(f"{label:8} {await _run(http, users, seconds, renew)}")
+    hashing_executor.shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients, one user each")
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.seconds))
@@ -0,0 +1,75 @@
+"""
+Throughput of GET /lockers/available (1000-row pages) and /vaults/list
+served from the response cache, revalidated with If-None-Match (304), and
+with the cache disabled so every request queries and serializes.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import client, reset_database
+
+from sqlalchemy import text
+
+from app.core.response_cache import response_cache
+from app.core.security import create_access_token
+from app.db.session import engine
+
+SEED = [
+    "INSERT INTO users (email, name, hashed_password, role, status) VALUES ('bench@example.com', 'Bench', 'x', 'STAFF', 'ACTIVE')",
+    """
+    INSERT INTO vaults (location, total_lockers, available_lockers, status)
+    SELECT 'Vault ' || v, 1000, 1000, 'OPERATIONAL' FROM generate_series(1, 100) v
+    """,
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1 + (g - 1) / 1000, 'L' || g, (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + g % 3]::locker_size, 'AVAILABLE', 50
+    FROM generate_series(1, 100000) g
+    """,
+]
+
+ROUTES = [
+    ("/lockers/available", "/api/v1/lockers/available", {"limit": 1000}),
+    ("/vaults/list", "/api/v1/vaults/list", {"limit": 100}),
+]
+
+
+async def _throughput(http, url, params, headers, seconds: float) -> float:
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        response = await http.get(url, params=params, headers=headers)
+        assert response.status_code in (200, 304), response.status_code
+        done += 1
+    return done / seconds
+
+
+async def main(seconds: float) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+    headers = {"Authorization": f"Bearer {create_access_token(subject='bench@example.com')}"}
+    ttl = response_cache.ttl
+
+    print(f"{'route':20} {'uncached':>12} {'cached':>12} {'304':>12}  (requests/s)")
+    async with client() as http:
+        for label, url, params in ROUTES:
+            response_cache.ttl = 0
+            uncached = await _throughput(http, url, params, headers, seconds)
+            response_cache.ttl = ttl
+            etag = (await http.get(url, params=params, headers=headers)).headers["etag"]
+            cached = await _throughput(http, url, params, headers, seconds)
+            revalidated = await _throughput(http, url, params, headers | {"If-None-Match": etag}, seconds)
+            print(f"{label:20} {uncached:>12,.0f} {cached:>12,.0f} {revalidated:>12,.0f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds))
@@ -0,0 +1,87 @@
+"""
+A retry storm on POST /transactions/allocations/{id}/pay_rent: every client
+sends each payment several times at once, as a client library retrying on
+timeouts would, first with an Idempotency-Key and then without one.
+Reports throughput and how many payments were actually charged.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import client, reset_database
+
+from sqlalchemy import func, select, text
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.payment import Payment
+
+SEED = [
+    """
+    INSERT INTO users (email, name, hashed_password, role, status)
+    SELECT 'client' || g || '@example.com', 'Client ' || g, 'x', 'CUSTOMER', 'ACTIVE' FROM generate_series(1, :clients) g
+    """,
+    "INSERT INTO vaults (location, total_lockers, available_lockers, status) VALUES ('Bench', :clients, 0, 'OPERATIONAL')",
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1, 'L' || g, 'SMALL', 'ALLOCATED', 50 FROM generate_series(1, :clients) g
+    """,
+    """
+    INSERT INTO locker_allocations (locker_id, user_id, allocated_at, expiry_date, status)
+    SELECT g, g, now(), now() + interval '30 days', 'ACTIVE' FROM generate_series(1, :clients) g
+    """,
+]
+
+
+async def _storm(http, clients: int, payments: int, retries: int, keyed: bool) -> float:
+    async def pay(n: int):
+        allocation_id = n + 1
+        headers = {"Authorization": f"Bearer {create_access_token(subject=f'client{allocation_id}@example.com')}"}
+        for payment in range(payments):
+            if keyed:
+                headers["Idempotency-Key"] = f"payment-{payment}"
+            responses = await asyncio.gather(*(
+                http.post(
+                    f"/api/v1/transactions/allocations/{allocation_id}/pay_rent", headers=headers,
+                    json={"allocation_id": allocation_id, "amount": 50},
+                )
+                for _ in range(retries)
+            ))
+            for response in responses:
+                response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pay(n) for n in range(clients)))
+    return time.perf_counter() - start
+
+
+async def main(clients: int, payments: int, retries: int) -> None:
+    await reset_database()
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"clients": clients})
+
+    requests = clients * payments * retries
+    print(f"{clients} clients x {payments} payments, each sent {retries} times at once ({requests} requests)")
+    async with client() as http:
+        for keyed in (True, False):
+            async with engine.begin() as conn:
+                await conn.execute(text("TRUNCATE payments, idempotency_keys"))
+            elapsed = await _storm(http, clients, payments, retries, keyed)
+            async with SessionLocal() as db:
+                charged = await db.scalar(select(func.count()).select_from(Payment))
+            label = "Idempotency-Key" if keyed else "no key"
+            print(
+                f"{label:16} {elapsed:6.2f}s {requests / elapsed:7.0f} requests/s "
+                f"payments charged={charged} (intended {clients * payments})"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--payments", type=int, default=5, help="distinct payments per client")
+    parser.add_argument("--retries", type=int, default=5, help="copies of each payment sent concurrently")
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.payments, args.retries))
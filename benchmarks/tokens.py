@@ -0,0 +1,72 @@
+"""
+Access token verifications per second: the previous per-call
+jose.jwt.decode(token, settings.SECRET_KEY, ...) path against TokenService
+with prepared keys, with and without a verified-token cache hit, for HS256,
+RS256 and ES256. No database is needed.
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/unused")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwt
+
+from app.core.cache import LRUCache
+from app.core.tokens import TokenService
+
+
+def _key_pair(algorithm: str) -> tuple:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048) if algorithm == "RS256" \
+        else ec.generate_private_key(ec.SECP256R1())
+    private = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private, public
+
+
+def _rate(verify, token: str, seconds: float) -> float:
+    verify(token)
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            verify(token)
+        done += 100
+    return done / seconds
+
+
+def main(seconds: float) -> None:
+    secret = os.environ["SECRET_KEY"]
+    print(f"{'algorithm':10} {'jose.decode':>12} {'prepared':>12} {'cache hit':>12}  (verifications/s)")
+    for algorithm in ("HS256", "RS256", "ES256"):
+        if algorithm == "HS256":
+            signing, verifying = secret, secret
+            keys = dict(secret_key=secret)
+        else:
+            signing, verifying = _key_pair(algorithm)
+            keys = dict(private_key=signing, public_key=verifying)
+        uncached = TokenService(algorithm, LRUCache(maxsize=0), **keys)
+        cached = TokenService(algorithm, LRUCache(maxsize=100), **keys)
+        token = cached.create("bench@example.com")
+        rates = [
+            _rate(lambda token: jwt.decode(token, verifying, algorithms=[algorithm]), token, seconds),
+            _rate(uncached.verify, token, seconds),
+            _rate(cached.verify, token, seconds),
+        ]
+        print(f"{algorithm:10} " + " ".join(f"{rate:>12,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    main(args.seconds)
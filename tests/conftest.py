@@ -0,0 +1,79 @@
+"""
+The suite runs against a real PostgreSQL database named by TEST_DATABASE_URL,
+e.g. postgresql+asyncpg://postgres@localhost/vault_test. It is migrated to
+head once and every table is truncated before each test, so never point it
+at a database whose data you want to keep. Without TEST_DATABASE_URL every
+test is skipped.
+"""
+import os
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL") or None
+
+# Settings are read when app modules are imported, so configure them first.
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://localhost/vault_test"
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["EXPIRY_SWEEPER_ENABLED"] = "false"
+os.environ["ANALYTICS_ROLLUP_ENABLED"] = "false"
+
+from pathlib import Path
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import rate_limiter
+from app.core.response_cache import response_cache
+from app.core.tokens import token_service
+from app.db.base import Base
+from app.db.session import engine, recent_writers
+from app.main import app
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL is None:
+        skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+        for item in items:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture(autouse=True)
+async def clean_db(migrated):
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    for cache in (principal_cache, response_cache, token_service.cache, recent_writers):
+        cache.clear()
+    response_cache.versions.clear()
+    response_cache.bumped_at.clear()
+    rate_limiter.backend.clear()
+    yield
+    # Pooled connections belong to this test's event loop.
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
@@ -0,0 +1,100 @@
+"""
+Helpers that create rows directly, bypassing the API, and measure the SQL
+the API sends.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import count
+from typing import List, Optional
+
+from sqlalchemy import event, insert
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.session import SessionLocal, engine
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.models.user import User
+from app.models.vault import Vault
+from app.services import availability, locker_allocation
+
+PASSWORD = "correct horse battery staple"
+
+_ids = count(1)
+
+
+@lru_cache
+def password_hash() -> str:
+    return get_password_hash(PASSWORD)
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(subject=user.email)}"}
+
+
+async def create_user(role: str = "CUSTOMER", status: str = "ACTIVE") -> User:
+    n = next(_ids)
+    async with SessionLocal() as db:
+        user = User(
+            email=f"user{n}@example.com",
+            name=f"User {n}",
+            phone=f"+1555{n:07d}",
+            hashed_password=password_hash(),
+            role=role,
+            status=status,
+        )
+        db.add(user)
+        await db.commit()
+    return user
+
+
+async def create_vault(*sizes: str, rent: float = 50.0) -> tuple[Vault, List[int]]:
+    """
+    An operational vault with one AVAILABLE locker per size given, with its
+    counters and availability summary filled in. Returns the vault and the
+    locker ids.
+    """
+    async with SessionLocal() as db:
+        vault = Vault(
+            location=f"Vault {next(_ids)}",
+            total_lockers=len(sizes),
+            available_lockers=len(sizes),
+            status="OPERATIONAL",
+        )
+        db.add(vault)
+        await db.flush()
+        locker_ids = []
+        for i, size in enumerate(sizes, 1):
+            result = await db.execute(
+                insert(Locker)
+                .values(vault_id=vault.id, locker_number=f"L{i}", size=size, status="AVAILABLE", monthly_rent=rent)
+                .returning(Locker.id)
+            )
+            locker_ids.append(result.scalar_one())
+            await availability.record_transition(db, vault.id, size, to_status="AVAILABLE")
+        await db.commit()
+    return vault, locker_ids
+
+
+async def create_allocation(user: User, locker_id: int, expiry_date: Optional[datetime] = None) -> LockerAllocation:
+    async with SessionLocal() as db:
+        allocation = await locker_allocation.allocate_locker(db, locker_id, user.id, expiry_date)
+        await db.commit()
+    return allocation
+
+
+@contextmanager
+def capture_queries():
+    """
+    Collect the SQL statements sent to the primary engine inside the block.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.v1.endpoints import transactions
+from app.db.session import SessionLocal
+from app.models.access_log import AccessLog
+from app.services.access_log import AccessLogWriter, access_log_events_total
+from factories import auth_headers, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+def counts() -> dict:
+    return {
+        sample.split('"')[1]: float(sample.rpartition(" ")[2])
+        for sample in access_log_events_total.samples()
+    }
+
+
+def delta(before: dict, after: dict) -> dict:
+    return {outcome: after[outcome] - before.get(outcome, 0) for outcome in after if after[outcome] != before.get(outcome, 0)}
+
+
+async def logged(**filters) -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(AccessLog).filter_by(**filters))
+
+
+async def wait_for_rows(n: int, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while await logged() < n:
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+async def locker():
+    user = await create_user()
+    _, locker_ids = await create_vault("SMALL")
+    return user, locker_ids[0]
+
+
+async def test_full_batches_are_written_without_waiting_for_the_interval(locker):
+    user, locker_id = locker
+    writer = AccessLogWriter(max_queue=100, batch_size=3, flush_interval=60)
+    writer.start()
+    for _ in range(7):
+        writer.record(locker_id, user.id, "INSPECTION")
+    await wait_for_rows(6)
+    await asyncio.sleep(0.1)
+    # The seventh event waits for a full batch or the interval ...
+    assert await logged() == 6
+    # ... or for shutdown, which drains the queue.
+    await writer.stop()
+    assert await logged() == 7
+    assert writer.queue_depth() == 0
+
+
+async def test_partial_batches_are_written_after_the_interval(locker):
+    user, locker_id = locker
+    writer = AccessLogWriter(max_queue=100, batch_size=100, flush_interval=0.05)
+    writer.start()
+    try:
+        writer.record(locker_id, user.id, "DEPOSIT", count=2)
+        await wait_for_rows(2, timeout=1.0)
+    finally:
+        await writer.stop()
+
+
+async def test_events_are_dropped_and_counted_when_the_queue_is_full(locker):
+    user, locker_id = locker
+    writer = AccessLogWriter(max_queue=3, batch_size=10, flush_interval=60)
+    before = counts()
+    assert writer.record(locker_id, user.id, "DEPOSIT", count=2)
+    assert not writer.record(locker_id, user.id, "DEPOSIT", count=3)
+    assert writer.queue_depth() == 3
+    assert delta(before, counts()) == {"enqueued": 3, "dropped": 2}
+
+    writer.start()
+    await writer.stop()
+    assert await logged() == 3
+    assert delta(before, counts()) == {"enqueued": 3, "dropped": 2, "written": 3}
+
+
+async def test_failed_batches_are_counted_and_the_writer_keeps_going(locker):
+    user, locker_id = locker
+    writer = AccessLogWriter(max_queue=100, batch_size=1, flush_interval=60)
+    before = counts()
+    writer.start()
+    writer.record(locker_id + 1000, user.id, "DEPOSIT")
+    writer.record(locker_id, user.id, "DEPOSIT")
+    await writer.stop()
+    assert await logged() == 1
+    assert delta(before, counts()) == {"enqueued": 2, "failed": 1, "written": 1}
+
+
+async def test_asset_routes_log_one_event_per_asset(client, monkeypatch):
+    user = await create_user()
+    _, locker_ids = await create_vault("LARGE")
+    allocation = await create_allocation(user, locker_ids[0])
+    writer = AccessLogWriter(max_queue=100, batch_size=100, flush_interval=60)
+    monkeypatch.setattr(transactions, "access_log_writer", writer)
+    headers = auth_headers(user)
+    url = f"/api/v1/transactions/allocations/{allocation.id}/assets"
+    asset = {"asset_name": "Deed", "estimated_value": 10, "type": "DOCUMENT"}
+
+    single = await client.post(url, headers=headers, json=asset | {"allocation_id": allocation.id})
+    batch = await client.post(f"{url}/batch", headers=headers, json={"assets": [asset] * 4})
+    ids = [item["id"] for item in batch.json()]
+    assert (await client.post(f"{url}/withdraw", headers=headers, json={"asset_ids": ids[:3]})).status_code == 200
+    assert (await client.delete(f"/api/v1/transactions/assets/{single.json()['id']}", headers=headers)).status_code == 204
+    assert (await client.get(url, headers=headers)).status_code == 200
+    # A rejected batch logs nothing.
+    rejected = await client.post(f"{url}/withdraw", headers=headers, json={"asset_ids": [ids[3], 10**6]})
+    assert rejected.status_code == 404
+
+    writer.start()
+    await writer.stop()
+    assert await logged(locker_id=locker_ids[0], user_id=user.id) == 10
+    assert [await logged(access_type=kind) for kind in ("DEPOSIT", "WITHDRAW", "INSPECTION")] == [5, 4, 1]
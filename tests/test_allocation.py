@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models.locker_allocation import LockerAllocation
+from app.models.vault import Vault
+from app.models.vault_availability import VaultAvailability
+from factories import auth_headers, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def availability_counts(vault_id):
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(VaultAvailability.size, VaultAvailability.status, VaultAvailability.count)
+            .where(VaultAvailability.vault_id == vault_id)
+        )
+        return {(size, locker_status): count for size, locker_status, count in result.all() if count}
+
+
+async def test_concurrent_claims_on_one_locker_allocate_it_once(client):
+    users = [await create_user() for _ in range(20)]
+    vault, (locker_id,) = await create_vault("SMALL")
+
+    responses = await asyncio.gather(*(
+        client.post(f"/api/v1/lockers/{locker_id}/allocate", headers=auth_headers(user)) for user in users
+    ))
+
+    assert sorted(r.status_code for r in responses) == [201] + [400] * 19
+    async with SessionLocal() as db:
+        assert await db.scalar(select(func.count()).select_from(LockerAllocation)) == 1
+        assert (await db.get(Vault, vault.id)).available_lockers == 0
+    assert await availability_counts(vault.id) == {("SMALL", "ALLOCATED"): 1}
+
+
+async def test_concurrent_allocate_any_hands_out_each_locker_once(client):
+    users = [await create_user() for _ in range(30)]
+    vault, locker_ids = await create_vault(*["SMALL"] * 10, "LARGE")
+
+    responses = await asyncio.gather(*(
+        client.post(f"/api/v1/lockers/vaults/{vault.id}/allocate?size=small", headers=auth_headers(user))
+        for user in users
+    ))
+
+    allocated = [r.json()["locker_id"] for r in responses if r.status_code == 201]
+    assert sorted(allocated) == locker_ids[:10]
+    assert {r.status_code for r in responses if r.status_code != 201} == {400}
+    async with SessionLocal() as db:
+        assert (await db.get(Vault, vault.id)).available_lockers == 1
+    assert await availability_counts(vault.id) == {("SMALL", "ALLOCATED"): 10, ("LARGE", "AVAILABLE"): 1}
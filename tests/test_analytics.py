@@ -0,0 +1,237 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select, update
+
+from app.db.session import SessionLocal
+from app.models.allocation_duration_daily import AllocationDurationDaily
+from app.models.allocation_duration_stale_day import AllocationDurationStaleDay
+from app.models.locker_allocation import LockerAllocation
+from app.models.payment import Payment
+from app.models.vault_occupancy_daily import VaultOccupancyDaily
+from app.models.vault_revenue_daily import VaultRevenueDaily
+from app.services import analytics
+from app.services.expiry_sweeper import expire_batch
+from factories import auth_headers, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+TODAY = datetime.utcnow().date()
+
+
+def noon(day: date) -> datetime:
+    return datetime.combine(day, time(12))
+
+
+async def rows(model) -> list:
+    async with SessionLocal() as db:
+        result = await db.execute(select(model).order_by(*model.__table__.primary_key.columns))
+        return [
+            tuple(getattr(row, column.name) for column in model.__table__.columns)
+            for row in result.scalars()
+        ]
+
+
+async def ended(user, locker_id, days_ago: int, lasted: int, status: str = "EXPIRED") -> LockerAllocation:
+    """
+    An allocation that ran for `lasted` days up to noon `days_ago` days ago.
+    """
+    expiry = noon(TODAY - timedelta(days=days_ago))
+    allocation = await create_allocation(user, locker_id, expiry)
+    async with SessionLocal() as db:
+        await db.execute(
+            update(LockerAllocation)
+            .where(LockerAllocation.id == allocation.id)
+            .values(allocated_at=expiry - timedelta(days=lasted), status=status)
+        )
+        await db.commit()
+    return allocation
+
+
+async def test_occupancy_snapshots_today_and_replaces_it_on_rerun():
+    user = await create_user()
+    vault, locker_ids = await create_vault("SMALL", "SMALL", "LARGE")
+    await create_allocation(user, locker_ids[0])
+    yesterday = TODAY - timedelta(days=1)
+    async with SessionLocal() as db:
+        assert await analytics.rollup_occupancy(db, yesterday) == 2
+        assert await analytics.rollup_occupancy(db, TODAY) == 2
+    await create_allocation(user, locker_ids[2])
+
+    async with SessionLocal() as db:
+        assert await analytics.rollup_occupancy(db, TODAY) == 2
+    assert await rows(VaultOccupancyDaily) == [
+        (yesterday, vault.id, "SMALL", 1, 2),
+        (yesterday, vault.id, "LARGE", 0, 1),
+        (TODAY, vault.id, "SMALL", 1, 2),
+        (TODAY, vault.id, "LARGE", 1, 1),
+    ]
+
+
+async def test_revenue_counts_successful_payments_per_vault_and_day():
+    user = await create_user()
+    first, first_lockers = await create_vault("SMALL")
+    second, second_lockers = await create_vault("LARGE")
+    mine = await create_allocation(user, first_lockers[0])
+    theirs = await create_allocation(user, second_lockers[0])
+    three_days_ago = TODAY - timedelta(days=3)
+
+    async def pay(allocation, amount, created_at, status="SUCCESSFUL"):
+        async with SessionLocal() as db:
+            await db.execute(
+                insert(Payment).values(allocation_id=allocation.id, amount=amount, status=status, created_at=created_at)
+            )
+            await db.commit()
+
+    await pay(mine, 40, noon(three_days_ago))
+    await pay(mine, 10, noon(TODAY))
+    await pay(mine, 15, noon(TODAY))
+    await pay(mine, 99, noon(TODAY), status="FAILED")
+    await pay(theirs, 70, noon(TODAY), status="PENDING")
+    async with SessionLocal() as db:
+        assert await analytics.rollup_revenue(db) == 2
+    assert await rows(VaultRevenueDaily) == [(three_days_ago, first.id, 1, 40.0), (TODAY, first.id, 2, 25.0)]
+
+    # A second run over the same window replaces the recent days rather than
+    # adding to them, and picks up what arrived since.
+    await pay(theirs, 70, noon(TODAY))
+    async with SessionLocal() as db:
+        assert await analytics.rollup_revenue(db) == 2
+        assert await analytics.rollup_revenue(db) == 2
+    assert await rows(VaultRevenueDaily) == [
+        (three_days_ago, first.id, 1, 40.0),
+        (TODAY, first.id, 2, 25.0),
+        (TODAY, second.id, 1, 70.0),
+    ]
+
+
+async def test_durations_count_ended_allocations_by_expiry_day():
+    user = await create_user()
+    vault, locker_ids = await create_vault("SMALL", "SMALL", "MEDIUM", "LARGE")
+    await ended(user, locker_ids[0], days_ago=5, lasted=2)
+    await ended(user, locker_ids[1], days_ago=1, lasted=3)
+    await ended(user, locker_ids[2], days_ago=1, lasted=6, status="TERMINATED")
+    await create_allocation(user, locker_ids[3])
+
+    async with SessionLocal() as db:
+        assert await analytics.rollup_allocation_durations(db) == 2
+    expected = [
+        (TODAY - timedelta(days=5), vault.id, 1, 2 * 86400.0),
+        (TODAY - timedelta(days=1), vault.id, 2, 9 * 86400.0),
+    ]
+    assert await rows(AllocationDurationDaily) == expected
+
+    # Only the newest day and the one before it are recomputed.
+    async with SessionLocal() as db:
+        assert await analytics.rollup_allocation_durations(db) == 1
+    assert await rows(AllocationDurationDaily) == expected
+
+
+async def test_late_expiries_and_revived_allocations_rebuild_their_days(client):
+    user = await create_user()
+    vault, locker_ids = await create_vault("SMALL", "SMALL")
+    # The sweeper has not reached this one, which ended ten days ago.
+    overdue = await ended(user, locker_ids[0], days_ago=10, lasted=20, status="ACTIVE")
+    await ended(user, locker_ids[1], days_ago=1, lasted=4)
+    async with SessionLocal() as db:
+        await analytics.rollup_allocation_durations(db)
+    assert await rows(AllocationDurationDaily) == [(TODAY - timedelta(days=1), vault.id, 1, 4 * 86400.0)]
+
+    async with SessionLocal() as db:
+        assert await expire_batch(db, 10, datetime.utcnow()) == 1
+        assert await analytics.rollup_allocation_durations(db) == 2
+    assert await rows(AllocationDurationDaily) == [
+        (TODAY - timedelta(days=10), vault.id, 1, 20 * 86400.0),
+        (TODAY - timedelta(days=1), vault.id, 1, 4 * 86400.0),
+    ]
+    assert await rows(AllocationDurationStaleDay) == []
+
+    # Paying the rent revives the allocation, so it no longer ended that day.
+    response = await client.post(
+        f"/api/v1/transactions/allocations/{overdue.id}/pay_rent",
+        json={"allocation_id": overdue.id, "amount": 50},
+        headers=auth_headers(user),
+    )
+    assert response.status_code == 201
+    assert await rows(AllocationDurationStaleDay) == [(TODAY - timedelta(days=10),)]
+    async with SessionLocal() as db:
+        assert await analytics.rollup_allocation_durations(db) == 1
+        assert await db.scalar(select(func.count()).select_from(AllocationDurationStaleDay)) == 0
+    assert await rows(AllocationDurationDaily) == [(TODAY - timedelta(days=1), vault.id, 1, 4 * 86400.0)]
+
+
+async def test_rollup_job_fills_every_table():
+    user = await create_user()
+    _, locker_ids = await create_vault("SMALL", "LARGE")
+    await ended(user, locker_ids[0], days_ago=2, lasted=1)
+    job = analytics.AnalyticsRollup(interval=60)
+    await job.run_once()
+    assert job.last_run_rows == 3
+    assert len(await rows(VaultOccupancyDaily)) == 2
+    assert len(await rows(AllocationDurationDaily)) == 1
+
+
+async def seed_rollups(vault_ids) -> None:
+    first, second = vault_ids
+    async with SessionLocal() as db:
+        await db.execute(insert(VaultOccupancyDaily), [
+            dict(day=date(2026, 9, 30), vault_id=first, size="SMALL", allocated=1, total=4),
+            dict(day=date(2026, 10, 1), vault_id=first, size="SMALL", allocated=2, total=4),
+            dict(day=date(2026, 10, 1), vault_id=first, size="LARGE", allocated=0, total=1),
+            dict(day=date(2026, 10, 1), vault_id=second, size="SMALL", allocated=3, total=3),
+        ])
+        await db.execute(insert(VaultRevenueDaily), [
+            dict(day=date(2026, 9, 30), vault_id=first, payments=1, revenue=40.0),
+            dict(day=date(2026, 10, 1), vault_id=first, payments=2, revenue=80.0),
+            dict(day=date(2026, 10, 15), vault_id=first, payments=1, revenue=40.0),
+            dict(day=date(2026, 10, 2), vault_id=second, payments=1, revenue=70.0),
+        ])
+        await db.execute(insert(AllocationDurationDaily), [
+            dict(day=date(2026, 9, 30), vault_id=first, allocations=1, total_seconds=86400.0),
+            dict(day=date(2026, 10, 1), vault_id=first, allocations=3, total_seconds=15 * 86400.0),
+            dict(day=date(2026, 10, 1), vault_id=second, allocations=2, total_seconds=86400.0),
+        ])
+        await db.commit()
+
+
+async def test_endpoints_read_the_rollups(client):
+    first, _ = await create_vault("SMALL")
+    second, _ = await create_vault("SMALL")
+    await seed_rollups([first.id, second.id])
+    headers = auth_headers(await create_user(role="STAFF"))
+
+    async def get(path, **params):
+        response = await client.get(f"/api/v1/analytics/{path}", headers=headers, params=params)
+        assert response.status_code == 200
+        return response.json()
+
+    assert await get("occupancy", vault_id=first.id, since="2026-10-01") == [
+        dict(day="2026-10-01", vault_id=first.id, size="SMALL", allocated=2, total=4),
+        dict(day="2026-10-01", vault_id=first.id, size="LARGE", allocated=0, total=1),
+    ]
+    assert [point["vault_id"] for point in await get("occupancy", size="SMALL", until="2026-10-01")] == [
+        first.id, first.id, second.id,
+    ]
+    assert await get("revenue") == [
+        dict(month="2026-09", vault_id=first.id, payments=1, revenue=40.0),
+        dict(month="2026-10", vault_id=first.id, payments=3, revenue=120.0),
+        dict(month="2026-10", vault_id=second.id, payments=1, revenue=70.0),
+    ]
+    assert await get("revenue", vault_id=first.id, until="2026-10-14") == [
+        dict(month="2026-09", vault_id=first.id, payments=1, revenue=40.0),
+        dict(month="2026-10", vault_id=first.id, payments=2, revenue=80.0),
+    ]
+    assert await get("allocation-duration") == [
+        dict(vault_id=first.id, allocations=4, average_days=4.0),
+        dict(vault_id=second.id, allocations=2, average_days=0.5),
+    ]
+    assert await get("allocation-duration", since="2026-10-01", vault_id=first.id) == [
+        dict(vault_id=first.id, allocations=3, average_days=5.0),
+    ]
+
+
+async def test_endpoints_are_staff_only(client):
+    headers = auth_headers(await create_user())
+    for path in ("occupancy", "revenue", "allocation-duration"):
+        assert (await client.get(f"/api/v1/analytics/{path}", headers=headers)).status_code == 403
+        assert (await client.get(f"/api/v1/analytics/{path}")).status_code == 401
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models.asset import Asset
+from app.models.vault_transaction import VaultTransaction
+from app.services.expiry_sweeper import expire_batch
+from factories import auth_headers, capture_queries, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def allocation_for(user, expiry_date=None):
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0], expiry_date)
+    return allocation, f"/api/v1/transactions/allocations/{allocation.id}/assets"
+
+
+async def counts(allocation_id):
+    async with SessionLocal() as db:
+        assets = await db.scalar(select(func.count()).select_from(Asset).where(Asset.allocation_id == allocation_id))
+        transactions = dict((await db.execute(
+            select(VaultTransaction.type, func.count())
+            .where(VaultTransaction.allocation_id == allocation_id)
+            .group_by(VaultTransaction.type)
+        )).all())
+    return assets, transactions
+
+
+def items(n):
+    return [dict(asset_name=f"Document {i}", estimated_value=i, type="document") for i in range(n)]
+
+
+async def test_batch_deposit_in_one_transaction(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    allocation, url = await allocation_for(user)
+    await client.get(url, headers=headers)
+
+    with capture_queries() as statements:
+        response = await client.post(f"{url}/batch", headers=headers, json=dict(assets=items(40)))
+    assert response.status_code == 201
+    created = response.json()
+    assert [asset["asset_name"] for asset in created] == [f"Document {i}" for i in range(40)]
+    assert all(asset["type"] == "DOCUMENT" for asset in created)
+    assert [asset["id"] for asset in created] == sorted(asset["id"] for asset in created)
+    # Ownership check, then one batched INSERT each for assets and transactions.
+    assert len(statements) == 3, statements
+    assert await counts(allocation.id) == (40, {"DEPOSIT": 40})
+
+
+async def test_batch_deposit_is_all_or_nothing(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    allocation, url = await allocation_for(user)
+
+    response = await client.post(f"{url}/batch", headers=headers, json=dict(assets=items(3) + [
+        dict(asset_name="Car", estimated_value=1, type="VEHICLE"),
+    ]))
+    assert response.status_code == 422
+    response = await client.post(f"{url}/batch", headers=headers, json=dict(assets=[]))
+    assert response.status_code == 422
+    assert await counts(allocation.id) == (0, {})
+
+
+async def test_batch_deposit_is_authorized_once_per_allocation(client):
+    owner, stranger = await create_user(), await create_user()
+    _, url = await allocation_for(owner)
+    response = await client.post(f"{url}/batch", headers=auth_headers(stranger), json=dict(assets=items(2)))
+    assert response.status_code == 404
+
+    expired, url = await allocation_for(owner, datetime.utcnow() - timedelta(days=1))
+    async with SessionLocal() as db:
+        await expire_batch(db, 10, datetime.utcnow())
+    response = await client.post(f"{url}/batch", headers=auth_headers(owner), json=dict(assets=items(2)))
+    assert response.status_code == 400
+    assert await counts(expired.id) == (0, {})
+
+
+async def test_batch_withdraw(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    allocation, url = await allocation_for(user)
+    _, other_url = await allocation_for(user)
+    ids = [asset["id"] for asset in (await client.post(f"{url}/batch", headers=headers, json=dict(assets=items(5)))).json()]
+    foreign = (await client.post(f"{other_url}/batch", headers=headers, json=dict(assets=items(1)))).json()[0]["id"]
+
+    # One asset from another allocation: nothing is removed.
+    response = await client.post(f"{url}/withdraw", headers=headers, json=dict(asset_ids=ids[:2] + [foreign]))
+    assert response.status_code == 404
+    assert str(foreign) in response.json()["detail"]
+    assert await counts(allocation.id) == (5, {"DEPOSIT": 5})
+
+    response = await client.post(f"{url}/withdraw", headers=headers, json=dict(asset_ids=ids[:3]))
+    assert response.status_code == 200
+    assert [row["type"] for row in response.json()] == ["WITHDRAW"] * 3
+    assert await counts(allocation.id) == (2, {"DEPOSIT": 5, "WITHDRAW": 3})
+    remaining = (await client.get(url, headers=headers)).json()
+    assert [asset["id"] for asset in remaining] == ids[3:]
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.core.principal_cache import principal_cache
+from app.core.security import hashing_executor
+from app.db.session import SessionLocal
+from app.models.user import User
+from factories import PASSWORD, auth_headers, capture_queries, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+def user_lookups(statements):
+    return [s for s in statements if "FROM users" in s]
+
+
+async def test_cached_principal_skips_users_table(client):
+    user = await create_user()
+    _, (locker_id,) = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_id)
+    url = f"/api/v1/transactions/allocations/{allocation.id}/assets"
+    headers = auth_headers(user)
+
+    with capture_queries() as statements:
+        assert (await client.get(url, headers=headers)).status_code == 200
+    assert len(user_lookups(statements)) == 1
+
+    hits = principal_cache.hits
+    with capture_queries() as statements:
+        assert (await client.get(url, headers=headers)).status_code == 200
+    assert user_lookups(statements) == []
+    assert principal_cache.hits == hits + 1
+
+
+async def test_status_change_invalidates_cached_principal(client):
+    user = await create_user()
+    _, (locker_id,) = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_id)
+    url = f"/api/v1/transactions/allocations/{allocation.id}/assets"
+    headers = auth_headers(user)
+    assert (await client.get(url, headers=headers)).status_code == 200
+
+    async with SessionLocal() as db:
+        db_user = await db.get(User, user.id)
+        db_user.status = "INACTIVE"
+        await db.commit()
+
+    response = await client.get(url, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+async def test_login_returns_503_when_hashing_pool_is_saturated(client, monkeypatch):
+    user = await create_user()
+    monkeypatch.setattr(hashing_executor, "in_flight", hashing_executor.capacity)
+
+    response = await client.post("/api/v1/auth/login", data={"username": user.email, "password": PASSWORD})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+async def test_login_does_not_block_the_event_loop(client):
+    user = await create_user()
+    loop = asyncio.get_running_loop()
+    stalls = []
+
+    async def ticker():
+        while True:
+            start = loop.time()
+            await asyncio.sleep(0.005)
+            stalls.append(loop.time() - start)
+
+    task = asyncio.create_task(ticker())
+    try:
+        response = await client.post("/api/v1/auth/login", data={"username": user.email, "password": PASSWORD})
+    finally:
+        task.cancel()
+    assert response.status_code == 200
+    # A bcrypt verify takes a few hundred milliseconds; none of it may run on the loop.
+    assert max(stalls) < 0.1
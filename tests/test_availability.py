@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.db.session import SessionLocal
+from app.models.locker import Locker
+from app.services.expiry_sweeper import expire_batch
+from factories import auth_headers, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def summary(client, headers, vault_id):
+    response = await client.get(f"/api/v1/vaults/availability?vault_id={vault_id}", headers=headers)
+    assert response.status_code == 200
+    return {(row["size"], row["status"]): row["count"] for row in response.json() if row["count"]}
+
+
+async def test_summary_follows_every_write_path(client):
+    admin = await create_user(role="ADMIN")
+    customer = await create_user()
+    headers = auth_headers(admin)
+    vault, _ = await create_vault()
+
+    response = await client.post(f"/api/v1/lockers/vaults/{vault.id}/", headers=headers, json=dict(
+        vault_id=vault.id, locker_number="A1", size="LARGE", status="AVAILABLE", monthly_rent=90,
+    ))
+    assert response.status_code == 201
+    response = await client.post(f"/api/v1/lockers/vaults/{vault.id}/bulk", headers=headers, json=[
+        dict(locker_number=f"B{i}", size="SMALL", monthly_rent=20) for i in range(5)
+    ])
+    assert response.status_code == 201
+    assert await summary(client, headers, vault.id) == {("LARGE", "AVAILABLE"): 1, ("SMALL", "AVAILABLE"): 5}
+
+    customer_headers = auth_headers(customer)
+    for size in ("SMALL", "LARGE"):
+        response = await client.post(f"/api/v1/lockers/vaults/{vault.id}/allocate?size={size}", headers=customer_headers)
+        assert response.status_code == 201
+    free = await client.get(f"/api/v1/lockers/available?vault_id={vault.id}&size=SMALL", headers=customer_headers)
+    response = await client.post(f"/api/v1/lockers/{free.json()[0]['id']}/allocate", headers=customer_headers)
+    assert response.status_code == 201
+    assert await summary(client, headers, vault.id) == {
+        ("LARGE", "ALLOCATED"): 1, ("SMALL", "ALLOCATED"): 2, ("SMALL", "AVAILABLE"): 3,
+    }
+
+    async with SessionLocal() as db:
+        assert await expire_batch(db, 100, datetime.utcnow() + timedelta(days=31)) == 3
+    assert await summary(client, headers, vault.id) == {("LARGE", "AVAILABLE"): 1, ("SMALL", "AVAILABLE"): 5}
+
+    response = await client.post("/api/v1/vaults/availability/reconcile", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_reconcile_reports_and_repairs_drift(client):
+    admin = await create_user(role="ADMIN")
+    headers = auth_headers(admin)
+    vault, locker_ids = await create_vault("SMALL", "SMALL", "MEDIUM")
+    # Changed behind the summary's back.
+    async with SessionLocal() as db:
+        await db.execute(update(Locker).where(Locker.id == locker_ids[0]).values(status="MAINTENANCE"))
+        await db.commit()
+
+    response = await client.post("/api/v1/vaults/availability/reconcile", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        dict(vault_id=vault.id, size="SMALL", status="AVAILABLE", expected=1, recorded=2),
+        dict(vault_id=vault.id, size="SMALL", status="MAINTENANCE", expected=1, recorded=0),
+    ]
+    assert await summary(client, headers, vault.id) == {
+        ("MEDIUM", "AVAILABLE"): 1, ("SMALL", "AVAILABLE"): 1, ("SMALL", "MAINTENANCE"): 1,
+    }
+    response = await client.post("/api/v1/vaults/availability/reconcile", headers=headers)
+    assert response.json() == []
+
+
+async def test_reconcile_during_allocations_finds_no_drift(client):
+    admin = await create_user(role="ADMIN")
+    users = [await create_user() for _ in range(20)]
+    vault, _ = await create_vault(*["SMALL"] * 20)
+    allocate = [
+        client.post(f"/api/v1/lockers/vaults/{vault.id}/allocate?size=SMALL", headers=auth_headers(user))
+        for user in users
+    ]
+    reconcile = [client.post("/api/v1/vaults/availability/reconcile", headers=auth_headers(admin)) for _ in range(5)]
+
+    responses = await asyncio.gather(*allocate, *reconcile)
+
+    assert [r.status_code for r in responses[:20]] == [201] * 20
+    assert [r.json() for r in responses[20:]] == [[]] * 5
+    assert await summary(client, auth_headers(admin), vault.id) == {("SMALL", "ALLOCATED"): 20}
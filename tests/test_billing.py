@@ -0,0 +1,147 @@
+import json
+import sys
+
+import anyio
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.locker_allocation import LockerAllocation
+from app.models.payment import Payment
+from app.services import billing
+from conftest import ROOT
+from factories import auth_headers, capture_queries, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+PERIOD = billing.current_period()
+
+
+async def allocate_all(locker_ids) -> list:
+    user = await create_user()
+    return [(await create_allocation(user, locker_id)).id for locker_id in locker_ids]
+
+
+async def payments() -> list:
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(Payment.allocation_id, Payment.amount, Payment.status, Payment.billing_period).order_by(Payment.allocation_id)
+        )
+        return [tuple(row) for row in result]
+
+
+async def test_run_bills_each_active_allocation_once():
+    _, small = await create_vault("SMALL", "SMALL", rent=40)
+    _, large = await create_vault("LARGE", "LARGE", rent=70)
+    allocation_ids = await allocate_all([small[0], small[1], large[0]])
+    # Ended allocations and free lockers are not billed.
+    async with SessionLocal() as db:
+        await db.execute(update(LockerAllocation).where(LockerAllocation.id == allocation_ids[1]).values(status="EXPIRED"))
+        await db.commit()
+
+    report = await billing.run(PERIOD, concurrency=2, chunk_size=1)
+    assert (report["period"], report["vaults"], report["allocations"], report["created"]) == (PERIOD, 2, 2, 2)
+    assert report["rows_per_second"] > 0
+    assert await payments() == [
+        (allocation_ids[0], 40.0, "PENDING", PERIOD),
+        (allocation_ids[2], 70.0, "PENDING", PERIOD),
+    ]
+
+    again = await billing.run(PERIOD)
+    assert (again["allocations"], again["created"]) == (2, 0)
+    # Allocations made after a period ended are not billed for it.
+    assert (await billing.run("2000-01"))["allocations"] == 0
+    assert len(await payments()) == 2
+
+
+async def test_chunks_cover_every_allocation_and_restart_fills_gaps():
+    vault, locker_ids = await create_vault(*["MEDIUM"] * 5)
+    allocation_ids = await allocate_all(locker_ids)
+
+    async with SessionLocal() as db:
+        with capture_queries() as statements:
+            assert await billing.bill_vault(db, vault.id, PERIOD, chunk_size=2) == (5, 5)
+    # Chunks of 2, 2 and 1, then an empty probe ends the loop.
+    assert sum(s.lstrip().startswith("INSERT INTO payments") for s in statements) == 3
+    assert [row[0] for row in await payments()] == allocation_ids
+
+    # An interrupted run is finished by running it again.
+    async with SessionLocal() as db:
+        await db.execute(delete(Payment).where(Payment.allocation_id.in_(allocation_ids[2:4])))
+        await db.commit()
+        assert await billing.bill_vault(db, vault.id, PERIOD, chunk_size=2) == (5, 2)
+    assert [row[0] for row in await payments()] == allocation_ids
+
+
+async def test_bill_vault_only_touches_its_own_vault():
+    vault, mine = await create_vault("SMALL", "LARGE")
+    _, theirs = await create_vault("SMALL")
+    allocation_ids = await allocate_all(mine + theirs)
+
+    async with SessionLocal() as db:
+        assert await billing.bill_vault(db, vault.id, PERIOD, chunk_size=100) == (2, 2)
+    assert [row[0] for row in await payments()] == allocation_ids[:2]
+
+
+async def test_concurrency_is_capped_below_the_pool_size(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    assert billing._concurrency(8) == 1
+    assert billing._concurrency(1) == 1
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    assert billing._concurrency(2) == 1
+    monkeypatch.setattr(settings, "DB_EXTERNAL_POOLER", True)
+    assert billing._concurrency(8) == 8
+
+
+async def test_runs_started_from_the_api_record_their_report(client):
+    admin, staff = await create_user(role="ADMIN"), await create_user(role="STAFF")
+    _, locker_ids = await create_vault("SMALL", "LARGE")
+    await allocate_all(locker_ids)
+    headers = auth_headers(admin)
+
+    assert (await client.post("/api/v1/billing/runs", headers=auth_headers(staff))).status_code == 403
+    response = await client.post("/api/v1/billing/runs", headers=headers)
+    assert response.status_code == 202
+    started = response.json()
+    assert (started["period"], started["status"], started["finished_at"]) == (PERIOD, "RUNNING", None)
+
+    # The transport returns once background tasks have run.
+    finished = (await client.get(f"/api/v1/billing/runs/{started['id']}", headers=headers)).json()
+    assert finished["status"] == "COMPLETED" and finished["finished_at"] is not None
+    assert (finished["vaults"], finished["allocations"], finished["created"]) == (1, 2, 2)
+    assert (await client.get("/api/v1/billing/runs/999", headers=headers)).status_code == 404
+
+
+async def test_failed_runs_and_bad_periods(client, monkeypatch):
+    headers = auth_headers(await create_user(role="ADMIN"))
+    for period in ("2026-13", "2026-1", "october"):
+        response = await client.post("/api/v1/billing/runs", headers=headers, params={"period": period})
+        assert response.status_code == 400, period
+        assert response.json() == {"detail": "Billing period must look like YYYY-MM"}
+
+    async def broken(period):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(billing, "run", broken)
+    started = (await client.post("/api/v1/billing/runs", headers=headers, params={"period": "2026-10"})).json()
+    failed = (await client.get(f"/api/v1/billing/runs/{started['id']}", headers=headers)).json()
+    assert (failed["status"], failed["error"], failed["created"]) == ("FAILED", "database went away", None)
+
+
+async def cli(*args):
+    return await anyio.run_process([sys.executable, "-m", "app.cli", *args], cwd=ROOT, check=False)
+
+
+async def test_cli_checks_its_arguments_and_prints_the_report():
+    for args in (["--period", "2026-13"], ["--concurrency", "0"], ["--chunk-size", "0"]):
+        result = await cli("bill", *args)
+        assert result.returncode == 2, args
+        assert b"error:" in result.stderr
+
+    _, locker_ids = await create_vault("SMALL")
+    await allocate_all(locker_ids)
+    result = await cli("bill", "--period", PERIOD, "--chunk-size", "1")
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.decode().strip().splitlines()[-1])
+    assert (report["period"], report["allocations"], report["created"]) == (PERIOD, 1, 1)
@@ -0,0 +1,99 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import main
+from app.db import boot as boot_module
+from app.db.boot import Boot, migration_head
+from app.db.session import engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def boot(monkeypatch):
+    """
+    A worker that has not booted yet, in place of the process-wide one.
+    """
+    fresh = Boot()
+    monkeypatch.setattr(main, "boot", fresh)
+    return fresh
+
+
+@asynccontextmanager
+async def altered_schema(change: str, restore: str):
+    """
+    Apply a change to the migrated test database and always undo it, since
+    alembic_version is not truncated between tests.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(change))
+    try:
+        yield
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(restore))
+
+
+async def readyz(client) -> tuple[int, dict]:
+    response = await client.get("/readyz")
+    return response.status_code, response.json()
+
+
+async def test_healthz_is_always_ok(client, boot):
+    response = await client.get("/healthz")
+    assert response.status_code == 200 and response.json() == {"status": "ok"}
+    assert not boot.ready
+
+
+async def test_ready_at_head_with_a_warm_pool(client, boot):
+    status_code, body = await readyz(client)
+    assert status_code == 200
+    assert body["ready"] and body["pool_warm"]
+    assert body["schema_revision"] == body["expected_revision"] == migration_head()
+    assert body["time_to_ready_seconds"] > 0
+
+
+async def test_a_schema_behind_head_is_not_ready_until_migrated(client, boot):
+    head = migration_head()
+    previous = ScriptDirectory(str(boot_module.MIGRATIONS_PATH)).get_revision(head).down_revision
+    async with altered_schema(
+        f"UPDATE alembic_version SET version_num = '{previous}'",
+        f"UPDATE alembic_version SET version_num = '{head}'",
+    ):
+        status_code, body = await readyz(client)
+        assert status_code == 503
+        assert (body["ready"], body["schema_revision"], body["expected_revision"]) == (False, previous, head)
+        assert not body["pool_warm"]
+
+    # The same worker becomes ready once the migration has run.
+    status_code, body = await readyz(client)
+    assert status_code == 200 and body["schema_revision"] == head and body["pool_warm"]
+
+
+async def test_an_unmigrated_database_is_not_ready(client, boot):
+    async with altered_schema(
+        "ALTER TABLE alembic_version RENAME TO alembic_version_hidden",
+        "ALTER TABLE alembic_version_hidden RENAME TO alembic_version",
+    ):
+        status_code, body = await readyz(client)
+        assert status_code == 503
+        assert body["schema_revision"] is None and not body["pool_warm"]
+    assert (await readyz(client))[0] == 200
+
+
+async def test_boot_retries_after_the_database_was_unreachable(client, boot, monkeypatch):
+    unreachable = create_async_engine("postgresql+asyncpg://postgres@localhost:1/vault")
+    monkeypatch.setattr(boot_module, "engine", unreachable)
+    assert await boot.run() is False
+    assert (await readyz(client))[0] == 503
+    await unreachable.dispose()
+
+    monkeypatch.setattr(boot_module, "engine", engine)
+    assert (await readyz(client))[0] == 200
+    # Once ready, /readyz answers without going back to the database.
+    monkeypatch.setattr(boot_module, "engine", unreachable)
+    assert (await readyz(client))[0] == 200
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.session import engine, engine_options
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 500)
+    options = engine_options()
+    assert "poolclass" not in options
+    assert (options["pool_size"], options["max_overflow"], options["pool_pre_ping"]) == (20, 0, False)
+    assert options["connect_args"]["statement_cache_size"] == 500
+    assert options["connect_args"]["prepared_statement_cache_size"] == 500
+
+
+async def test_external_pooler_disables_pooling_and_statement_caching(monkeypatch):
+    monkeypatch.setattr(settings, "DB_EXTERNAL_POOLER", True)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    options = engine_options()
+    assert options["poolclass"] is NullPool
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+    # PgBouncer rejects startup parameters.
+    assert "server_settings" not in connect_args
+
+
+async def test_settings_reach_the_server(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1234)
+    monkeypatch.setattr(settings, "DB_RANDOM_PAGE_COST", 1.5)
+    tuned = create_async_engine(engine.url, **engine_options())
+    try:
+        assert tuned.pool.size() == 2
+        async with tuned.connect() as conn:
+            assert await conn.scalar(text("SHOW statement_timeout")) == "1234ms"
+            assert await conn.scalar(text("SHOW random_page_cost")) == "1.5"
+    finally:
+        await tuned.dispose()
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.locker import Locker
+from app.models.locker_allocation import LockerAllocation
+from app.models.vault import Vault
+from app.services import authorization
+from app.services.expiry_sweeper import ExpirySweeper, expire_batch
+from factories import auth_headers, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+async def test_sweep_expires_overdue_allocations_in_batches():
+    user = await create_user()
+    vault, locker_ids = await create_vault("SMALL", "SMALL", "SMALL", "MEDIUM", "LARGE")
+    overdue = datetime.utcnow() - timedelta(days=1)
+    for locker_id in locker_ids[:4]:
+        await create_allocation(user, locker_id, overdue)
+    await create_allocation(user, locker_ids[4], datetime.utcnow() + timedelta(days=1))
+
+    async with SessionLocal() as db:
+        assert await expire_batch(db, 3, datetime.utcnow()) == 3
+        assert await db.scalar(select(func.count()).where(LockerAllocation.status == "EXPIRED")) == 3
+
+    sweeper = ExpirySweeper(interval=60, batch_size=3)
+    await sweeper.run_once()
+    assert sweeper.last_run_rows == 1
+    await sweeper.run_once()
+    assert sweeper.last_run_rows == 0
+    assert sweeper.total_rows == 1
+
+    async with SessionLocal() as db:
+        assert await db.scalar(select(Locker.status).where(Locker.id == locker_ids[4])) == "ALLOCATED"
+        assert await db.scalar(select(func.count()).where(Locker.status == "AVAILABLE")) == 4
+        assert await db.scalar(select(Vault.available_lockers).where(Vault.id == vault.id)) == 4
+
+
+async def test_only_one_worker_sweeps():
+    workers = [ExpirySweeper(interval=0.05, batch_size=10) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    try:
+        await wait_for(lambda: any(w.is_leader for w in workers) and sum(w.runs for w in workers) >= 3)
+        await asyncio.sleep(0.2)
+        leaders = [w for w in workers if w.is_leader]
+        assert len(leaders) == 1
+        assert all(w.runs == 0 for w in workers if w is not leaders[0])
+
+        # Another worker takes over once the leader goes away.
+        await leaders[0].stop()
+        followers = [w for w in workers if w is not leaders[0]]
+        await wait_for(lambda: any(w.runs for w in followers))
+        assert sum(w.is_leader for w in followers) == 1
+    finally:
+        for worker in workers:
+            await worker.stop()
+    assert not any(w.failures for w in workers)
+
+
+async def test_only_one_worker_sweeps_behind_a_pooler(monkeypatch):
+    monkeypatch.setattr(settings, "DB_EXTERNAL_POOLER", True)
+    running = 0
+    overlapped = False
+
+    class SlowSweeper(ExpirySweeper):
+        async def run_once(self):
+            nonlocal running, overlapped
+            running += 1
+            overlapped |= running > 1
+            await asyncio.sleep(0.05)
+            running -= 1
+
+    workers = [SlowSweeper(interval=0.01, batch_size=10) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    try:
+        await wait_for(lambda: sum(w.runs for w in workers) >= 10)
+    finally:
+        for worker in workers:
+            await worker.stop()
+    assert not overlapped
+    assert not any(w.failures for w in workers)
+
+
+async def test_payment_racing_the_sweeper_is_rejected(client, monkeypatch):
+    user = await create_user()
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0], datetime.utcnow() - timedelta(hours=1))
+    require_allocation = authorization.require_allocation
+
+    async def read_then_sweep(db, allocation_id, user_id):
+        row = await require_allocation(db, allocation_id, user_id)
+        async with SessionLocal() as sweeper_db:
+            assert await expire_batch(sweeper_db, 10, datetime.utcnow()) == 1
+        return row
+
+    monkeypatch.setattr(authorization, "require_allocation", read_then_sweep)
+    url = f"/api/v1/transactions/allocations/{allocation.id}/pay_rent"
+    response = await client.post(url, headers=auth_headers(user), json=dict(allocation_id=allocation.id, amount=50))
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Allocation changed while the payment was processed; please retry"
+
+    async with SessionLocal() as db:
+        row = (await db.execute(select(LockerAllocation.status, LockerAllocation.expiry_date)
+                                .where(LockerAllocation.id == allocation.id))).one()
+        assert row.status == "EXPIRED" and row.expiry_date < datetime.utcnow()
+
+
+async def test_payment_reclaims_an_expired_allocation(client):
+    user, other = await create_user(), await create_user()
+    vault, locker_ids = await create_vault("SMALL", "MEDIUM")
+    kept = await create_allocation(user, locker_ids[0], datetime.utcnow() - timedelta(hours=1))
+    lost = await create_allocation(user, locker_ids[1], datetime.utcnow() - timedelta(hours=1))
+    async with SessionLocal() as db:
+        assert await expire_batch(db, 10, datetime.utcnow()) == 2
+    await create_allocation(other, locker_ids[1])
+
+    headers = auth_headers(user)
+    response = await client.post(
+        f"/api/v1/transactions/allocations/{kept.id}/pay_rent", headers=headers, json=dict(allocation_id=kept.id, amount=50),
+    )
+    assert response.status_code == 201
+    response = await client.post(
+        f"/api/v1/transactions/allocations/{lost.id}/pay_rent", headers=headers, json=dict(allocation_id=lost.id, amount=50),
+    )
+    assert response.status_code == 409
+
+    async with SessionLocal() as db:
+        row = (await db.execute(select(LockerAllocation.status, LockerAllocation.expiry_date)
+                                .where(LockerAllocation.id == kept.id))).one()
+        assert row.status == "ACTIVE" and row.expiry_date > datetime.utcnow() + timedelta(days=29)
+        assert await db.scalar(select(Locker.status).where(Locker.id == locker_ids[0])) == "ALLOCATED"
+        assert await db.scalar(select(Vault.available_lockers).where(Vault.id == vault.id)) == 0
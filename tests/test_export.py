@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.payment import Payment
+from app.models.vault_transaction import VaultTransaction
+from factories import auth_headers, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2026, 1, 1)
+
+
+async def seed():
+    """
+    Two customers with one allocation each, in different vaults; ten
+    payments and ten transactions per allocation, one a day.
+    """
+    first, second = await create_user(), await create_user()
+    vault_ids, allocations = [], []
+    for user in (first, second):
+        vault, locker_ids = await create_vault("SMALL")
+        vault_ids.append(vault.id)
+        allocations.append(await create_allocation(user, locker_ids[0]))
+    async with SessionLocal() as db:
+        for day in range(10):
+            for allocation in allocations:
+                at = START + timedelta(days=day)
+                await db.execute(insert(Payment).values(allocation_id=allocation.id, amount=day, status="SUCCESSFUL", created_at=at))
+                await db.execute(insert(VaultTransaction).values(allocation_id=allocation.id, type="DEPOSIT", timestamp=at))
+        await db.commit()
+    return (first, second), vault_ids, allocations
+
+
+async def export(client, headers, kind, **params):
+    response = await client.get(f"/api/v1/transactions/export/{kind}", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    if params.get("format") == "csv":
+        assert response.headers["content-type"].startswith("text/csv")
+        return list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_export_streams_in_batches_ordered_by_id(client, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 3)
+    await seed()
+    headers = auth_headers(await create_user(role="STAFF"))
+
+    for kind in ("payments", "transactions"):
+        rows = await export(client, headers, kind)
+        assert [row["id"] for row in rows] == list(range(1, 21))
+        rows = await export(client, headers, kind, format="csv")
+        assert [int(row["id"]) for row in rows] == list(range(1, 21))
+    assert set(rows[0]) == {"id", "allocation_id", "type", "timestamp"}
+
+
+async def test_export_filters(client):
+    (first, _), vault_ids, allocations = await seed()
+    headers = auth_headers(await create_user(role="STAFF"))
+
+    rows = await export(client, headers, "payments", allocation_id=allocations[0].id)
+    assert {row["allocation_id"] for row in rows} == {allocations[0].id} and len(rows) == 10
+    rows = await export(client, headers, "payments", user_id=first.id)
+    assert {row["allocation_id"] for row in rows} == {allocations[0].id} and len(rows) == 10
+    rows = await export(client, headers, "transactions", vault_id=vault_ids[1])
+    assert {row["allocation_id"] for row in rows} == {allocations[1].id} and len(rows) == 10
+    rows = await export(
+        client, headers, "payments", since=(START + timedelta(days=2)).isoformat(),
+        until=(START + timedelta(days=4)).isoformat() + "Z",
+    )
+    assert sorted(row["amount"] for row in rows) == [2, 2, 3, 3]
+
+
+async def test_interrupted_export_resumes_after_the_last_id(client):
+    await seed()
+    headers = auth_headers(await create_user(role="STAFF"))
+    everything = await export(client, headers, "payments")
+    received = everything[:7]
+    rest = await export(client, headers, "payments", after_id=received[-1]["id"])
+    assert received + rest == everything
+
+
+async def test_export_is_staff_only(client):
+    customer = await create_user()
+    response = await client.get("/api/v1/transactions/export/payments", headers=auth_headers(customer))
+    assert response.status_code == 403
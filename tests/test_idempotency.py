@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.db.session import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+from app.models.locker_allocation import LockerAllocation
+from app.models.payment import Payment
+from app.services.idempotency import REPLAYED_HEADER
+from factories import auth_headers, capture_queries, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def paid_allocation():
+    user = await create_user()
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0])
+    url = f"/api/v1/transactions/allocations/{allocation.id}/pay_rent"
+    return user, allocation, url
+
+
+async def payments_and_expiry(allocation_id):
+    async with SessionLocal() as db:
+        payments = await db.scalar(select(func.count()).select_from(Payment).where(Payment.allocation_id == allocation_id))
+        expiry = await db.scalar(select(LockerAllocation.expiry_date).where(LockerAllocation.id == allocation_id))
+    return payments, expiry
+
+
+async def test_retried_payment_is_replayed_not_repeated(client):
+    user, allocation, url = await paid_allocation()
+    headers = auth_headers(user) | {"Idempotency-Key": "pay-1"}
+    body = dict(allocation_id=allocation.id, amount=50)
+
+    first = await client.post(url, headers=headers, json=body)
+    assert first.status_code == 201
+    assert REPLAYED_HEADER not in first.headers
+    with capture_queries() as statements:
+        retry = await client.post(url, headers=headers, json=body)
+    assert retry.status_code == 201
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.json() == first.json()
+    # One primary-key lookup, no business logic.
+    assert len(statements) == 1 and "idempotency_keys" in statements[0]
+
+    payments, expiry = await payments_and_expiry(allocation.id)
+    assert payments == 1
+    assert expiry == allocation.expiry_date + timedelta(days=30)
+
+
+async def test_key_reused_for_another_request_is_rejected(client):
+    user, allocation, url = await paid_allocation()
+    headers = auth_headers(user) | {"Idempotency-Key": "pay-1"}
+    assert (await client.post(url, headers=headers, json=dict(allocation_id=allocation.id, amount=50))).status_code == 201
+    response = await client.post(url, headers=headers, json=dict(allocation_id=allocation.id, amount=75))
+    assert response.status_code == 422
+
+
+async def test_keys_are_scoped_to_the_user(client):
+    _, locker_ids = await create_vault("SMALL", "SMALL")
+    first, second = await create_user(), await create_user()
+    for user, locker_id in zip((first, second), locker_ids):
+        response = await client.post(
+            f"/api/v1/lockers/{locker_id}/allocate", headers=auth_headers(user) | {"Idempotency-Key": "same"},
+        )
+        assert response.status_code == 201
+        assert REPLAYED_HEADER not in response.headers
+
+
+async def test_concurrent_duplicates_are_coalesced(client):
+    user, allocation, url = await paid_allocation()
+    headers = auth_headers(user) | {"Idempotency-Key": "storm"}
+    body = dict(allocation_id=allocation.id, amount=50)
+
+    responses = await asyncio.gather(*(client.post(url, headers=headers, json=body) for _ in range(20)))
+    assert [r.status_code for r in responses] == [201] * 20
+    assert sum(REPLAYED_HEADER not in r.headers for r in responses) == 1
+    assert len({r.text for r in responses}) == 1
+    payments, expiry = await payments_and_expiry(allocation.id)
+    assert payments == 1
+    assert expiry == allocation.expiry_date + timedelta(days=30)
+
+
+async def test_failed_request_releases_its_key(client):
+    user = await create_user()
+    other = await create_user()
+    _, locker_ids = await create_vault("SMALL")
+    await create_allocation(other, locker_ids[0])
+    url = f"/api/v1/lockers/{locker_ids[0]}/allocate"
+    headers = auth_headers(user) | {"Idempotency-Key": "retry-me"}
+
+    assert (await client.post(url, headers=headers)).status_code == 400
+    async with SessionLocal() as db:
+        assert await db.scalar(select(func.count()).select_from(IdempotencyKey)) == 0
+    # The failure was not stored, so the retry runs again.
+    assert (await client.post(url, headers=headers)).status_code == 400
+
+
+async def test_key_claimed_by_another_worker(client):
+    user, allocation, url = await paid_allocation()
+    body = dict(allocation_id=allocation.id, amount=50)
+    first = await client.post(url, headers=auth_headers(user) | {"Idempotency-Key": "probe"}, json=body)
+    assert first.status_code == 201
+    async with SessionLocal() as db:
+        fingerprint = await db.scalar(select(IdempotencyKey.fingerprint).where(IdempotencyKey.key == "probe"))
+        now = datetime.utcnow()
+        # Claimed but unfinished elsewhere: one fresh, one abandoned long ago.
+        await db.execute(insert(IdempotencyKey), [
+            dict(user_id=user.id, key="busy", fingerprint=fingerprint, created_at=now, expires_at=now + timedelta(days=1)),
+            dict(user_id=user.id, key="stale", fingerprint=fingerprint, created_at=now - timedelta(hours=1),
+                 expires_at=now + timedelta(days=1)),
+        ])
+        await db.commit()
+
+    response = await client.post(url, headers=auth_headers(user) | {"Idempotency-Key": "busy"}, json=body)
+    assert response.status_code == 409
+    response = await client.post(url, headers=auth_headers(user) | {"Idempotency-Key": "stale"}, json=body)
+    assert response.status_code == 201
+    assert REPLAYED_HEADER not in response.headers
@@ -0,0 +1,58 @@
+import pytest
+
+from factories import auth_headers, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def scrape(client) -> dict:
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+async def test_requests_are_recorded_by_route_template(client):
+    user = await create_user()
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0])
+    headers = auth_headers(user)
+    template = "/api/v1/transactions/allocations/{allocation_id}/assets"
+    route = f'method="GET",route="{template}"'
+
+    before = await scrape(client)
+    for _ in range(3):
+        response = await client.get(f"/api/v1/transactions/allocations/{allocation.id}/assets", headers=headers)
+        assert response.status_code == 200
+    response = await client.get("/api/v1/transactions/allocations/987654/assets", headers=headers)
+    assert response.status_code == 404
+    assert (await client.get("/no/such/path")).status_code == 404
+    after = await scrape(client)
+
+    def delta(name):
+        return after.get(name, 0) - before.get(name, 0)
+
+    assert delta(f'http_requests_total{{{route},status="200"}}') == 3
+    assert delta(f'http_requests_total{{{route},status="404"}}') == 1
+    assert delta('http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+    assert delta(f"http_request_duration_seconds_count{{{route}}}") == 4
+    assert delta(f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 4
+    # The engine hooks attribute each request's queries to its route.
+    queries = f'route="{template}"'
+    assert delta(f"http_request_db_queries_count{{{queries}}}") == 4
+    assert delta(f"http_request_db_queries_sum{{{queries}}}") >= 4
+    assert delta(f"http_request_db_seconds_sum{{{queries}}}") > 0
+    assert delta("db_query_duration_seconds_count") >= 4
+
+
+async def test_pool_gauges_are_exported(client):
+    samples = await scrape(client)
+    assert samples['db_pool_size{engine="primary"}'] >= 1
+    assert samples['db_pool_checked_out{engine="primary"}'] >= 0
+    assert 'db_pool_overflow{engine="primary"}' in samples
+    assert samples['db_pool_checkouts_total{engine="primary"}'] >= 1
@@ -0,0 +1,69 @@
+import pytest
+
+from app.api.pagination import encode_cursor
+from factories import auth_headers, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cursor_walks_every_locker_once(client):
+    user = await create_user()
+    _, locker_ids = await create_vault(*["SMALL", "LARGE"] * 12)
+    headers = auth_headers(user)
+
+    seen, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": 5} | ({"cursor": cursor} if cursor else {})
+        response = await client.get("/api/v1/lockers/available", params=params, headers=headers)
+        assert response.status_code == 200
+        seen += [locker["id"] for locker in response.json()]
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert seen == locker_ids
+    assert pages == 5
+
+
+async def test_cursor_respects_filters(client):
+    user = await create_user()
+    _, locker_ids = await create_vault(*["SMALL", "LARGE"] * 6)
+    headers = auth_headers(user)
+    large = locker_ids[1::2]
+
+    first = await client.get("/api/v1/lockers/available?size=large&limit=4", headers=headers)
+    second = await client.get(
+        "/api/v1/lockers/available",
+        params={"size": "large", "limit": 4, "cursor": first.headers["x-next-cursor"]},
+        headers=headers,
+    )
+    assert [l["id"] for l in first.json() + second.json()] == large
+    assert "x-next-cursor" not in second.headers
+
+
+async def test_skip_limit_still_supported(client):
+    staff = await create_user(role="STAFF")
+    vaults = [(await create_vault())[0].id for _ in range(6)]
+
+    response = await client.get("/api/v1/vaults/list?skip=2&limit=3", headers=auth_headers(staff))
+    assert [v["id"] for v in response.json()] == vaults[2:5]
+    assert response.headers["x-next-cursor"] == encode_cursor(vaults[4])
+
+
+async def test_zero_limit_returns_empty_page(client):
+    staff = await create_user(role="STAFF")
+    await create_vault()
+
+    response = await client.get("/api/v1/vaults/list?limit=0", headers=auth_headers(staff))
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "x-next-cursor" not in response.headers
+
+
+async def test_invalid_cursor_is_rejected(client):
+    staff = await create_user(role="STAFF")
+
+    response = await client.get("/api/v1/vaults/list?cursor=not-a-cursor", headers=auth_headers(staff))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
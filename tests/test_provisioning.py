@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.locker import Locker
+from app.models.vault import Vault
+from factories import auth_headers, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def locker_count(vault_id):
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).where(Locker.vault_id == vault_id))
+
+
+@pytest.mark.parametrize("content_type, body", [
+    ("application/json", b'[{"locker_number": "A1", "size": "small", "monthly_rent": 20},'
+                         b' {"locker_number": "A2", "size": "LARGE", "monthly_rent": 80}]'),
+    ("application/x-ndjson", b'{"locker_number": "A1", "size": "small", "monthly_rent": 20}\n\n'
+                             b'{"locker_number": "A2", "size": "LARGE", "monthly_rent": 80}\n'),
+    ("text/csv", b"locker_number,size,monthly_rent\r\nA1,small,20\r\nA2,LARGE,80"),
+])
+async def test_bulk_formats(client, content_type, body):
+    staff = await create_user(role="STAFF")
+    vault, _ = await create_vault("MEDIUM")
+
+    response = await client.post(
+        f"/api/v1/lockers/vaults/{vault.id}/bulk",
+        content=body,
+        headers=auth_headers(staff) | {"Content-Type": content_type},
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json() == dict(vault_id=vault.id, created=2, total_lockers=3, available_lockers=3)
+    assert await locker_count(vault.id) == 3
+
+
+async def test_bulk_streams_ndjson_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_INSERT_BATCH_SIZE", 100)
+    staff = await create_user(role="STAFF")
+    vault, _ = await create_vault()
+
+    async def body():
+        for i in range(1050):
+            yield b'{"locker_number": "N%d", "size": "MEDIUM", "monthly_rent": 30}\n' % i
+
+    response = await client.post(
+        f"/api/v1/lockers/vaults/{vault.id}/bulk",
+        content=body(),
+        headers=auth_headers(staff) | {"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json()["created"] == 1050
+    assert await locker_count(vault.id) == 1050
+
+
+async def test_invalid_record_rejects_whole_request(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_INSERT_BATCH_SIZE", 2)
+    staff = await create_user(role="STAFF")
+    vault, _ = await create_vault()
+    records = [dict(locker_number=f"A{i}", size="SMALL", monthly_rent=20) for i in range(5)]
+    records[4]["size"] = "HUGE"
+
+    response = await client.post(f"/api/v1/lockers/vaults/{vault.id}/bulk", json=records, headers=auth_headers(staff))
+
+    assert response.status_code == 422
+    assert [error["index"] for error in response.json()["detail"]] == [4]
+    assert await locker_count(vault.id) == 0
+    async with SessionLocal() as db:
+        assert (await db.get(Vault, vault.id)).total_lockers == 0
+
+
+async def test_invalid_utf8_reports_line(client):
+    staff = await create_user(role="STAFF")
+    vault, _ = await create_vault()
+    body = (
+        b"locker_number,size,monthly_rent\n"
+        b"A1,SMALL,20\n"
+        b"A\xff2,SMALL,20\n"
+    )
+
+    response = await client.post(
+        f"/api/v1/lockers/vaults/{vault.id}/bulk",
+        content=body,
+        headers=auth_headers(staff) | {"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid UTF-8 on line 3"
+    assert await locker_count(vault.id) == 0
@@ -0,0 +1,167 @@
+"""
+Statement budgets for the API routes: write handlers build their response
+from RETURNING rows, so no refresh SELECTs follow the commit, and the
+transaction routes resolve ownership with a single query that never
+touches users. The principal cache is warmed first, so authentication adds
+nothing.
+"""
+import pytest
+
+from factories import PASSWORD, auth_headers, capture_queries, create_allocation, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def measure(client, method, url, status_code, **kwargs):
+    with capture_queries() as statements:
+        response = await client.request(method, url, **kwargs)
+    assert response.status_code == status_code, response.text
+    return response, statements
+
+
+async def warm(client, headers):
+    response = await client.get("/api/v1/lockers/available?limit=1", headers=headers)
+    assert response.status_code == 200
+
+
+def assert_budget(statements, budget):
+    assert len(statements) == budget, "\n\n".join(statements)
+    kinds = [s.lstrip().split(None, 1)[0].upper() for s in statements]
+    # Reads (existence and ownership checks) come before the writes, never after.
+    first_write = next((i for i, kind in enumerate(kinds) if kind != "SELECT"), len(kinds))
+    assert "SELECT" not in kinds[first_write:], kinds
+
+
+async def test_register_user(client):
+    _, statements = await measure(client, "POST", "/api/v1/auth/register", 200, json=dict(
+        email="new@example.com", name="New", phone="+15550001111", password=PASSWORD,
+    ))
+    # Existence check, INSERT ... ON CONFLICT DO NOTHING RETURNING.
+    assert_budget(statements, 2)
+
+
+async def test_create_vault(client):
+    admin = await create_user(role="ADMIN")
+    headers = auth_headers(admin)
+    await warm(client, headers)
+    _, statements = await measure(client, "POST", "/api/v1/vaults/create", 201, headers=headers, json=dict(
+        location="Basement", total_lockers=0, available_lockers=0, status="OPERATIONAL",
+    ))
+    assert_budget(statements, 1)
+
+
+async def test_create_locker(client):
+    admin = await create_user(role="ADMIN")
+    headers = auth_headers(admin)
+    vault, _ = await create_vault()
+    await warm(client, headers)
+    _, statements = await measure(client, "POST", f"/api/v1/lockers/vaults/{vault.id}/", 201, headers=headers, json=dict(
+        vault_id=vault.id, locker_number="A1", size="SMALL", status="AVAILABLE", monthly_rent=30,
+    ))
+    # Vault counters (also the existence check), locker INSERT, availability summary.
+    assert_budget(statements, 3)
+
+
+async def test_allocate_locker(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    _, locker_ids = await create_vault("SMALL")
+    await warm(client, headers)
+    _, statements = await measure(client, "POST", f"/api/v1/lockers/{locker_ids[0]}/allocate", 201, headers=headers)
+    # Claim the locker, take the vault slot, availability summary, INSERT the allocation.
+    assert_budget(statements, 4)
+
+
+async def test_allocate_any_locker(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    vault, _ = await create_vault("SMALL", "SMALL")
+    await warm(client, headers)
+    _, statements = await measure(client, "POST", f"/api/v1/lockers/vaults/{vault.id}/allocate?size=SMALL", 201, headers=headers)
+    assert_budget(statements, 4)
+
+
+async def test_add_asset(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0])
+    await warm(client, headers)
+    _, statements = await measure(
+        client, "POST", f"/api/v1/transactions/allocations/{allocation.id}/assets", 201, headers=headers,
+        json=dict(allocation_id=allocation.id, asset_name="Deed", estimated_value=10, type="DOCUMENT"),
+    )
+    # Ownership check, asset INSERT ... RETURNING, deposit transaction.
+    assert_budget(statements, 3)
+
+
+async def test_pay_rent(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0])
+    await warm(client, headers)
+    _, statements = await measure(
+        client, "POST", f"/api/v1/transactions/allocations/{allocation.id}/pay_rent", 201, headers=headers,
+        json=dict(allocation_id=allocation.id, amount=50),
+    )
+    # Ownership check, extend expiry_date ... RETURNING, payment INSERT.
+    assert_budget(statements, 3)
+
+
+def ownership_check(statement):
+    # One query on the allocation (joined from the asset), never the users table.
+    assert "locker_allocations" in statement and "users" not in statement, statement
+
+
+async def test_transaction_routes_check_ownership_with_one_query(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(user, locker_ids[0])
+    base = f"/api/v1/transactions/allocations/{allocation.id}"
+    await warm(client, headers)
+    assets = [
+        (await client.post(f"{base}/assets", headers=headers, json=dict(
+            allocation_id=allocation.id, asset_name=f"Deed {i}", estimated_value=10, type="DOCUMENT",
+        ))).json()["id"]
+        for i in range(3)
+    ]
+
+    # (method, url, status, json, statements after the ownership check)
+    routes = [
+        ("GET", f"{base}/assets", 200, None, 1),
+        ("POST", f"{base}/assets/batch", 201, dict(assets=[
+            dict(asset_name="Ring", estimated_value=500, type="JEWELRY"),
+            dict(asset_name="Watch", estimated_value=900, type="JEWELRY"),
+        ]), 2),
+        ("POST", f"{base}/assets/withdraw", 200, dict(asset_ids=assets[:2]), 2),
+        ("DELETE", f"/api/v1/transactions/assets/{assets[2]}", 204, None, 2),
+    ]
+    for method, url, status_code, body, writes in routes:
+        _, statements = await measure(client, method, url, status_code, headers=headers, json=body)
+        ownership_check(statements[0])
+        assert_budget(statements, 1 + writes)
+
+
+async def test_foreign_allocations_and_assets_cost_one_query(client):
+    owner, stranger = await create_user(), await create_user()
+    _, locker_ids = await create_vault("SMALL")
+    allocation = await create_allocation(owner, locker_ids[0])
+    base = f"/api/v1/transactions/allocations/{allocation.id}"
+    response = await client.post(f"{base}/assets", headers=auth_headers(owner), json=dict(
+        allocation_id=allocation.id, asset_name="Deed", estimated_value=10, type="DOCUMENT",
+    ))
+    asset_id = response.json()["id"]
+    headers = auth_headers(stranger)
+    await warm(client, headers)
+
+    for method, url, body in [
+        ("GET", f"{base}/assets", None),
+        ("POST", f"{base}/assets", dict(allocation_id=allocation.id, asset_name="X", estimated_value=1, type="OTHER")),
+        ("POST", f"{base}/pay_rent", dict(allocation_id=allocation.id, amount=50)),
+        ("DELETE", f"/api/v1/transactions/assets/{asset_id}", None),
+    ]:
+        _, statements = await measure(client, method, url, 404, headers=headers, json=body)
+        assert len(statements) == 1, statements
+        ownership_check(statements[0])
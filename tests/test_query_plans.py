@@ -0,0 +1,178 @@
+"""
+EXPLAIN-based regression check for the hot-path indexes. A tour of the API
+runs against a seeded dataset (a million lockers by default, set
+TEST_PLAN_LOCKERS to change it) and every statement it sends is EXPLAINed
+with its real parameters; none may plan a sequential scan of a large table.
+Keep TEST_PLAN_LOCKERS at 100000 or more: on smaller tables a sequential
+scan is often the right plan. Plans are checked with the settings the app
+ships with, so DB_RANDOM_PAGE_COST is left unset and the server's
+random_page_cost (4 by default) applies.
+"""
+import json
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, text
+
+from app.db.session import SessionLocal, engine
+from app.services.expiry_sweeper import expire_batch
+from factories import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+LOCKERS = int(os.environ.get("TEST_PLAN_LOCKERS", 1_000_000))
+VAULTS = 100
+USERS = 10_000
+# Small tables (vaults, availability summary, ...) are legitimately scanned.
+LARGE_TABLES = {
+    "users", "lockers", "locker_allocations", "assets", "payments",
+    "vault_transactions", "access_logs", "user_sessions",
+}
+
+SEED = [
+    # Every tenth locker is free, the rest are allocated.
+    """
+    INSERT INTO vaults (location, total_lockers, available_lockers, status)
+    SELECT 'Vault ' || v, :per_vault, :per_vault / 10, 'OPERATIONAL' FROM generate_series(1, :vaults) v
+    """,
+    """
+    INSERT INTO lockers (vault_id, locker_number, size, status, monthly_rent)
+    SELECT 1 + (g - 1) / :per_vault, 'L' || g,
+           (ARRAY['SMALL', 'MEDIUM', 'LARGE'])[1 + g % 3]::locker_size,
+           (CASE WHEN g % 10 = 0 THEN 'AVAILABLE' ELSE 'ALLOCATED' END)::locker_status,
+           50
+    FROM generate_series(1, :lockers) g
+    """,
+    """
+    INSERT INTO users (email, name, phone, hashed_password, role, status)
+    SELECT 'seed' || u || '@example.com', 'Seed ' || u, '+1666' || lpad(u::text, 7, '0'), 'x', 'CUSTOMER', 'ACTIVE'
+    FROM generate_series(1, :users) u
+    """,
+    # One allocation per allocated locker, plus an ended one on every
+    # tenth locker's history.
+    """
+    INSERT INTO locker_allocations (locker_id, user_id, allocated_at, expiry_date, status)
+    SELECT id, 1 + id % :users, now() - interval '60 days', now() + (id % 60) * interval '1 day', 'ACTIVE'::allocation_status
+    FROM lockers WHERE status = 'ALLOCATED'
+    UNION ALL
+    SELECT id, 1 + id % :users, now() - interval '400 days', now() - interval '300 days', 'EXPIRED'::allocation_status
+    FROM lockers WHERE id % 10 = 1
+    """,
+    """
+    INSERT INTO assets (allocation_id, asset_name, estimated_value, type)
+    SELECT id, 'Asset ' || id, 1000, 'DOCUMENT' FROM locker_allocations WHERE id % 4 = 0
+    """,
+    """
+    INSERT INTO vault_transactions (allocation_id, type, timestamp)
+    SELECT id, 'DEPOSIT', allocated_at FROM locker_allocations WHERE id % 4 = 0
+    """,
+    """
+    INSERT INTO payments (allocation_id, amount, status, created_at)
+    SELECT id, 50, 'SUCCESSFUL', allocated_at FROM locker_allocations WHERE id % 2 = 0
+    """,
+    """
+    INSERT INTO vault_availability (vault_id, size, status, count)
+    SELECT vault_id, size, status, count(*) FROM lockers GROUP BY vault_id, size, status
+    """,
+]
+
+
+async def seed():
+    params = dict(lockers=LOCKERS, vaults=VAULTS, per_vault=LOCKERS // VAULTS, users=USERS)
+    async with engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), params)
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+
+async def tour(client):
+    """
+    Exercise the request paths the indexes were added for.
+    """
+    user = await create_user()
+    staff = await create_user(role="STAFF")
+    headers = auth_headers(user)
+    staff_headers = auth_headers(staff)
+
+    async def call(method, url, status_code=200, **kwargs):
+        response = await client.request(method, url, **kwargs)
+        assert response.status_code == status_code, (url, response.text)
+        return response
+
+    page = await call("GET", "/api/v1/lockers/available?vault_id=7&size=MEDIUM&limit=2", headers=headers)
+    cursor = page.headers["x-next-cursor"]
+    await call("GET", f"/api/v1/lockers/available?vault_id=7&size=MEDIUM&limit=2&cursor={cursor}", headers=headers)
+    await call("GET", "/api/v1/lockers/available?size=LARGE&limit=50", headers=headers)
+    await call("GET", "/api/v1/lockers/available?vault_id=9&limit=50", headers=headers)
+    await call("GET", "/api/v1/vaults/list?limit=50", headers=staff_headers)
+
+    free_locker = page.json()[0]["id"]
+    allocation = (await call("POST", f"/api/v1/lockers/{free_locker}/allocate", 201, headers=headers)).json()
+    await call("POST", "/api/v1/lockers/vaults/11/allocate?size=SMALL", 201, headers=headers)
+
+    base = f"/api/v1/transactions/allocations/{allocation['id']}"
+    asset = (await call("POST", f"{base}/assets", 201, headers=headers, json=dict(
+        allocation_id=allocation["id"], asset_name="Deed", estimated_value=10, type="DOCUMENT",
+    ))).json()
+    batch = (await call("POST", f"{base}/assets/batch", 201, headers=headers, json=dict(assets=[
+        dict(asset_name="Ring", estimated_value=500, type="JEWELRY"),
+        dict(asset_name="Watch", estimated_value=900, type="JEWELRY"),
+    ]))).json()
+    await call("GET", f"{base}/assets", headers=headers)
+    await call("POST", f"{base}/assets/withdraw", headers=headers, json=dict(asset_ids=[batch[0]["id"]]))
+    await call("DELETE", f"/api/v1/transactions/assets/{asset['id']}", 204, headers=headers)
+    await call("POST", f"{base}/pay_rent", 201, headers=headers, json=dict(allocation_id=allocation["id"], amount=50))
+
+    for kind in ("transactions", "payments"):
+        await call("GET", f"/api/v1/transactions/export/{kind}?allocation_id=12345", headers=staff_headers)
+        await call("GET", f"/api/v1/transactions/export/{kind}?vault_id=3&after_id=1000", headers=staff_headers)
+        await call("GET", f"/api/v1/transactions/export/{kind}?user_id=42", headers=staff_headers)
+
+    login = await call("POST", "/api/v1/auth/login", data=dict(username=user.email, password="wrong"), status_code=401)
+    assert login.status_code == 401
+
+    async with SessionLocal() as db:
+        await expire_batch(db, 500, datetime.utcnow())
+        await db.rollback()
+
+
+def seq_scans(plan):
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from seq_scans(child)
+
+
+async def test_api_queries_use_indexes_on_seeded_dataset(client):
+    await seed()
+
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            executed.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await tour(client)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    failures = []
+    async with engine.connect() as conn:
+        for statement, parameters in executed:
+            if not statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                continue
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scanned = sorted(set(seq_scans(plan[0]["Plan"])))
+            if scanned:
+                failures.append(f"Seq Scan on {', '.join(scanned)}:\n{statement}")
+        await conn.rollback()
+
+    assert len(executed) > 30
+    assert not failures, "\n\n".join(failures)
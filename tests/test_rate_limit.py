@@ -0,0 +1,90 @@
+import pytest
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimitBackend, ShardedMemoryBackend, rate_limiter
+from factories import PASSWORD, auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_READ_PER_MINUTE", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_WRITE_PER_MINUTE", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH_PER_MINUTE", 2)
+
+
+async def statuses(client, n, method="GET", url="/api/v1/lockers/available", **kwargs):
+    return [(await client.request(method, url, **kwargs)).status_code for _ in range(n)]
+
+
+async def test_reads_are_limited_per_user(client, limits):
+    first, second = await create_user(), await create_user()
+    assert await statuses(client, 4, headers=auth_headers(first)) == [200, 200, 200, 429]
+    response = await client.get("/api/v1/lockers/available", headers=auth_headers(first))
+    assert response.status_code == 429
+    # A bucket of 3 per minute refills one token every 20 seconds.
+    assert response.headers["retry-after"] == "20"
+    assert response.json() == {"detail": "Too many requests"}
+    assert await statuses(client, 3, headers=auth_headers(second)) == [200, 200, 200]
+
+
+async def test_reads_and_writes_have_separate_budgets(client, limits):
+    user = await create_user()
+    headers = auth_headers(user)
+    assert await statuses(client, 3, headers=headers) == [200, 200, 200]
+    assert await statuses(client, 3, "POST", "/api/v1/auth/sessions/revoke", headers=headers) == [200, 200, 429]
+
+
+async def test_logins_are_limited_per_ip_whatever_the_account(client, limits):
+    first, second = await create_user(), await create_user()
+    codes = [
+        (await client.post("/api/v1/auth/login", data=dict(username=user.email, password=PASSWORD))).status_code
+        for user in (first, second, first)
+    ]
+    assert codes == [200, 200, 429]
+
+
+async def test_anonymous_and_unverifiable_callers_share_the_ip_bucket(client, limits):
+    assert await statuses(client, 2) == [401, 401]
+    assert await statuses(client, 2, headers={"Authorization": "Bearer not-a-token"}) == [401, 429]
+
+
+async def test_paths_outside_the_api_and_disabled_limits_pass(client, limits, monkeypatch):
+    assert await statuses(client, 5, url="/healthz") == [200] * 5
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    assert await statuses(client, 5) == [401] * 5
+
+
+async def test_backend_is_pluggable(client, limits):
+    class Calls(RateLimitBackend):
+        def __init__(self):
+            self.keys = []
+
+        async def take(self, key, capacity, refill_per_second):
+            self.keys.append((key, capacity))
+            return 0.0 if len(self.keys) < 2 else 1.5
+
+        def clear(self):
+            self.keys.clear()
+
+    user = await create_user()
+    backend, original = Calls(), rate_limiter.backend
+    rate_limiter.use_backend(backend)
+    try:
+        assert await statuses(client, 2, headers=auth_headers(user)) == [200, 429]
+        response = await client.get("/api/v1/lockers/available", headers=auth_headers(user))
+        assert response.headers["retry-after"] == "2"
+    finally:
+        rate_limiter.use_backend(original)
+    assert backend.keys[0] == (f"read:user:{user.email}", 3)
+
+
+async def test_memory_backend_is_bounded():
+    backend = ShardedMemoryBackend(shards=4, max_keys=40)
+    for n in range(1000):
+        assert await backend.take(f"key{n}", 1, 1 / 60) == 0
+    assert len(backend) <= 40
+    # The most recent key is still tracked and now empty.
+    assert await backend.take("key999", 1, 1 / 60) > 0
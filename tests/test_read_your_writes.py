@@ -0,0 +1,134 @@
+"""
+Read-your-writes routing against a "replica" that never receives the
+primary's writes: a second database named by TEST_REPLICA_DATABASE_URL,
+migrated and emptied like the main one. Anything read from it is stale
+by construction. Skipped when the variable is unset.
+"""
+import os
+import time
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.middleware import PRIMARY_UNTIL_HEADER
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.session import recent_writers, sign_primary_until
+from app.main import app
+from conftest import ROOT
+from factories import auth_headers, create_user, create_vault
+
+TEST_REPLICA_DATABASE_URL = os.environ.get("TEST_REPLICA_DATABASE_URL") or None
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(TEST_REPLICA_DATABASE_URL is None, reason="TEST_REPLICA_DATABASE_URL is not set"),
+]
+
+
+@pytest.fixture(scope="module")
+def replica_migrated():
+    primary_url = settings.DATABASE_URL
+    settings.DATABASE_URL = TEST_REPLICA_DATABASE_URL
+    try:
+        config = Config(str(ROOT / "alembic.ini"))
+        config.set_main_option("script_location", str(ROOT / "alembic"))
+        command.upgrade(config, "head")
+    finally:
+        settings.DATABASE_URL = primary_url
+
+
+@pytest.fixture
+async def replica(replica_migrated, monkeypatch):
+    replica_engine = create_async_engine(TEST_REPLICA_DATABASE_URL)
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with replica_engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", [TEST_REPLICA_DATABASE_URL])
+    monkeypatch.setattr(db_session.replica_router, "replicas", [replica_engine])
+    monkeypatch.setitem(db_session._read_sessions, replica_engine, sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine, class_=AsyncSession, expire_on_commit=False,
+    ))
+    yield replica_engine
+    await replica_engine.dispose()
+
+
+def other_worker():
+    """
+    A client with no cookies, talking to a worker that never saw its writes.
+    """
+    recent_writers.clear()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def available(client, headers):
+    response = await client.get("/api/v1/lockers/available", headers=headers)
+    assert response.status_code == 200
+    return [locker["locker_number"] for locker in response.json()]
+
+
+async def create_locker(client, headers, vault_id):
+    response = await client.post(f"/api/v1/lockers/vaults/{vault_id}/", headers=headers, json=dict(
+        vault_id=vault_id, locker_number="NEW", size="SMALL", status="AVAILABLE", monthly_rent=30,
+    ))
+    assert response.status_code == 201
+    return response
+
+
+async def test_reads_go_to_the_replica_without_a_recent_write(client, replica):
+    user = await create_user()
+    await create_vault("SMALL")
+    headers = auth_headers(user)
+    # The locker exists only on the primary.
+    assert await available(client, headers) == []
+    response = await client.get("/api/v1/lockers/available", headers=headers)
+    assert PRIMARY_UNTIL_HEADER not in response.headers
+    assert "set-cookie" not in response.headers
+
+
+async def test_writer_reads_its_write_on_the_same_worker(client, replica):
+    admin = await create_user(role="ADMIN")
+    vault, _ = await create_vault()
+    headers = auth_headers(admin)
+    await create_locker(client, headers, vault.id)
+    client.cookies.clear()
+    # Only this worker's recent_writers remembers the write.
+    assert await available(client, headers) == ["NEW"]
+
+
+async def test_marker_carries_the_window_to_other_workers(client, replica):
+    admin = await create_user(role="ADMIN")
+    vault, _ = await create_vault()
+    headers = auth_headers(admin)
+    response = await create_locker(client, headers, vault.id)
+    marker = response.headers[PRIMARY_UNTIL_HEADER]
+    assert f"primary_until={marker}" in response.headers["set-cookie"]
+
+    async with other_worker() as http:
+        # Without the marker the read lands on the stale replica, and that
+        # answer is now in the response cache ...
+        assert await available(http, headers) == []
+        # ... which a marked read skips.
+        assert await available(http, headers | {PRIMARY_UNTIL_HEADER: marker}) == ["NEW"]
+        http.cookies.set("primary_until", marker)
+        assert await available(http, headers) == ["NEW"]
+
+
+async def test_forged_or_expired_markers_are_ignored(client, replica):
+    admin = await create_user(role="ADMIN")
+    vault, _ = await create_vault()
+    headers = auth_headers(admin)
+    response = await create_locker(client, headers, vault.id)
+    until, _, signature = response.headers[PRIMARY_UNTIL_HEADER].partition(".")
+
+    async with other_worker() as http:
+        forged = f"{int(until) + 3_600_000}.{signature}"
+        assert await available(http, headers | {PRIMARY_UNTIL_HEADER: forged}) == []
+        expired = sign_primary_until(time.time() - 1)
+        assert await available(http, headers | {PRIMARY_UNTIL_HEADER: expired}) == []
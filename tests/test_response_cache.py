@@ -0,0 +1,116 @@
+import pytest
+
+from app.core.response_cache import response_cache
+from app.db.session import SessionLocal
+from factories import auth_headers, capture_queries, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+URL = "/api/v1/lockers/available"
+
+
+async def outcomes(client) -> dict:
+    text = (await client.get("/metrics")).text
+    prefix = 'response_cache_requests_total{namespace="lockers",outcome="'
+    return {
+        line[len(prefix):].split('"')[0]: float(line.rpartition(" ")[2])
+        for line in text.splitlines() if line.startswith(prefix)
+    }
+
+
+async def get(client, headers, **params):
+    with capture_queries() as statements:
+        response = await client.get(URL, headers=headers, params=params)
+    return response, statements
+
+
+async def test_hits_and_304s_skip_the_database(client):
+    user = await create_user()
+    headers = auth_headers(user)
+    await create_vault("SMALL", "MEDIUM", "LARGE")
+    before = await outcomes(client)
+
+    first, _ = await get(client, headers, limit=2)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and first.headers["cache-control"] == "private, no-cache"
+
+    second, statements = await get(client, headers, limit=2)
+    assert statements == []
+    assert second.content == first.content
+    assert second.headers["etag"] == etag
+    assert second.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+    not_modified, statements = await get(client, headers | {"If-None-Match": f'W/"other", {etag}'}, limit=2)
+    assert statements == []
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    after = await outcomes(client)
+    for outcome, n in (("miss", 1), ("hit", 1), ("not_modified", 1)):
+        assert after.get(outcome, 0) - before.get(outcome, 0) == n
+
+
+async def test_committed_writes_invalidate_and_change_the_etag(client):
+    admin = await create_user(role="ADMIN")
+    customer = await create_user()
+    vault, _ = await create_vault("SMALL")
+    headers = auth_headers(customer)
+    first, _ = await get(client, headers)
+
+    response = await client.post(f"/api/v1/lockers/vaults/{vault.id}/", headers=auth_headers(admin), json=dict(
+        vault_id=vault.id, locker_number="A2", size="LARGE", status="AVAILABLE", monthly_rent=90,
+    ))
+    assert response.status_code == 201
+
+    second, statements = await get(client, headers | {"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200 and statements
+    assert len(second.json()) == 2
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+async def test_rolled_back_writes_invalidate_nothing():
+    version = response_cache.versions.get("lockers", 0)
+    async with SessionLocal() as db:
+        response_cache.invalidate_on_commit(db, "lockers")
+        await db.rollback()
+    assert response_cache.versions.get("lockers", 0) == version
+    async with SessionLocal() as db:
+        response_cache.invalidate_on_commit(db, "lockers")
+        await db.commit()
+    assert response_cache.versions["lockers"] == version + 1
+
+
+async def test_recent_writers_bypass_the_cache(client):
+    user = await create_user()
+    _, locker_ids = await create_vault("SMALL", "SMALL")
+    headers = auth_headers(user)
+    other = auth_headers(await create_user())
+    await get(client, other)
+
+    response = await client.post(f"/api/v1/lockers/{locker_ids[0]}/allocate", headers=headers)
+    assert response.status_code == 201
+    # Another caller fills the new version ...
+    await get(client, other)
+    _, statements = await get(client, other)
+    assert statements == []
+    # ... but the writer reads past it while inside its read-your-writes window.
+    before = await outcomes(client)
+    response, statements = await get(client, headers)
+    assert statements and [locker["id"] for locker in response.json()] == [locker_ids[1]]
+    after = await outcomes(client)
+    assert after["bypass"] - before.get("bypass", 0) == 1
+
+
+async def test_entries_are_per_role_and_query(client):
+    await create_vault("SMALL", "LARGE")
+    customer, staff = auth_headers(await create_user()), auth_headers(await create_user(role="STAFF"))
+    await get(client, customer, size="SMALL")
+    for headers, params in ((staff, dict(size="SMALL")), (customer, dict(size="LARGE"))):
+        _, statements = await get(client, headers, **params)
+        assert statements
+    # Parameter order does not matter.
+    response = await client.get(f"{URL}?limit=5&size=SMALL", headers=customer)
+    assert response.status_code == 200
+    _, statements = await get(client, customer, size="SMALL", limit=5)
+    assert statements == []
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from pydantic import TypeAdapter
+from sqlalchemy.future import select
+
+from app.api import responses
+from app.api.v1.api import api_router
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.locker import Locker
+from app.models.vault import Vault
+from app.models.vault_availability import VaultAvailability
+from app.schemas.locker import Locker as LockerSchema
+from app.schemas.vault import Vault as VaultSchema, VaultAvailability as VaultAvailabilitySchema
+from factories import auth_headers, create_user, create_vault
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_openapi_schema_matches_the_default_response_class():
+    # The same routes mounted on an app using FastAPI's stock JSONResponse.
+    stock = FastAPI(title=app.title, openapi_url=app.openapi_url)
+    stock.include_router(api_router, prefix="/api/v1")
+    paths = {path: spec for path, spec in app.openapi()["paths"].items() if path.startswith("/api/v1")}
+    assert paths == stock.openapi()["paths"]
+    assert app.openapi()["components"] == stock.openapi()["components"]
+
+    schema = paths["/api/v1/lockers/available"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["items"] == {"$ref": "#/components/schemas/Locker"}
+
+
+async def orm_body(model, schema, order_by) -> list:
+    """
+    The page as the pydantic response_model path renders it from ORM rows.
+    """
+    async with SessionLocal() as db:
+        rows = (await db.execute(select(model).order_by(*order_by))).scalars().all()
+    adapter = TypeAdapter(List[schema])
+    return json.loads(adapter.dump_json(adapter.validate_python(rows, from_attributes=True)))
+
+
+async def test_column_rows_render_like_the_response_model(client):
+    staff = auth_headers(await create_user(role="STAFF"))
+    await create_vault("SMALL", "MEDIUM", rent=49.5)
+    await create_vault("LARGE", "LARGE")
+    cases = [
+        ("/api/v1/lockers/available", Locker, LockerSchema, [Locker.id]),
+        ("/api/v1/vaults/list", Vault, VaultSchema, [Vault.id]),
+        ("/api/v1/vaults/availability", VaultAvailability, VaultAvailabilitySchema,
+         [VaultAvailability.vault_id, VaultAvailability.size, VaultAvailability.status]),
+    ]
+    for url, model, schema, order_by in cases:
+        response = await client.get(url, headers=staff)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == await orm_body(model, schema, order_by), url
+        assert list(response.json()[0]) == list(schema.model_fields)
+
+
+async def test_stdlib_fallback_encodes_the_same_document(monkeypatch):
+    content = [{"id": 1, "name": "Zoë", "rent": 49.5, "at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "note": None}]
+    fast = responses.dumps(content)
+    monkeypatch.setattr(responses, "orjson", None)
+    slow = responses.dumps(content)
+    assert json.loads(slow) == json.loads(fast)
+    assert json.loads(slow)[0]["at"] == "2026-01-02T03:04:05+00:00"
+    assert b" " not in slow
+    with pytest.raises(TypeError):
+        responses.dumps({"value": object()})
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.user_session import UserSession
+from app.services import sessions
+from factories import PASSWORD, auth_headers, capture_queries, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def login(client, user) -> dict:
+    response = await client.post("/api/v1/auth/login", data=dict(username=user.email, password=PASSWORD))
+    assert response.status_code == 200
+    return response.json()
+
+
+async def refresh(client, refresh_token: str):
+    return await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+
+async def live_sessions(user_id: int) -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(
+            select(func.count()).where(UserSession.user_id == user_id, UserSession.revoked.is_(False))
+        )
+
+
+async def test_refresh_rotates_the_token_in_one_round_trip(client):
+    user = await create_user()
+    tokens = await login(client, user)
+
+    with capture_queries() as statements:
+        response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    # Validate-and-revoke, then the replacement; no password check, no SELECT.
+    assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT"]
+
+    me = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert (await client.get("/api/v1/lockers/available", headers=me)).status_code == 200
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 200
+    # Only the hash of a token is stored.
+    async with SessionLocal() as db:
+        assert await db.scalar(select(func.count()).where(UserSession.token_hash == rotated["refresh_token"])) == 0
+
+
+async def test_a_redeemed_token_is_rejected_and_revokes_every_session(client):
+    user, bystander = await create_user(), await create_user()
+    first, second = await login(client, user), await login(client, user)
+    await login(client, bystander)
+    rotated = (await refresh(client, first["refresh_token"])).json()
+    assert await live_sessions(user.id) == 2
+
+    response = await refresh(client, first["refresh_token"])
+    assert response.status_code == 401
+    assert await live_sessions(user.id) == 0
+    for token in (rotated["refresh_token"], second["refresh_token"]):
+        assert (await refresh(client, token)).status_code == 401
+    assert await live_sessions(bystander.id) == 1
+
+
+async def test_expired_and_unknown_tokens_are_refused(client):
+    user = await create_user()
+    expired, live = await login(client, user), await login(client, user)
+    async with SessionLocal() as db:
+        await db.execute(
+            update(UserSession)
+            .where(UserSession.id == 1)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+
+    assert (await refresh(client, expired["refresh_token"])).status_code == 401
+    assert (await refresh(client, "never-issued")).status_code == 401
+    # Neither counts as reuse: the live session survives.
+    assert (await refresh(client, live["refresh_token"])).status_code == 200
+
+
+async def test_inactive_users_cannot_refresh(client):
+    user = await create_user()
+    tokens = await login(client, user)
+    async with SessionLocal() as db:
+        await db.execute(update(User).where(User.id == user.id).values(status="INACTIVE"))
+        await db.commit()
+
+    response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid or expired refresh token"}
+    # The token was consumed, so reactivating the user does not revive it.
+    assert await live_sessions(user.id) == 0
+
+
+async def test_users_revoke_their_own_sessions(client):
+    user, other = await create_user(), await create_user()
+    tokens = [await login(client, user) for _ in range(3)]
+    await login(client, other)
+
+    response = await client.post("/api/v1/auth/sessions/revoke", headers=auth_headers(user))
+    assert response.status_code == 200 and response.json() == {"revoked": 3}
+    assert all([(await refresh(client, t["refresh_token"])).status_code == 401 for t in tokens])
+    assert await live_sessions(other.id) == 1
+    # Access tokens already issued stay valid until they expire.
+    assert (await client.get("/api/v1/lockers/available", headers=auth_headers(user))).status_code == 200
+
+
+async def test_admins_revoke_other_users_sessions(client):
+    admin, staff, customer = await create_user(role="ADMIN"), await create_user(role="STAFF"), await create_user()
+    tokens = await login(client, customer)
+    url = f"/api/v1/auth/users/{customer.id}/sessions/revoke"
+
+    assert (await client.post(url, headers=auth_headers(staff))).status_code == 403
+    assert (await client.post(url, headers=auth_headers(customer))).status_code == 403
+    response = await client.post(url, headers=auth_headers(admin))
+    assert response.status_code == 200 and response.json() == {"revoked": 1}
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+    # Nothing left to revoke.
+    assert (await client.post(url, headers=auth_headers(admin))).json() == {"revoked": 0}
+
+
+async def test_purge_expired_deletes_only_expired_sessions():
+    user = await create_user()
+    now = datetime.utcnow()
+    async with SessionLocal() as db:
+        for _ in range(3):
+            await sessions.issue(db, user.id)
+        await db.execute(
+            update(UserSession)
+            .where(UserSession.id.in_([1, 2]))
+            .values(expires_at=now - timedelta(days=1))
+        )
+        await db.commit()
+
+    async with SessionLocal() as db:
+        assert await sessions.purge_expired(db, now) == 2
+        assert (await db.execute(select(UserSession.id))).scalars().all() == [3]
+        assert await sessions.purge_expired(db, now) == 0
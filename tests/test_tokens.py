@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwt
+
+from app.core.cache import LRUCache
+from app.core.tokens import TokenError, TokenService, token_verifications_total
+from factories import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+def outcomes() -> dict:
+    return {
+        sample.split('"')[1]: float(sample.rpartition(" ")[2])
+        for sample in token_verifications_total.samples()
+    }
+
+
+def key_pair(algorithm: str) -> tuple[str, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048) if algorithm.startswith(("RS", "PS")) \
+        else ec.generate_private_key(ec.SECP256R1())
+    private = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private, public
+
+
+def hmac_signed(claims: dict, secret: str) -> str:
+    """
+    An HS256 token built by hand, since jose refuses PEM keys as secrets.
+    """
+    def segment(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    signing_input = ".".join(segment(json.dumps(part).encode()) for part in ({"alg": "HS256", "typ": "JWT"}, claims))
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{segment(signature)}"
+
+
+def hs256(cache_size: int = 100) -> TokenService:
+    return TokenService("HS256", LRUCache(maxsize=cache_size), secret_key="test-token-secret")
+
+
+async def test_verified_claims_are_cached_until_used_again():
+    service = hs256()
+    token = service.create("alice@example.com", role="STAFF")
+    before = outcomes()
+    claims = service.verify(token)
+    assert claims["sub"] == "alice@example.com" and claims["role"] == "STAFF"
+    assert service.verify(token) is claims
+    after = outcomes()
+    assert after["verified"] - before.get("verified", 0) == 1
+    assert after["cached"] - before.get("cached", 0) == 1
+
+
+async def test_bad_tokens_are_rejected_and_not_cached():
+    service = hs256()
+    forged = TokenService("HS256", LRUCache(), secret_key="another-secret").create("alice@example.com")
+    expired = service.create("alice@example.com", expires_delta=timedelta(seconds=-1))
+    signing_input, _, signature = service.create("alice@example.com").rpartition(".")
+    tampered = f"{signing_input}.{'B' if signature[0] == 'A' else 'A'}{signature[1:]}"
+    before = outcomes()
+    for token in (forged, expired, tampered, "not-a-token"):
+        with pytest.raises(TokenError):
+            service.verify(token)
+    assert outcomes()["rejected"] - before.get("rejected", 0) == 4
+    assert len(service.cache) == 0
+
+
+async def test_cache_is_bounded():
+    service = hs256(cache_size=2)
+    tokens = [service.create(f"user{n}@example.com") for n in range(5)]
+    for token in tokens:
+        service.verify(token)
+    assert len(service.cache) == 2
+    assert service.cache.get(tokens[-1]) is not None and service.cache.get(tokens[0]) is None
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256"])
+async def test_asymmetric_tokens_verify_with_only_the_public_key(algorithm):
+    private, public = key_pair(algorithm)
+    issuer = TokenService(algorithm, LRUCache(), private_key=private)
+    edge = TokenService(algorithm, LRUCache(), public_key=public)
+
+    token = issuer.create("alice@example.com")
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    assert edge.verify(token)["sub"] == "alice@example.com"
+    assert issuer.verify(token)["sub"] == "alice@example.com"
+    with pytest.raises(TokenError):
+        edge.create("alice@example.com")
+
+    # Neither a token from another key pair nor an HS256 token signed with the
+    # public key as the secret gets past the edge node.
+    other = TokenService(algorithm, LRUCache(), private_key=key_pair(algorithm)[0]).create("alice@example.com")
+    confused = hmac_signed({"sub": "alice@example.com"}, public)
+    for token in (other, confused):
+        with pytest.raises(TokenError):
+            edge.verify(token)
+
+
+async def test_asymmetric_algorithms_need_a_key():
+    with pytest.raises(TokenError):
+        TokenService("RS256", LRUCache())
+
+
+async def test_requests_with_tokens_from_another_issuer_are_unauthorized(client):
+    user = await create_user()
+    forged = TokenService("HS256", LRUCache(), secret_key="another-secret").create(user.email)
+    response = await client.get("/api/v1/lockers/available", headers={"Authorization": f"Bearer {forged}"})
+    assert response.status_code == 401
+    response = await client.get("/api/v1/lockers/available", headers=auth_headers(user))
+    assert response.status_code == 200